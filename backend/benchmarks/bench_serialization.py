@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark
+Compares the per-request CPU cost of encoding an experiences payload through
+Pydantic response models against the fast path (DocumentShaper + orjson).
+
+Usage: python benchmarks/bench_serialization.py [--docs 50] [--iterations 2000]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.experience import Experience
+from services.serialization import DocumentShaper, dumps, orjson
+
+def make_documents(count):
+    """Documents shaped like the ones Motor returns for the experiences collection"""
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"HR Operations Specialist {i}",
+            "company": "PT Contoh Indonesia",
+            "period": "January 2024 - Present",
+            "location": "Indonesia",
+            "achievements": [f"Delivered initiative {j} with measurable impact on retention" for j in range(5)],
+            "order": i,
+            "is_active": True,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+        for i in range(count)
+    ]
+
+def time_per_call(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50, help="documents per response")
+    parser.add_argument("--iterations", type=int, default=2000, help="encodings per strategy")
+    args = parser.parse_args()
+
+    raw = make_documents(args.docs)
+    docs = [dict(doc, _id=str(doc["_id"])) for doc in raw]
+    adapter = TypeAdapter(List[Experience])
+    shaper = DocumentShaper(Experience)
+
+    def pydantic_models():
+        return adapter.dump_json([Experience(**doc) for doc in docs], by_alias=True)
+
+    def fast_path():
+        return dumps(shaper.many(raw))
+
+    results = {
+        "pydantic models": time_per_call(pydantic_models, args.iterations),
+        "fast path": time_per_call(fast_path, args.iterations),
+    }
+
+    print(f"📊 Serializing {args.docs} experiences ({'orjson' if orjson else 'json'} encoder)")
+    print("=" * 60)
+    for name, micros in results.items():
+        print(f"   {name:<18} {micros:>10.1f} µs/request")
+    speedup = results["pydantic models"] / results["fast path"]
+    print(f"   🚀 fast path is {speedup:.1f}x cheaper per request")
+
+if __name__ == "__main__":
+    main()
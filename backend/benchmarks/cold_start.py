@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Portfolio API cold-start profile
+Starts fresh interpreters the way a serverless platform does and reports where
+the time goes before the first response: an import-time breakdown per package
+(from python -X importtime), the lifespan startup of a real uvicorn server and
+the latency of the first request it accepts.
+
+By default MongoDB is replaced by mongomock-motor; pass --mongo-url to measure
+against a real server, and --snapshot to serve the first request from a
+bootstrap snapshot written by build_snapshot.py.
+
+Usage:
+    python benchmarks/cold_start.py [--runs 5] [--top 15]
+    python benchmarks/cold_start.py --snapshot bootstrap_snapshot.json
+    python benchmarks/cold_start.py --mongo-url mongodb://localhost:27017
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Runs in the child interpreter: import the app, start uvicorn with its lifespan, then time one request
+FIRST_REQUEST = """
+import asyncio, json, os, sys, time
+start = time.perf_counter()
+if not os.environ.get("COLD_START_REAL_MONGO"):
+    import mongomock_motor
+    from motor import motor_asyncio
+    motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    stand_in = time.perf_counter() - start
+else:
+    stand_in = 0.0
+import server
+imported = time.perf_counter()
+import httpx
+import uvicorn
+
+async def first_request():
+    # A real server: requests are only accepted once lifespan startup has finished
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=0, lifespan="on", log_level="warning")
+    uv_server = uvicorn.Server(config)
+    serving = asyncio.create_task(uv_server.serve())
+    began = time.perf_counter()
+    while not uv_server.started:
+        if serving.done():
+            serving.result()
+            raise SystemExit("uvicorn exited during startup")
+        await asyncio.sleep(0.001)
+    started = time.perf_counter()
+    port = uv_server.servers[0].sockets[0].getsockname()[1]
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        response = await client.get(sys.argv[1])
+    answered = time.perf_counter()
+    uv_server.should_exit = True
+    await serving
+    return response.status_code, started - began, answered - started
+
+status, startup, latency = asyncio.run(first_request())
+print(json.dumps({"import_ms": (imported - start - stand_in) * 1000, "startup_ms": startup * 1000,
+                  "first_response_ms": latency * 1000, "status": status}))
+"""
+
+def child_env(args):
+    env = dict(os.environ)
+    env.setdefault("DB_NAME", "portfolio_cold_start")
+    env["MONGO_URL"] = args.mongo_url or env.get("MONGO_URL", "mongodb://localhost:27017")
+    if args.mongo_url:
+        env["COLD_START_REAL_MONGO"] = "1"
+    if args.snapshot:
+        env["BOOTSTRAP_SNAPSHOT"] = str(Path(args.snapshot).resolve())
+    return env
+
+def import_profile(env):
+    """Self time in microseconds per top-level package for one `import server`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us)
+    return packages
+
+def first_request(env, path):
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST, path],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=15, help="packages to list in the import breakdown")
+    parser.add_argument("--path", default="/api/portfolio", help="endpoint requested first")
+    parser.add_argument("--snapshot", help="bootstrap snapshot served before MongoDB is connected")
+    parser.add_argument("--mongo-url", help="measure against a real MongoDB instead of mongomock-motor")
+    args = parser.parse_args()
+    env = child_env(args)
+
+    print(f"🧊 Cold-starting the API {args.runs} times")
+    profiles = [import_profile(env) for _ in range(args.runs)]
+    requests = [first_request(env, args.path) for _ in range(args.runs)]
+
+    # Median per package across runs, so one noisy start doesn't skew the breakdown
+    medians = {
+        name: statistics.median(profile.get(name, 0) for profile in profiles) / 1000
+        for name in set().union(*profiles)
+    }
+    total = sum(medians.values())
+    print(f"\n{'package':<28}{'ms':>10}{'share':>9}")
+    print("=" * 47)
+    for name, ms in sorted(medians.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name:<28}{ms:>10.1f}{ms / total:>9.0%}")
+    print(f"{'total (self time)':<28}{total:>10.1f}")
+
+    print(f"\nimport server:        {statistics.median(r['import_ms'] for r in requests):8.1f} ms (median)")
+    print(f"lifespan startup:     {statistics.median(r['startup_ms'] for r in requests):8.1f} ms (median)")
+    print(f"first GET {args.path}: {statistics.median(r['first_response_ms'] for r in requests):8.1f} ms (median)"
+          f"  status {requests[-1]['status']}{'  [bootstrap snapshot]' if args.snapshot else ''}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Portfolio API load test
+Boots the app in-process against an in-memory Mongo stand-in (mongomock-motor),
+seeds it with the sample data and drives every endpoint at a fixed concurrency,
+reporting throughput and p50/p95/p99 latency per endpoint.
+
+Usage:
+    python benchmarks/load_test.py [--requests 500] [--concurrency 20]
+    python benchmarks/load_test.py --save-baseline          # record benchmarks/baselines/default.json
+    python benchmarks/load_test.py --compare --tolerance 0.2  # exit 1 on a >20% regression
+    python benchmarks/load_test.py --base-url http://localhost:8001  # drive a running server instead
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+ENDPOINTS = [
+    ("GET", "/api/portfolio"),
+    ("GET", "/api/personal"),
+    ("GET", "/api/experiences"),
+    ("GET", "/api/skills"),
+    ("GET", "/api/education"),
+    ("GET", "/api/certifications"),
+    ("GET", "/api/languages"),
+    ("POST", "/api/contact"),
+]
+
+CONTACT_PAYLOAD = {
+    "name": "Load Test",
+    "email": "loadtest@example.com",
+    "company": "Benchmark",
+    "subject": "Load test",
+    "message": "Generated by benchmarks/load_test.py",
+}
+
+def boot_app():
+    """Import the app with Motor swapped for mongomock-motor and seed the sample data"""
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "portfolio_benchmark")
+    # The contact endpoint would otherwise answer 429 after a handful of requests
+    os.environ.setdefault("CONTACT_RATE_LIMIT_IP", "1000000000/1")
+    os.environ.setdefault("CONTACT_RATE_LIMIT_EMAIL", "1000000000/1")
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import mongomock_motor
+    from motor import motor_asyncio
+    motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+    import server
+    from seed_data import sample_data
+    return server.app, server.db, copy.deepcopy(sample_data)
+
+async def seed(db, data):
+    await db.personal_info.insert_one(data["personal_info"])
+    await db.experiences.insert_many(data["experiences"])
+    await db.skills.insert_many(data["skills"])
+    await db.education.insert_one(data["education"])
+    await db.certifications.insert_many(data["certifications"])
+    await db.languages.insert_many(data["languages"])
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+async def run_endpoint(client, method, path, total, concurrency):
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            if method == "POST":
+                response = await client.post(path, json=CONTACT_PAYLOAD)
+            else:
+                response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": total / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+async def run(args):
+    if args.base_url:
+        transport, base_url = None, args.base_url.rstrip("/")
+    else:
+        app, db, data = boot_app()
+        await seed(db, data)
+        transport, base_url = httpx.ASGITransport(app=app), "http://benchmark"
+
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=30) as client:
+        for method, path in ENDPOINTS:
+            # Warm up caches and connections before measuring
+            await run_endpoint(client, method, path, min(args.warmup, args.requests), args.concurrency)
+            results[f"{method} {path}"] = await run_endpoint(client, method, path, args.requests, args.concurrency)
+    return results
+
+def print_report(results, baseline=None):
+    print(f"{'endpoint':<26}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    print("=" * 74)
+    for name, r in results.items():
+        line = (f"{name:<26}{r['throughput_rps']:>10.1f}{r['p50_ms']:>10.2f}"
+                f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}")
+        if baseline and name in baseline:
+            change = (r["p95_ms"] - baseline[name]["p95_ms"]) / baseline[name]["p95_ms"]
+            line += f"   p95 {change:+.0%}"
+        print(line)
+
+def find_regressions(results, baseline, tolerance):
+    """Endpoints whose p95 latency or throughput is worse than the baseline by more than tolerance"""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f}ms -> {r['p95_ms']:.2f}ms")
+        if r["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']:.1f} -> {r['throughput_rps']:.1f} rps")
+        if r["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {r['errors']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent clients per endpoint")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per endpoint")
+    parser.add_argument("--base-url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--baseline", default="default", help="baseline name under benchmarks/baselines/")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="fail when results regress against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression ratio for --compare")
+    args = parser.parse_args()
+
+    baseline_path = BASELINE_DIR / f"{args.baseline}.json"
+    baseline = None
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"❌ No baseline at {baseline_path}; run with --save-baseline first")
+            sys.exit(2)
+        baseline = json.loads(baseline_path.read_text())["results"]
+
+    print(f"🚀 Load testing {args.requests} requests x {args.concurrency} concurrent per endpoint")
+    results = asyncio.run(run(args))
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps({
+            "recorded_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "results": results,
+        }, indent=2) + "\n")
+        print(f"💾 Baseline saved to {baseline_path}")
+
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("\n🚨 REGRESSIONS:")
+            for regression in regressions:
+                print(f"   • {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+from pathlib import Path
+import logging
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from services.bootstrap import write_snapshot
+from services.portfolio import SECTION_FETCHERS, fetch_serialized
+from services.repository import MongoRepository
+
+# MongoDB connection
+mongo_url = os.environ['MONGO_URL']
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ['DB_NAME']]
+repository = MongoRepository(db)
+
+DEFAULT_SNAPSHOT_PATH = ROOT_DIR / "bootstrap_snapshot.json"
+
+async def build_snapshot(path: Path = DEFAULT_SNAPSHOT_PATH):
+    """Write every read endpoint's current response to a bundled bootstrap snapshot"""
+    try:
+        responses = {}
+        for name in SECTION_FETCHERS:
+            serialized = await fetch_serialized(name, repository)
+            if serialized is not None:
+                responses[name] = serialized
+        write_snapshot(path, responses)
+        logging.info(f"Wrote {len(responses)} responses to {path}; deploy it with BOOTSTRAP_SNAPSHOT={path.name}")
+    except Exception as e:
+        logging.error(f"Error building bootstrap snapshot: {str(e)}")
+        raise e
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    # Optional output path: python build_snapshot.py <path>
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SNAPSHOT_PATH
+    asyncio.run(build_snapshot(path))
@@ -0,0 +1,38 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+from pathlib import Path
+import logging
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from services.repository import SQLITE_PATH, MongoRepository, write_sqlite
+from services.tenancy import DEFAULT_TENANT, MULTI_TENANT, Tenant
+
+# MongoDB connection
+mongo_url = os.environ['MONGO_URL']
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ['DB_NAME']]
+
+async def build_sqlite(path: Path = SQLITE_PATH):
+    """Copy the portfolio from MongoDB into the embedded database served with PORTFOLIO_BACKEND=sqlite"""
+    try:
+        tenant_ids = await db.personal_info.distinct("tenant_id") if MULTI_TENANT else []
+        tenants = [Tenant(tenant_id) for tenant_id in sorted(t for t in tenant_ids if t)] or [DEFAULT_TENANT]
+        rows = await write_sqlite(path, MongoRepository(db), tenants)
+        logging.info(f"Wrote {rows} rows for {len(tenants)} tenant(s) to {path}; serve with PORTFOLIO_BACKEND=sqlite SQLITE_PATH={path}")
+    except Exception as e:
+        logging.error(f"Error building portfolio database: {str(e)}")
+        raise e
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    # Optional output path: python build_sqlite.py <path>
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else SQLITE_PATH
+    asyncio.run(build_sqlite(path))
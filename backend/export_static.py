@@ -0,0 +1,48 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+from pathlib import Path
+import logging
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from services.portfolio import fetch_serialized
+from services.static_export import EXPORTED_ROUTES, export_responses
+from services.repository import MongoRepository
+
+# MongoDB connection
+mongo_url = os.environ['MONGO_URL']
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ['DB_NAME']]
+repository = MongoRepository(db)
+
+DEFAULT_EXPORT_DIR = ROOT_DIR / "static_export"
+
+async def export_static(out_dir: Path = DEFAULT_EXPORT_DIR):
+    """Render every read endpoint to versioned, pre-compressed files under out_dir"""
+    try:
+        responses = {}
+        for path, name in EXPORTED_ROUTES.items():
+            serialized = await fetch_serialized(name, repository)
+            if serialized is None:
+                # The API answers 404 here; leave it to the app rather than exporting an error
+                logging.info(f"Skipping {path}: no document")
+                continue
+            responses[path] = serialized
+        version = export_responses(out_dir, responses)
+        logging.info(f"Exported {len(responses)} endpoints as version {version}; serve with STATIC_EXPORT_DIR={out_dir}")
+    except Exception as e:
+        logging.error(f"Error exporting static site: {str(e)}")
+        raise e
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    # Optional output directory: python export_static.py <dir>
+    out_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_EXPORT_DIR
+    asyncio.run(export_static(out_dir))
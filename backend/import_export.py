@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Portfolio data import/export
+Moves documents between MongoDB and JSON, NDJSON, YAML or CSV files in
+batches, so memory stays flat however large the file is.
+
+A <collection> is one of the portfolio collections or contact_messages, one
+document per record. `portfolios` moves whole portfolios instead: one record
+per tenant holding every section, applied with the same incremental sync as
+seed_data.py (JSON, NDJSON and YAML only).
+
+Usage:
+    python import_export.py import contact_messages messages.csv
+    python import_export.py import experiences experiences.ndjson --tenant alice --mode upsert
+    python import_export.py export contact_messages messages.jsonl
+    python import_export.py import portfolios portfolios.yaml
+"""
+
+from motor.motor_asyncio import AsyncIOMotorClient
+import argparse
+import asyncio
+import os
+from datetime import datetime
+from dotenv import load_dotenv
+from pathlib import Path
+import logging
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from pymongo import InsertOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from services.cache import portfolio_cache
+from services.portfolio import PORTFOLIO_COLLECTIONS, refresh_skills_view
+from services.seeding import SEED_KEYS, as_documents, bump_versions, sync_portfolio
+from services.tenancy import DEFAULT_TENANT, MULTI_TENANT, TENANT_ID_PATTERN, Tenant
+from services.transfer import (
+    COLLECTION_MODELS,
+    FORMATS,
+    READERS,
+    BatchValidator,
+    Progress,
+    RecordWriter,
+    batched,
+    csv_fields,
+    detect_format,
+)
+
+# MongoDB connection
+mongo_url = os.environ['MONGO_URL']
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ['DB_NAME']]
+
+PORTFOLIOS = "portfolios"
+
+# Left out of exported portfolios so a re-import only rewrites what actually changed
+_BOOKKEEPING_FIELDS = {"_id": 0, "tenant_id": 0, "content_hash": 0, "created_at": 0, "updated_at": 0}
+
+async def write_batch(collection, docs, mode: str, tenant: Tenant):
+    """Write one validated batch, returning (written, rejected)"""
+    if not docs:
+        return 0, 0
+    if mode == "upsert":
+        operations = [
+            ReplaceOne(tenant.scope({"_id": doc["_id"]}), doc, upsert=True) if "_id" in doc else InsertOne(doc)
+            for doc in docs
+        ]
+    else:
+        operations = [InsertOne(doc) for doc in docs]
+    try:
+        await collection.bulk_write(operations, ordered=False)
+        return len(docs), 0
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        for error in errors[:5]:
+            logging.warning(f"Rejected by MongoDB: {error.get('errmsg')}")
+        return len(docs) - len(errors), len(errors)
+
+async def import_collection(name: str, path: Path, format: str, tenant: Tenant, batch_size: int, mode: str):
+    validator = BatchValidator(COLLECTION_MODELS[name], decode_json=format == "csv")
+    progress = Progress(f"Importing {name}")
+    pending = None
+    # Records taken from the file so far; progress lags it by the batch still being written
+    read = 0
+    with open(path, encoding="utf-8", newline="") as f:
+        for batch in batched(READERS[format](f), batch_size):
+            docs, errors = validator.documents(batch, offset=read)
+            read += len(batch)
+            for error in errors:
+                logging.warning(error)
+            progress.advance(0, len(batch) - len(docs))
+            # Validate the next batch while this one is being written; at most two are held at once
+            if pending is not None:
+                progress.advance(*await pending)
+            pending = asyncio.ensure_future(write_batch(db[name], [tenant.stamp(doc) for doc in docs], mode, tenant))
+    if pending is not None:
+        progress.advance(*await pending)
+    progress.report()
+
+    if name in PORTFOLIO_COLLECTIONS and progress.done:
+        if name == "skills":
+            await refresh_skills_view(db, tenant)
+        # Other processes pick the change up from the version bump
+        await bump_versions(db, [name], tenant, datetime.utcnow())
+        portfolio_cache.invalidate(name, tenant.id)
+
+async def import_portfolios(path: Path, format: str):
+    if format == "csv":
+        raise ValueError("Portfolios are nested documents; use JSON, NDJSON or YAML")
+    validators = {name: BatchValidator(COLLECTION_MODELS[name]) for name in SEED_KEYS}
+    progress = Progress("Importing portfolios", every=100)
+    with open(path, encoding="utf-8") as f:
+        for number, record in enumerate(READERS[format](f), 1):
+            tenant_id = record.get("tenant_id")
+            if tenant_id is None and MULTI_TENANT:
+                # Falling back to the default tenant would sync a portfolio nobody is served
+                logging.warning(f"record {number}: missing tenant_id (required in multi-tenant mode)")
+                progress.advance(0, 1)
+                continue
+            if tenant_id is not None and not TENANT_ID_PATTERN.match(str(tenant_id)):
+                logging.warning(f"record {number}: invalid tenant_id {tenant_id!r}")
+                progress.advance(0, 1)
+                continue
+            data, errors = {}, []
+            for name, validator in validators.items():
+                docs, section_errors = validator.documents(as_documents(record.get(name)))
+                data[name] = [{k: v for k, v in doc.items() if k not in _BOOKKEEPING_FIELDS} for doc in docs]
+                errors.extend(f"record {number} {name}: {error}" for error in section_errors)
+            if errors:
+                # A partially valid portfolio would delete the sections that failed, so skip it whole
+                for error in errors:
+                    logging.warning(error)
+                progress.advance(0, 1)
+                continue
+            await sync_portfolio(client, db, data, Tenant(tenant_id) if tenant_id else DEFAULT_TENANT)
+            progress.advance(1)
+    progress.report()
+
+async def export_collection(name: str, path: Path, format: str, tenant: Tenant):
+    progress = Progress(f"Exporting {name}")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        with RecordWriter(f, format, csv_fields(COLLECTION_MODELS[name])) as writer:
+            async for doc in db[name].find(tenant.scope(), {"content_hash": 0}).sort("_id", 1):
+                writer.write(doc)
+                progress.advance(1)
+    progress.report()
+
+async def export_portfolios(path: Path, format: str):
+    if format == "csv":
+        raise ValueError("Portfolios are nested documents; use JSON, NDJSON or YAML")
+    tenant_ids = await db.personal_info.distinct("tenant_id") if MULTI_TENANT else [None]
+    progress = Progress("Exporting portfolios", every=100)
+    with open(path, "w", encoding="utf-8") as f:
+        with RecordWriter(f, format) as writer:
+            for tenant_id in sorted(tenant_ids, key=lambda t: t or ""):
+                tenant = Tenant(tenant_id) if tenant_id else DEFAULT_TENANT
+                record = {"tenant_id": tenant_id}
+                for name in SEED_KEYS:
+                    docs = await db[name].find(tenant.scope(), _BOOKKEEPING_FIELDS).sort("_id", 1).to_list(None)
+                    record[name] = docs[0] if name in ("personal_info", "education") and docs else docs
+                writer.write(record)
+                progress.advance(1)
+    progress.report()
+
+async def main(args):
+    path = Path(args.file)
+    format = args.format or detect_format(args.file)
+    tenant = Tenant(args.tenant) if args.tenant else DEFAULT_TENANT
+    try:
+        if args.command == "import" and args.collection == PORTFOLIOS:
+            await import_portfolios(path, format)
+        elif args.command == "import":
+            await import_collection(args.collection, path, format, tenant, args.batch_size, args.mode)
+        elif args.collection == PORTFOLIOS:
+            await export_portfolios(path, format)
+        else:
+            await export_collection(args.collection, path, format, tenant)
+    except Exception as e:
+        logging.error(f"Error during {args.command}: {str(e)}")
+        raise e
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("collection", choices=sorted(COLLECTION_MODELS) + [PORTFOLIOS])
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--tenant", help="tenant the documents belong to (multi-tenant mode)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="records validated and written per batch")
+    parser.add_argument("--mode", choices=["insert", "upsert"], default="insert",
+                        help="upsert replaces documents whose _id already exists instead of rejecting them")
+    args = parser.parse_args()
+    if args.tenant and not TENANT_ID_PATTERN.match(args.tenant):
+        parser.error(f"invalid tenant id {args.tenant!r}")
+    if args.command == "import" and args.collection != PORTFOLIOS and MULTI_TENANT and not args.tenant:
+        parser.error("--tenant is required to import in multi-tenant mode")
+    asyncio.run(main(args))
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional, Union
+
+from models.personal_info import PersonalInfo
+from models.experience import Experience
+from models.education import Education
+from models.certification import Certification
+from models.language import Language
+
+class Portfolio(BaseModel):
+    personal: Optional[PersonalInfo] = None
+    experiences: List[Experience] = []
+    skills: Dict[str, Union[List[str], Dict[str, List[str]]]]
+    education: Optional[Education] = None
+    certifications: List[Certification] = []
+    languages: List[Language] = []
@@ -1,6 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 import asyncio
 import os
+import sys
 from dotenv import load_dotenv
 from pathlib import Path
 import logging
@@ -9,6 +10,10 @@ import logging
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+from services.indexes import ensure_indexes
+from services.seeding import SEED_KEYS, as_documents, sync_portfolio
+from services.tenancy import DEFAULT_TENANT, Tenant
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
@@ -153,44 +158,25 @@ sample_data = {
     ]
 }
 
-async def seed_database():
-    """Seed the database with sample data"""
-    logging.info("Starting database seeding...")
+async def seed_database(tenant: Tenant = DEFAULT_TENANT):
+    """Bring the database in line with the sample data, scoped to one tenant in multi-tenant mode.
+
+    Only documents whose content changed are written, so seeding a live
+    database never leaves a window with empty collections.
+    """
+    logging.info(f"Starting database seeding for {tenant}...")
     
     try:
-        # Clear existing data
-        collections = [
-            'personal_info', 'experiences', 'skills', 'education', 
-            'certifications', 'languages'
-        ]
-        
-        for collection_name in collections:
-            await db[collection_name].delete_many({})
-            logging.info(f"Cleared {collection_name} collection")
-        
-        # Insert personal info
-        await db.personal_info.insert_one(sample_data["personal_info"])
-        logging.info("Inserted personal information")
-        
-        # Insert experiences
-        await db.experiences.insert_many(sample_data["experiences"])
-        logging.info(f"Inserted {len(sample_data['experiences'])} experiences")
-        
-        # Insert skills
-        await db.skills.insert_many(sample_data["skills"])
-        logging.info(f"Inserted {len(sample_data['skills'])} skill categories")
-        
-        # Insert education
-        await db.education.insert_one(sample_data["education"])
-        logging.info("Inserted education information")
+        data = {name: as_documents(sample_data[name]) for name in SEED_KEYS}
+        changes = await sync_portfolio(client, db, data, tenant)
         
-        # Insert certifications
-        await db.certifications.insert_many(sample_data["certifications"])
-        logging.info(f"Inserted {len(sample_data['certifications'])} certifications")
+        for name in SEED_KEYS:
+            if name in changes:
+                logging.info(f"Applied {changes[name]} changes to {name}")
+            else:
+                logging.info(f"{name} already up to date")
         
-        # Insert languages
-        await db.languages.insert_many(sample_data["languages"])
-        logging.info(f"Inserted {len(sample_data['languages'])} languages")
+        await ensure_indexes(db)
         
         logging.info("Database seeding completed successfully!")
         
@@ -202,4 +188,6 @@ async def seed_database():
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    asyncio.run(seed_database())
\ No newline at end of file
+    # Optional tenant id: python seed_data.py <tenant>
+    tenant = Tenant(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TENANT
+    asyncio.run(seed_database(tenant))
\ No newline at end of file
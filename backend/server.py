@@ -1,12 +1,15 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 import os
+import asyncio
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
+from bson import ObjectId
 
 # Import models
 from models.personal_info import PersonalInfo, PersonalInfoUpdate
@@ -17,21 +20,169 @@ from models.certification import Certification, CertificationCreate, Certificati
 from models.organization_experience import OrganizationExperience, OrganizationExperienceCreate, OrganizationExperienceUpdate
 from models.language import Language, LanguageCreate, LanguageUpdate
 from models.contact_message import ContactMessage, ContactMessageCreate, ContactMessageUpdate
+from models.portfolio import Portfolio
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# Services read their configuration from the environment, so import them after .env is loaded
+from services.portfolio import (
+    SKILL_CATEGORIES,
+    SOFT_SKILL_SUBCATEGORIES,
+    convert_objectid_to_str,
+    fetch_page,
+    fetch_serialized,
+    fetch_skills_serialized,
+    list_cursor,
+    serialized_sections,
+    stream_documents,
+)
+from services.pagination import MAX_PAGE_SIZE
+from services.bootstrap import bootstrap_responses
+from services.query_log import slow_query_log
+from services.http_cache import cached_json_response
+from services.contact_writer import BUFFERED_WRITES, create_contact_buffer
+from services.rate_limit import client_ip, create_contact_limiter
+from services.tenancy import Tenant, TenantMiddleware, get_tenant
+from services.metrics import MetricsMiddleware, registry
+from services.serialization import FAST_SERIALIZATION, orjson
+from services.database import HEALTH_POOL_SATURATION, LazyDatabase, client_options, pool_monitor
+from services.auth import require_admin
+from services.inbox import (
+    ContactMessageBulkDelete,
+    ContactMessageBulkUpdate,
+    delete_messages,
+    inbox_query,
+    list_messages,
+    mark_read,
+    unread_count,
+    update_message,
+)
+from services.repository import PORTFOLIO_BACKEND, create_repository
+from services.search import SEARCH_SECTIONS, search_service
+from services.shared_snapshot import SHARED_SNAPSHOT_MAX_AGE, SnapshotPublisher, shared_snapshot
+from services.static_export import STATIC_EXPORT_DIR, StaticExportMiddleware, StaticSite
+
+# MongoDB connection; pool size, timeouts and read preference come from MONGO_* settings.
+# The client is created on first use so cold starts don't pay for it up front
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = LazyDatabase(mongo_url, os.environ['DB_NAME'])
+
+# Portfolio reads go through a repository: MongoDB itself, or an embedded SQLite file (PORTFOLIO_BACKEND=sqlite)
+repository = create_repository(db)
+
+# Batches contact form inserts when CONTACT_WRITE_MODE=buffered
+contact_buffer = create_contact_buffer(db.contact_messages) if BUFFERED_WRITES else None
+
+# Throttles contact submissions per client IP and per email address
+contact_limiter = create_contact_limiter(db)
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+
+async def ensure_mongo_indexes():
+    try:
+        # Deferred: index definitions pull in PyMongo, which serverless cold starts can skip
+        from services.indexes import ensure_indexes
+
+        await ensure_indexes(db)
+    except Exception as e:
+        # The API can still serve reads without indexes, only slower
+        logging.error(f"Error ensuring indexes: {str(e)}")
+
+async def prepare_mongo():
+    """Warm the pool, ensure indexes and start watching for changes; returns the watcher and the index task.
+
+    With a bootstrap snapshot, warm-up and index creation run in the background:
+    the snapshot only answers while MongoDB is still connecting, so waiting for
+    them here would mean it is never served.
+    """
+    connections = int(os.environ.get("MONGO_WARM_CONNECTIONS", client_options()["minPoolSize"]))
+    index_task = None
+    if bootstrap_responses:
+        db.connect_in_background(connections)
+        index_task = asyncio.create_task(ensure_mongo_indexes())
+    else:
+        try:
+            await db.connect(connections)
+        except Exception as e:
+            # Serve anyway; requests will connect on demand once MongoDB is reachable
+            logging.error(f"Error warming MongoDB connection pool: {str(e)}")
+        await ensure_mongo_indexes()
+
+    try:
+        # Deferred like ensure_indexes; drops cached data changed by seed_data.py or other workers
+        from services.change_watcher import create_change_watcher
+
+        change_watcher = create_change_watcher(db)
+        change_watcher.start()
+        return change_watcher, index_task
+    except Exception as e:
+        # Cached data then refreshes on TTL expiry only
+        logging.error(f"Error starting change watcher: {str(e)}")
+        return None, index_task
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the connection pool and prepare the database before serving (behind a bootstrap snapshot, while serving), clean up after"""
+    change_watcher = index_task = None
+    if PORTFOLIO_BACKEND == "mongo":
+        change_watcher, index_task = await prepare_mongo()
+    else:
+        try:
+            await repository.ping()
+        except Exception as e:
+            # Reads fail until the file is there; build_sqlite.py writes it
+            logging.error(f"Error opening portfolio database: {str(e)}")
+        repository.start()
+
+    # With the embedded backend, contact and admin endpoints still connect to MongoDB on first use
+    if contact_buffer is not None:
+        contact_buffer.start()
+    # Explains slow queries in the background; contact and admin queries hit MongoDB on either backend
+    slow_query_log.start(db)
+
+    # One worker renders the shared snapshot (SHARED_SNAPSHOT) and the others map it
+    publisher = None
+    if shared_snapshot is not None:
+        publisher = SnapshotPublisher(shared_snapshot, lambda: serialized_sections(repository), SHARED_SNAPSHOT_MAX_AGE)
+        publisher.start()
+
+    yield
+
+    if publisher is not None:
+        await publisher.stop()
+    if index_task is not None:
+        index_task.cancel()
+        await asyncio.gather(index_task, return_exceptions=True)
+    if change_watcher is not None:
+        await change_watcher.stop()
+    if PORTFOLIO_BACKEND != "mongo":
+        await repository.stop()
+
+    if contact_buffer is not None:
+        # Write out whatever is still queued before the connection goes away
+        await contact_buffer.stop()
+    await slow_query_log.stop()
+    db.close()
 
 # Create the main app
-app = FastAPI(title="Portfolio API", version="1.0.0")
+app = FastAPI(
+    title="Portfolio API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse if FAST_SERIALIZATION and orjson else JSONResponse,
+    lifespan=lifespan,
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Admin endpoints, all behind the ADMIN_API_TOKEN bearer token
+admin_router = APIRouter(prefix="/api/admin", dependencies=[Depends(require_admin)])
+
+# Serve the read endpoints from pre-rendered files written by export_static.py
+if STATIC_EXPORT_DIR:
+    app.add_middleware(StaticExportMiddleware, site=StaticSite(Path(STATIC_EXPORT_DIR)))
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -41,136 +192,344 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Utility function to convert MongoDB document to dict
-def convert_objectid_to_str(doc):
-    if doc and "_id" in doc:
-        doc["_id"] = str(doc["_id"])
-    return doc
+# Per-route request metrics, exposed on /metrics
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Resolves which hosted portfolio a request is for (MULTI_TENANT=true)
+app.add_middleware(TenantMiddleware)
+
+async def paginated_response(request: Request, name: str, tenant: Tenant, limit: Optional[int],
+                             after: Optional[str], format: Optional[str]):
+    """Uncached keyset page, or NDJSON stream, of a list endpoint"""
+    try:
+        cursor = list_cursor(name, after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "ndjson":
+        return StreamingResponse(stream_documents(name, repository, tenant, cursor, limit),
+                                 media_type="application/x-ndjson")
+
+    body, next_cursor = await fetch_page(name, repository, tenant, cursor, limit or MAX_PAGE_SIZE)
+    return page_response(request, body, next_cursor)
+
+def page_response(request: Request, body: bytes, next_cursor: Optional[str]) -> Response:
+    """JSON page pointing at the next one through X-Next-Cursor and a Link header"""
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(after=next_cursor)}>; rel="next"'
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Combined portfolio endpoint
+@api_router.get("/portfolio", response_model=Portfolio)
+async def get_portfolio(request: Request, tenant: Tenant = Depends(get_tenant)):
+    """Get the whole portfolio in a single response"""
+    try:
+        serialized = await fetch_serialized("portfolio", repository, tenant)
+        return cached_json_response(request, serialized)
+    except Exception as e:
+        logging.error(f"Error fetching portfolio: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Personal Information endpoints
 @api_router.get("/personal", response_model=PersonalInfo)
-async def get_personal_info():
+async def get_personal_info(request: Request, tenant: Tenant = Depends(get_tenant)):
     """Get personal information"""
     try:
-        personal_info = await db.personal_info.find_one()
-        if not personal_info:
+        serialized = await fetch_serialized("personal_info", repository, tenant)
+        if not serialized:
             raise HTTPException(status_code=404, detail="Personal information not found")
-        return convert_objectid_to_str(personal_info)
+        return cached_json_response(request, serialized)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error fetching personal info: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Experience endpoints
 @api_router.get("/experiences", response_model=List[Experience])
-async def get_experiences():
+async def get_experiences(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    tenant: Tenant = Depends(get_tenant),
+):
     """Get all work experiences sorted by order"""
+    if limit or after or format == "ndjson":
+        try:
+            return await paginated_response(request, "experiences", tenant, limit, after, format)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"Error paginating experiences: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
     try:
-        experiences = await db.experiences.find(
-            {"is_active": True}
-        ).sort("order", 1).to_list(1000)
-        
-        return [convert_objectid_to_str(exp) for exp in experiences]
+        serialized = await fetch_serialized("experiences", repository, tenant)
+        return cached_json_response(request, serialized)
     except Exception as e:
         logging.error(f"Error fetching experiences: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Skills endpoints
 @api_router.get("/skills")
-async def get_skills():
-    """Get all skills grouped by category"""
+async def get_skills(
+    request: Request,
+    tenant: Tenant = Depends(get_tenant),
+    category: Optional[str] = Query(None, pattern=f"^({'|'.join(SKILL_CATEGORIES)})$"),
+    subcategory: Optional[str] = Query(None, pattern=f"^({'|'.join(SOFT_SKILL_SUBCATEGORIES)})$"),
+):
+    """Get all skills grouped by category, or only one category/subcategory"""
+    if subcategory is not None and category not in (None, "soft"):
+        raise HTTPException(status_code=400, detail="subcategory only applies to soft skills")
     try:
-        skills = await db.skills.find().to_list(1000)
-        
-        # Group skills by category
-        grouped_skills = {
-            "professional": [],
-            "technical": [],
-            "technology": [],
-            "soft": {
-                "social": [],
-                "process": [],
-                "generic": []
-            }
-        }
-        
-        for skill_doc in skills:
-            category = skill_doc["category"]
-            skills_list = skill_doc["skills"]
-            
-            if category == "soft":
-                subcategory = skill_doc.get("subcategory", "generic")
-                grouped_skills["soft"][subcategory] = skills_list
-            else:
-                grouped_skills[category] = skills_list
-        
-        return grouped_skills
+        serialized = await fetch_skills_serialized(repository, tenant, category, subcategory)
+        return cached_json_response(request, serialized)
     except Exception as e:
         logging.error(f"Error fetching skills: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Education endpoint
 @api_router.get("/education", response_model=Education)
-async def get_education():
+async def get_education(request: Request, tenant: Tenant = Depends(get_tenant)):
     """Get education information"""
     try:
-        education = await db.education.find_one()
-        if not education:
+        serialized = await fetch_serialized("education", repository, tenant)
+        if not serialized:
             raise HTTPException(status_code=404, detail="Education information not found")
-        return convert_objectid_to_str(education)
+        return cached_json_response(request, serialized)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error fetching education: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Certifications endpoints
 @api_router.get("/certifications", response_model=List[Certification])
-async def get_certifications():
+async def get_certifications(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    tenant: Tenant = Depends(get_tenant),
+):
     """Get all certifications sorted by order"""
+    if limit or after or format == "ndjson":
+        try:
+            return await paginated_response(request, "certifications", tenant, limit, after, format)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"Error paginating certifications: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
     try:
-        certifications = await db.certifications.find().sort("order", 1).to_list(1000)
-        return [convert_objectid_to_str(cert) for cert in certifications]
+        serialized = await fetch_serialized("certifications", repository, tenant)
+        return cached_json_response(request, serialized)
     except Exception as e:
         logging.error(f"Error fetching certifications: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Languages endpoints
 @api_router.get("/languages", response_model=List[Language])
-async def get_languages():
+async def get_languages(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    tenant: Tenant = Depends(get_tenant),
+):
     """Get all languages"""
+    if limit or after or format == "ndjson":
+        try:
+            return await paginated_response(request, "languages", tenant, limit, after, format)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.error(f"Error paginating languages: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
     try:
-        languages = await db.languages.find().to_list(1000)
-        return [convert_objectid_to_str(lang) for lang in languages]
+        serialized = await fetch_serialized("languages", repository, tenant)
+        return cached_json_response(request, serialized)
     except Exception as e:
         logging.error(f"Error fetching languages: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Search endpoint
+@api_router.get("/search")
+async def search_portfolio(
+    q: str = Query(..., min_length=1, max_length=200),
+    section: Optional[str] = Query(None, pattern=f"^({'|'.join(SEARCH_SECTIONS)})$"),
+    limit: int = Query(20, ge=1, le=100),
+    tenant: Tenant = Depends(get_tenant),
+):
+    """Search achievements, skills, certifications and education"""
+    try:
+        return await search_service.search(repository, tenant, q, limit, section)
+    except Exception as e:
+        logging.error(f"Error searching portfolio: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Contact endpoints
 @api_router.post("/contact", response_model=ContactMessage)
-async def submit_contact_form(contact: ContactMessageCreate):
+async def submit_contact_form(contact: ContactMessageCreate, request: Request,
+                              tenant: Tenant = Depends(get_tenant)):
     """Submit contact form"""
     try:
+        await contact_limiter.check(ip=client_ip(request), email=contact.email)
+
+        # Mongo keeps millisecond precision, so truncate to echo exactly what gets stored
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
         contact_data = contact.dict()
-        contact_data["created_at"] = datetime.utcnow()
-        contact_data["updated_at"] = datetime.utcnow()
+        contact_data["_id"] = ObjectId()
+        contact_data["created_at"] = now
+        contact_data["updated_at"] = now
         contact_data["is_read"] = False
+        tenant.stamp(contact_data)
         
-        result = await db.contact_messages.insert_one(contact_data)
-        created_message = await db.contact_messages.find_one({"_id": result.inserted_id})
+        if contact_buffer is not None:
+            contact_buffer.submit(contact_data)
+        else:
+            await db.contact_messages.insert_one(contact_data)
         
-        return convert_objectid_to_str(created_message)
+        # Build the response from the data we wrote instead of reading it back
+        return convert_objectid_to_str(dict(contact_data))
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error submitting contact form: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-# Include the router in the main app
+# Admin inbox endpoints
+@admin_router.get("/messages", response_model=List[ContactMessage])
+async def list_contact_messages(
+    request: Request,
+    tenant: Tenant = Depends(get_tenant),
+    is_read: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    email: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+):
+    """List contact messages, newest first, one keyset page at a time"""
+    try:
+        query = inbox_query(tenant, is_read, since, until, email, after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        body, next_cursor = await list_messages(db.contact_messages, query, limit)
+        return page_response(request, body, next_cursor)
+    except Exception as e:
+        logging.error(f"Error listing contact messages: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@admin_router.get("/messages/unread-count")
+async def get_unread_count(tenant: Tenant = Depends(get_tenant)):
+    """Count unread contact messages"""
+    try:
+        return {"unread": await unread_count(db.contact_messages, tenant)}
+    except Exception as e:
+        logging.error(f"Error counting unread messages: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@admin_router.patch("/messages/{message_id}", response_model=ContactMessage)
+async def update_contact_message(message_id: str, update: ContactMessageUpdate,
+                                 tenant: Tenant = Depends(get_tenant)):
+    """Mark one contact message read or unread"""
+    try:
+        message = await update_message(db.contact_messages, tenant, message_id, update.dict(exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error updating contact message: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if message is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return message
+
+@admin_router.post("/messages/mark-read")
+async def mark_contact_messages_read(body: ContactMessageBulkUpdate, tenant: Tenant = Depends(get_tenant)):
+    """Mark many contact messages read (or unread) at once"""
+    try:
+        return {"updated": await mark_read(db.contact_messages, tenant, body.ids, body.is_read)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error marking contact messages: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@admin_router.post("/messages/delete")
+async def delete_contact_messages(body: ContactMessageBulkDelete, tenant: Tenant = Depends(get_tenant)):
+    """Delete many contact messages at once"""
+    try:
+        return {"deleted": await delete_messages(db.contact_messages, tenant, body.ids)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error deleting contact messages: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Slow query report; each worker keeps its own
+@admin_router.get("/slow-queries")
+async def get_slow_queries(limit: int = Query(20, ge=1, le=100),
+                           order_by: Literal["total_ms", "max_ms", "count"] = "total_ms"):
+    """Query shapes slower than SLOW_QUERY_MS, costliest first, with their explain plans"""
+    return {"threshold_ms": slow_query_log.threshold_ms, "shapes": slow_query_log.top(limit, order_by)}
+
+@admin_router.delete("/slow-queries", status_code=204)
+async def reset_slow_queries():
+    """Start collecting afresh, e.g. after adding an index"""
+    slow_query_log.reset()
+
+# Include the routers in the main app
 app.include_router(api_router)
+app.include_router(admin_router)
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# Liveness and pool saturation for load balancers and dashboards
+@app.get("/health", include_in_schema=False)
+async def health():
+    pool = pool_monitor.stats(client_options()["maxPoolSize"])
+    try:
+        await asyncio.wait_for(repository.ping(), timeout=float(os.environ.get("HEALTH_PING_TIMEOUT", 2)))
+        database = "ok"
+    except Exception as e:
+        logging.error(f"Health check ping failed: {str(e)}")
+        database = "unavailable"
+
+    if database != "ok":
+        status = "unavailable"
+    elif pool_monitor.degraded(pool, HEALTH_POOL_SATURATION):
+        status = "degraded"
+    else:
+        status = "ok"
+    return JSONResponse(
+        {
+            "status": status,
+            "backend": repository.name,
+            "database": database,
+            "pool": pool,
+            "snapshot_generation": shared_snapshot.current() if shared_snapshot is not None else None,
+        },
+        status_code=503 if status == "unavailable" else 200,
+    )
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+logger = logging.getLogger(__name__)
\ No newline at end of file
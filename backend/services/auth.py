@@ -0,0 +1,21 @@
+import os
+import hmac
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+# Bearer token for the /api/admin endpoints; the admin API is disabled while it is unset
+ADMIN_API_TOKEN = os.environ.get("ADMIN_API_TOKEN")
+
+_bearer = HTTPBearer(auto_error=False)
+
+def require_admin(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)):
+    """FastAPI dependency rejecting requests without the admin bearer token"""
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is not configured")
+    # Constant-time comparison, so the token can't be guessed byte by byte from response times
+    if credentials is None or not hmac.compare_digest(credentials.credentials.encode("utf-8"),
+                                                      ADMIN_API_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid or missing admin token",
+                            headers={"WWW-Authenticate": "Bearer"})
@@ -0,0 +1,63 @@
+import os
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from services.http_cache import SerializedResponse
+from services.tenancy import Tenant
+
+# BOOTSTRAP_SNAPSHOT=<path> answers reads from a bundled snapshot until MongoDB is connected
+BOOTSTRAP_SNAPSHOT = os.environ.get("BOOTSTRAP_SNAPSHOT")
+
+SNAPSHOT_VERSION = 1
+
+def write_snapshot(path: Path, responses: Dict[str, SerializedResponse]):
+    """Store serialized responses, byte for byte, so ETags match the live API"""
+    path.write_text(json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "responses": {
+            name: {
+                "body": serialized.body.decode("utf-8"),
+                "last_modified": serialized.last_modified.isoformat(),
+            }
+            for name, serialized in responses.items()
+        },
+    }, ensure_ascii=False), encoding="utf-8")
+
+def load_snapshot(path: Path) -> Dict[str, SerializedResponse]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported bootstrap snapshot version {data.get('version')}")
+    return {
+        name: SerializedResponse(entry["body"].encode("utf-8"), datetime.fromisoformat(entry["last_modified"]))
+        for name, entry in data["responses"].items()
+    }
+
+def _load_configured() -> Dict[str, SerializedResponse]:
+    if not BOOTSTRAP_SNAPSHOT:
+        return {}
+    try:
+        responses = load_snapshot(Path(BOOTSTRAP_SNAPSHOT))
+    except (OSError, ValueError, KeyError) as e:
+        logging.error(f"Error loading bootstrap snapshot: {str(e)}")
+        return {}
+    logging.info(f"Loaded bootstrap snapshot with {len(responses)} responses from {BOOTSTRAP_SNAPSHOT}")
+    return responses
+
+bootstrap_responses = _load_configured()
+
+def bootstrap_response(name: str, repository, tenant: Tenant) -> Optional[SerializedResponse]:
+    """Snapshot response for name while the repository is still connecting, None once it can answer itself.
+
+    Serving from the snapshot kicks off the connection in the background, so
+    later requests go to MongoDB as soon as it is reachable. The snapshot only
+    holds the default tenant's portfolio.
+    """
+    if not bootstrap_responses or tenant.id is not None or getattr(repository, "connected", True):
+        return None
+    serialized = bootstrap_responses.get(name)
+    if serialized is not None:
+        repository.connect_in_background()
+    return serialized
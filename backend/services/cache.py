@@ -0,0 +1,253 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict, defaultdict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Default TTLs in seconds; portfolio data changes a few times a month
+DEFAULT_TTLS = {
+    'personal_info': 3600,
+    'experiences': 3600,
+    'skills': 3600,
+    'education': 3600,
+    'certifications': 3600,
+    'languages': 3600,
+}
+
+def ttl_from_env(collection: str, default: int) -> int:
+    """Per-collection TTL override, e.g. CACHE_TTL_EXPERIENCES=600"""
+    return int(os.environ.get(f"CACHE_TTL_{collection.upper()}", default))
+
+# Entries one tenant can fill: each section and its serialized response, the portfolio and its response,
+# and the filtered skills responses (one per category, one per soft skill subcategory)
+ENTRIES_PER_TENANT = 2 * len(DEFAULT_TTLS) + 2 + 7
+
+# Inside a load: expiry times of the cached entries its loader has read so far
+_load_reads: ContextVar[Optional[List[float]]] = ContextVar("cache_load_reads", default=None)
+
+class CacheEntry:
+    __slots__ = ("value", "expires_at", "collections", "tenant_id")
+
+    def __init__(self, value: Any, expires_at: float, collections: frozenset,
+                 tenant_id: Optional[str] = None):
+        self.value = value
+        self.expires_at = expires_at
+        self.collections = collections
+        self.tenant_id = tenant_id
+
+def affected(collections: Iterable[str], tenant_id: Optional[str],
+             collection: Optional[str], invalidated_tenant: Optional[str]) -> bool:
+    """Whether invalidating collection for invalidated_tenant (None meaning all) covers data built from collections"""
+    return ((collection is None or collection in collections)
+            and (invalidated_tenant is None or tenant_id == invalidated_tenant))
+
+class PortfolioCache:
+    """In-process read-through cache with per-collection TTLs and LRU eviction.
+
+    Every entry records the collections it was built from and the tenant it
+    belongs to, so invalidating a collection (optionally for one tenant only)
+    drops exactly the entries that depend on it.
+
+    Loads are single-flight: concurrent misses on one key share a single
+    loader call. An entry past its TTL is still served for stale_ttl seconds
+    while one background task reloads it; invalidated entries are never
+    served stale. Invalidations are tracked per tenant and collection, so
+    one tenant's edits only discard the in-flight loads that read its data.
+
+    Entries built from other entries (a serialized response from its section,
+    the portfolio from every section) never see a stale value while loading:
+    a loader reading a stale entry reloads it instead, and the result expires
+    no later than the entries it was built from. Data is therefore never older
+    than its TTL plus stale_ttl, however many layers it passes through.
+    """
+
+    def __init__(self, max_entries: int = 256, default_ttl: int = 3600,
+                 ttls: Optional[Dict[str, int]] = None, stale_ttl: int = 0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._listeners: List[Callable[[Optional[str], Optional[str]], None]] = []
+        # In-flight loads by key, with the collections and tenant they read
+        self._loads: Dict[str, Tuple[asyncio.Task, frozenset, Optional[str]]] = {}
+        # Invalidation counts by (tenant, collection), None standing for all; a load that
+        # started before an invalidation covering it does not store its result
+        self._generations: Dict[Tuple[Optional[str], Optional[str]], int] = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def ttl_for(self, collections: Iterable[str]) -> int:
+        # An entry built from several collections lives as long as the shortest TTL
+        return min((self.ttls.get(c, self.default_ttl) for c in collections),
+                   default=self.default_ttl)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry.expires_at <= time.monotonic():
+            self._expire(key, entry)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def _expire(self, key: str, entry: CacheEntry):
+        # Expired entries stay around for stale_ttl, to be served while they reload
+        if entry.expires_at + self.stale_ttl <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+
+    def set(self, key: str, value: Any, collections: Iterable[str], tenant_id: Optional[str] = None,
+            expires_by: Optional[float] = None):
+        collections = frozenset(collections)
+        expires_at = time.monotonic() + self.ttl_for(collections)
+        if expires_by is not None:
+            expires_at = min(expires_at, expires_by)
+        self._entries[key] = CacheEntry(value, expires_at, collections, tenant_id)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                          collections: Optional[Iterable[str]] = None,
+                          tenant_id: Optional[str] = None) -> Any:
+        """Return the cached value for key, calling loader on a miss.
+
+        Callers missing on the same key at the same time await one loader call.
+        """
+        collections = collections if collections is not None else [key]
+        # Set when called from another entry's loader, which must not be handed stale data
+        reads = _load_reads.get()
+        entry = self._entries.get(key)
+        if entry is not None:
+            now = time.monotonic()
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if reads is not None:
+                    reads.append(entry.expires_at)
+                return entry.value
+            if entry.expires_at + self.stale_ttl > now and reads is None:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._loads:
+                    self.refreshes += 1
+                    self._start_load(key, loader, collections, tenant_id).add_done_callback(self._refreshed)
+                return entry.value
+            self._expire(key, entry)
+
+        self.misses += 1
+        load = self._loads.get(key)
+        if load is None:
+            task = self._start_load(key, loader, collections, tenant_id)
+        else:
+            task = load[0]
+            self.coalesced += 1
+        # Shielded so a cancelled request (client gone) does not cancel the load other callers wait on
+        value = await asyncio.shield(task)
+        if reads is not None:
+            loaded = self._entries.get(key)
+            if loaded is not None:
+                reads.append(loaded.expires_at)
+        return value
+
+    def _start_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                    collections: Iterable[str], tenant_id: Optional[str]) -> asyncio.Task:
+        # Taken now: the task may only start running after an invalidation that follows
+        generation = self.generation(collections, tenant_id)
+        task = asyncio.ensure_future(self._load(key, loader, collections, tenant_id, generation))
+        self._loads[key] = (task, frozenset(collections), tenant_id)
+        task.add_done_callback(lambda t: self._load_done(key, t))
+        return task
+
+    def _load_done(self, key: str, task: asyncio.Task):
+        if self._loads.get(key, (None,))[0] is task:
+            del self._loads[key]
+        # Mark the error as seen even when every waiter has gone; each caller still gets it raised
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                    collections: Iterable[str], tenant_id: Optional[str], generation: tuple) -> Any:
+        # Runs in its own task, so this only covers the entries loader reads
+        reads: List[float] = []
+        _load_reads.set(reads)
+        value = await loader()
+        if generation == self.generation(collections, tenant_id):
+            self.set(key, value, collections, tenant_id, expires_by=min(reads, default=None))
+        return value
+
+    def generation(self, collections: Iterable[str], tenant_id: Optional[str] = None) -> tuple:
+        """Changes whenever an invalidation covers collections for tenant_id"""
+        return tuple(self._generations.get((tenant, collection), 0)
+                     for tenant in dict.fromkeys((tenant_id, None)) for collection in (*collections, None))
+
+    @staticmethod
+    def _refreshed(task: asyncio.Task):
+        # Nobody awaits a background refresh; the stale entry stays until the next attempt
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Error refreshing cached data: {str(task.exception())}")
+
+    def invalidate(self, collection: Optional[str] = None, tenant_id: Optional[str] = None):
+        """Drop entries built from collection (all collections when None), for one tenant or all of them"""
+        if collection is None and tenant_id is None:
+            self._entries.clear()
+        else:
+            stale = [k for k, e in self._entries.items() if affected(e.collections, e.tenant_id, collection, tenant_id)]
+            for key in stale:
+                del self._entries[key]
+        # Loads already running may have read the old data; later callers start fresh ones.
+        # Loads of other tenants and collections carry on
+        self._generations[(tenant_id, collection)] += 1
+        for key in [k for k, (_, collections, tenant) in self._loads.items()
+                    if affected(collections, tenant, collection, tenant_id)]:
+            del self._loads[key]
+        self.invalidations += 1
+        scope = f" for tenant {tenant_id}" if tenant_id else ""
+        logging.info(f"Cache invalidated: {collection or 'all collections'}{scope}")
+        for listener in self._listeners:
+            listener(collection, tenant_id)
+
+    def add_invalidation_listener(self, listener: Callable[[Optional[str], Optional[str]], None]):
+        """Register a hook called with the collection name and tenant id (either may be None) on every invalidation"""
+        self._listeners.append(listener)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+# Least recently used entries are evicted beyond CACHE_MAX_ENTRIES, by default room for every
+# entry of CACHE_MAX_TENANTS tenants; raise it when serving more portfolios that are all busy
+CACHE_MAX_TENANTS = int(os.environ.get("CACHE_MAX_TENANTS", 256))
+
+portfolio_cache = PortfolioCache(
+    max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", CACHE_MAX_TENANTS * ENTRIES_PER_TENANT)),
+    default_ttl=int(os.environ.get("CACHE_DEFAULT_TTL", 3600)),
+    ttls={name: ttl_from_env(name, ttl) for name, ttl in DEFAULT_TTLS.items()},
+    stale_ttl=int(os.environ.get("CACHE_STALE_TTL", 300)),
+)
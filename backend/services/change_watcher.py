@@ -0,0 +1,225 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from pymongo.errors import ConnectionFailure, OperationFailure
+
+from services.cache import portfolio_cache
+from services.metrics import Counter, registry
+from services.portfolio import PORTFOLIO_COLLECTIONS
+from services.seeding import VERSIONS_COLLECTION
+
+# CACHE_WATCH=auto uses change streams where the deployment has them (replica sets,
+# sharded clusters) and polls otherwise; change_stream or poll force one, off disables both
+CACHE_WATCH = os.environ.get("CACHE_WATCH", "auto").lower()
+CACHE_POLL_INTERVAL = float(os.environ.get("CACHE_POLL_INTERVAL", 2.0))
+# Writes from other processes can commit a little after their updated_at; polls look back this far
+CACHE_POLL_OVERLAP = float(os.environ.get("CACHE_POLL_OVERLAP", 5.0))
+
+# Longest a burst of change events is held before its invalidations go out
+MAX_BATCH_DELAY = 0.25
+# Waits between attempts to reopen a broken change stream, in seconds
+RETRY_DELAYS = (0.5, 1, 2, 5, 10)
+# Resume token too old for the oplog, or the stream cannot be resumed at all
+RESUME_FAILED_CODES = {260, 280, 286}
+
+# (collection, tenant id); None stands for every collection or every tenant
+Target = Tuple[Optional[str], Optional[str]]
+
+cache_watch_invalidations = registry.register(Counter(
+    "cache_watch_invalidations_total", "Cache invalidations applied from database changes", ("source",)))
+
+def version_target(doc: dict) -> Target:
+    """collection_versions documents name the collection and tenant whose data changed"""
+    if "collection" in doc:
+        return doc["collection"], doc.get("tenant_id")
+    # Deleted version documents only carry their _id, which is tenant.cache_key(collection)
+    tenant_id, _, collection = str(doc["_id"]).rpartition(":")
+    return collection, tenant_id or None
+
+def change_target(collection: str, doc: dict) -> Target:
+    if collection == VERSIONS_COLLECTION:
+        return version_target(doc)
+    return collection, doc.get("tenant_id")
+
+class PollState:
+    __slots__ = ("since", "seen", "count")
+
+    def __init__(self):
+        self.since: Optional[datetime] = None
+        self.seen: Set[tuple] = set()
+        self.count: Optional[int] = None
+
+class ChangeWatcher:
+    """Drops this process's cached portfolio data whenever another process changes it.
+
+    Every uvicorn worker runs its own watcher, so each one receives every
+    change and invalidates exactly the (collection, tenant) pairs affected;
+    cache TTLs only bound how stale data can get when the watcher is down.
+
+    With change streams, one database-level stream covers the portfolio
+    collections and collection_versions, resuming from its last token after a
+    dropped connection. Deployments without change streams (standalone
+    servers, most stand-ins) are polled instead: documents whose updated_at
+    moved past the last one seen name their tenant, and a changed document
+    count catches deletions, which leave no updated_at behind.
+    """
+
+    def __init__(self, db, mode: str = "auto", poll_interval: float = 2.0, poll_overlap: float = 5.0,
+                 collections: Optional[List[str]] = None):
+        self.db = db
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.poll_overlap = timedelta(seconds=poll_overlap)
+        self.collections = list(collections or PORTFOLIO_COLLECTIONS) + [VERSIONS_COLLECTION]
+        self.source: Optional[str] = None
+        self._pending: Set[Target] = set()
+        self._pending_since = 0.0
+        self._resume_token = None
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self, target: Target):
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.add(target)
+
+    def flush(self):
+        """Apply pending invalidations, each collection and tenant once"""
+        pending, self._pending = self._pending, set()
+        if (None, None) in pending:
+            pending = {(None, None)}
+        whole = {collection for collection, tenant_id in pending if tenant_id is None}
+        for collection, tenant_id in sorted(pending, key=lambda t: (t[0] or "", t[1] or "")):
+            if tenant_id is not None and collection in whole:
+                continue
+            if collection is not None and collection not in self.collections:
+                continue
+            portfolio_cache.invalidate(collection, tenant_id)
+            cache_watch_invalidations.inc(self.source)
+
+    # Change streams
+
+    def _on_change(self, change: dict):
+        operation = change["operationType"]
+        if operation in ("insert", "update", "replace", "delete"):
+            collection = change["ns"]["coll"]
+            # Deletes carry no document, so they invalidate the collection for every tenant
+            doc = change.get("fullDocument") or change.get("documentKey") or {}
+            self.notify(change_target(collection, doc))
+        else:
+            # drop, rename, dropDatabase, invalidate: anything may be gone
+            self.notify((None, None))
+
+    async def _watch(self) -> bool:
+        """Follow the change stream until cancelled; False when the deployment has none"""
+        pipeline = [
+            {"$match": {"ns.coll": {"$in": self.collections}}},
+            {"$project": {"operationType": 1, "ns": 1, "documentKey": 1,
+                          "fullDocument.tenant_id": 1, "fullDocument.collection": 1}},
+        ]
+        opened = False
+        failures = 0
+        while True:
+            try:
+                async with self.db.watch(pipeline, full_document="updateLookup", max_await_time_ms=1000,
+                                         resume_after=self._resume_token) as stream:
+                    while True:
+                        change = await stream.try_next()
+                        if not opened:
+                            opened = True
+                            self.source = "change_stream"
+                            logging.info(f"Watching {', '.join(self.collections)} for changes")
+                        failures = 0
+                        if change is not None:
+                            self._on_change(change)
+                        self._resume_token = stream.resume_token
+                        if self._pending and (change is None or time.monotonic() - self._pending_since >= MAX_BATCH_DELAY):
+                            self.flush()
+            except asyncio.CancelledError:
+                raise
+            except ConnectionFailure as e:
+                logging.error(f"Error watching for changes, retrying: {str(e)}")
+            except Exception as e:
+                # Standalone servers answer with an OperationFailure, stand-ins with whatever they like
+                if not opened and self.mode == "auto":
+                    logging.info(f"Change streams are not available: {str(e)}")
+                    return False
+                logging.error(f"Error watching for changes, retrying: {str(e)}")
+                if isinstance(e, OperationFailure) and e.code in RESUME_FAILED_CODES:
+                    self._resume_token = None
+
+            if opened and self._resume_token is None:
+                # Without a resume point, changes made while reconnecting would be missed
+                self.notify((None, None))
+            self.flush()
+            await asyncio.sleep(RETRY_DELAYS[min(failures, len(RETRY_DELAYS) - 1)])
+            failures += 1
+
+    # Polling
+
+    async def _poll_collection(self, name: str, state: PollState, report: bool):
+        collection = self.db[name]
+        count = await collection.estimated_document_count()
+        if report and count != state.count and name != VERSIONS_COLLECTION:
+            self.notify((name, None))
+        state.count = count
+
+        if state.since is None:
+            latest = await collection.find_one({"updated_at": {"$ne": None}}, {"updated_at": 1},
+                                               sort=[("updated_at", -1)])
+            if latest is None:
+                return
+            state.since = latest["updated_at"]
+
+        seen = set()
+        projection = {"updated_at": 1, "tenant_id": 1, "collection": 1}
+        async for doc in collection.find({"updated_at": {"$gt": state.since - self.poll_overlap}}, projection):
+            key = (doc["_id"], doc["updated_at"])
+            seen.add(key)
+            if report and key not in state.seen:
+                self.notify(change_target(name, doc))
+            state.since = max(state.since, doc["updated_at"])
+        # Only documents still inside the look-back window can show up again
+        state.seen = {key for key in seen if key[1] > state.since - self.poll_overlap}
+
+    async def _poll(self):
+        self.source = "poll"
+        states: Dict[str, PollState] = {name: PollState() for name in self.collections}
+        report = False
+        logging.info(f"Polling {', '.join(self.collections)} for changes every {self.poll_interval}s")
+        while True:
+            try:
+                for name, state in states.items():
+                    await self._poll_collection(name, state, report)
+                self.flush()
+                # The first round only records where things stand
+                report = True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error polling for changes: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _run(self):
+        if self.mode in ("auto", "change_stream") and await self._watch():
+            return
+        await self._poll()
+
+    def start(self):
+        if self._task is None and self.mode != "off":
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+def create_change_watcher(db) -> ChangeWatcher:
+    return ChangeWatcher(db, mode=CACHE_WATCH, poll_interval=CACHE_POLL_INTERVAL, poll_overlap=CACHE_POLL_OVERLAP)
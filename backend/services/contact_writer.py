@@ -0,0 +1,129 @@
+import os
+import asyncio
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from bson import json_util
+
+# CONTACT_WRITE_MODE=buffered queues submissions and writes them with insert_many
+BUFFERED_WRITES = os.environ.get("CONTACT_WRITE_MODE", "direct").lower() == "buffered"
+
+DEFAULT_SPILL_PATH = Path(__file__).resolve().parent.parent / "contact_spill.jsonl"
+
+class ContactWriteBuffer:
+    """Queues contact submissions in-process and flushes them in batches.
+
+    A batch is written when it reaches batch_size or when flush_interval
+    seconds have passed, whichever comes first. Batches that cannot be
+    written (Mongo down, timeouts) are appended to a local JSON Lines spill
+    file and replayed before the next batch goes out.
+    """
+
+    def __init__(self, collection, batch_size: int = 100, flush_interval: float = 1.0,
+                 spill_path: Optional[Path] = None):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self._pending: List[dict] = []
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flushes = set()
+
+    def submit(self, doc: dict):
+        """Queue a document; it must already carry its _id"""
+        self._pending.append(doc)
+        if len(self._pending) >= self.batch_size:
+            # Keep a reference so the flush task is not garbage collected mid-write
+            task = asyncio.create_task(self.flush())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def flush(self):
+        async with self._lock:
+            await self._replay_spill()
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                try:
+                    written = await self._insert(batch)
+                except asyncio.CancelledError:
+                    # Cancelled mid-write (shutdown): requeue the batch; whatever did land is skipped as a duplicate
+                    self._pending[:0] = batch
+                    raise
+                if not written:
+                    self._spill(batch)
+
+    async def _insert(self, batch: List[dict]) -> bool:
+        # Imported here so the buffer can be set up without loading PyMongo at startup
+        from pymongo.errors import BulkWriteError, PyMongoError
+
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            return True
+        except BulkWriteError as e:
+            # Documents already written by an earlier partial attempt are fine to skip
+            errors = e.details.get("writeErrors", [])
+            if all(error.get("code") == 11000 for error in errors):
+                return True
+            logging.error(f"Error writing contact batch: {str(e)}")
+            return False
+        except PyMongoError as e:
+            logging.error(f"Error writing contact batch: {str(e)}")
+            return False
+
+    def _spill(self, batch: List[dict]):
+        if self.spill_path is None:
+            logging.error(f"Dropping {len(batch)} contact messages: no spill file configured")
+            return
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            for doc in batch:
+                f.write(json_util.dumps(doc) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        logging.warning(f"Spilled {len(batch)} contact messages to {self.spill_path}")
+
+    async def _replay_spill(self):
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        with open(self.spill_path, encoding="utf-8") as f:
+            spilled = [json_util.loads(line) for line in f if line.strip()]
+        for start in range(0, len(spilled), self.batch_size):
+            if not await self._insert(spilled[start:start + self.batch_size]):
+                # Keep the file as it is; already replayed documents are skipped as duplicates next time
+                return
+        self.spill_path.unlink()
+        logging.info(f"Replayed {len(spilled)} spilled contact messages")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"Error flushing contact messages: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Let batch-size flushes already writing finish before the last one
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()
+
+def create_contact_buffer(collection) -> ContactWriteBuffer:
+    return ContactWriteBuffer(
+        collection,
+        batch_size=int(os.environ.get("CONTACT_BATCH_SIZE", 100)),
+        flush_interval=float(os.environ.get("CONTACT_FLUSH_INTERVAL", 1.0)),
+        spill_path=Path(os.environ.get("CONTACT_SPILL_PATH", DEFAULT_SPILL_PATH)),
+    )
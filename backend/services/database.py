@@ -0,0 +1,205 @@
+import os
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Optional
+
+from services.metrics import Gauge, registry
+from services.query_log import command_listener, slow_query_log
+
+# Motor and PyMongo are imported when the first client is built, not when the app module loads,
+# which keeps them off the serverless cold-start path until a request actually needs MongoDB
+
+# /health reports degraded above this share of maxPoolSize in use
+HEALTH_POOL_SATURATION = float(os.environ.get("HEALTH_POOL_SATURATION", 0.9))
+
+def client_options() -> dict:
+    """Motor/PyMongo pool and timeout settings, tunable through the environment"""
+    return {
+        "maxPoolSize": int(os.environ.get("MONGO_MAX_POOL_SIZE", 100)),
+        "minPoolSize": int(os.environ.get("MONGO_MIN_POOL_SIZE", 5)),
+        "maxIdleTimeMS": int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", 300000)),
+        "waitQueueTimeoutMS": int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000)),
+        "serverSelectionTimeoutMS": int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+        "connectTimeoutMS": int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", 5000)),
+        "readPreference": os.environ.get("MONGO_READ_PREFERENCE", "primary"),
+    }
+
+class PoolMonitor:
+    """Tracks connection pool usage per server from PyMongo's CMAP events.
+
+    PyMongo calls these hooks from Motor's worker threads, hence the lock.
+    It is registered with the driver through pool_listener().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = defaultdict(int)
+        self.in_use = defaultdict(int)
+        self.waiting = defaultdict(int)
+        self.checkout_failures = 0
+        self._failures_seen = 0
+
+    def _add(self, counts, address, amount):
+        with self._lock:
+            counts[address] += amount
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            for counts in (self.open, self.in_use, self.waiting):
+                counts.pop(event.address, None)
+
+    def connection_created(self, event):
+        self._add(self.open, event.address, 1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(self.open, event.address, -1)
+
+    def connection_check_out_started(self, event):
+        self._add(self.waiting, event.address, 1)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting[event.address] -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting[event.address] -= 1
+            self.in_use[event.address] += 1
+
+    def connection_checked_in(self, event):
+        self._add(self.in_use, event.address, -1)
+
+    def stats(self, max_pool_size: int) -> dict:
+        with self._lock:
+            in_use = max(self.in_use.values(), default=0)
+            return {
+                "max_pool_size": max_pool_size,
+                "open": sum(self.open.values()),
+                "in_use": sum(self.in_use.values()),
+                "waiting": sum(self.waiting.values()),
+                # The busiest server's pool is the one that runs out first
+                "saturation": in_use / max_pool_size if max_pool_size else 0.0,
+                "checkout_failures": self.checkout_failures,
+            }
+
+    def degraded(self, stats: dict, saturation: float = 0.9) -> bool:
+        """Pool close to exhausted, or checkouts timed out since the previous call.
+
+        Queued checkouts alone are normal under load and say nothing on their own.
+        """
+        failures = stats["checkout_failures"] - self._failures_seen
+        self._failures_seen = stats["checkout_failures"]
+        return stats["saturation"] >= saturation or failures > 0
+
+pool_monitor = PoolMonitor()
+
+mongo_pool_connections = registry.register(Gauge(
+    "mongo_pool_connections", "MongoDB pool connections by state", ("state",)))
+mongo_pool_saturation = registry.register(Gauge(
+    "mongo_pool_saturation", "Checked-out connections as a share of maxPoolSize"))
+
+def collect_pool_stats():
+    stats = pool_monitor.stats(client_options()["maxPoolSize"])
+    for state in ("open", "in_use", "waiting"):
+        mongo_pool_connections.set(state, value=stats[state])
+    mongo_pool_saturation.set(value=stats["saturation"])
+
+registry.add_collector(collect_pool_stats)
+
+def pool_listener(monitor: PoolMonitor):
+    """Driver-side listener forwarding every CMAP event to monitor.
+
+    PyMongo only accepts subclasses of its own listener types, and PoolMonitor
+    cannot inherit from one without importing PyMongo up front.
+    """
+    from pymongo import monitoring
+
+    class PoolListener(monitoring.ConnectionPoolListener):
+        pass
+
+    for name in dir(monitoring.ConnectionPoolListener):
+        if not name.startswith("_"):
+            setattr(PoolListener, name, staticmethod(getattr(monitor, name)))
+    return PoolListener()
+
+def create_client(mongo_url: str):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    options = client_options()
+    logging.info(
+        f"Creating MongoDB client (maxPoolSize={options['maxPoolSize']}, "
+        f"minPoolSize={options['minPoolSize']}, readPreference={options['readPreference']})"
+    )
+    listeners = [pool_listener(pool_monitor), command_listener(slow_query_log)]
+    return AsyncIOMotorClient(mongo_url, event_listeners=listeners, **options)
+
+async def warm_pool(db, connections: int):
+    """Open connections before the first request instead of on it"""
+    await db.command("ping")
+    if connections > 1:
+        # Concurrent pings each need their own connection, so the pool grows to this size now
+        await asyncio.gather(*(db.command("ping") for _ in range(connections - 1)))
+    logging.info(f"MongoDB connection pool warmed with {connections} connections")
+
+class LazyDatabase:
+    """Motor database handle that creates its client on first use.
+
+    Attribute and item access are forwarded to the real database, so it can
+    be used wherever a Motor database is expected. Until then importing the
+    app costs neither the Motor import nor a client with its monitor threads.
+    """
+
+    def __init__(self, mongo_url: str, name: str):
+        self.mongo_url = mongo_url
+        self.name = name
+        self.client = None
+        self._database = None
+        # True once a ping has succeeded; until then a bootstrap snapshot may answer instead
+        self.connected = False
+        self._connecting: Optional[asyncio.Task] = None
+
+    def database(self):
+        if self._database is None:
+            self.client = create_client(self.mongo_url)
+            self._database = self.client[self.name]
+        return self._database
+
+    def __getattr__(self, name):
+        return getattr(self.database(), name)
+
+    def __getitem__(self, name):
+        return self.database()[name]
+
+    async def connect(self, connections: int = 1):
+        await warm_pool(self.database(), connections)
+        self.connected = True
+
+    def connect_in_background(self, connections: int = 1):
+        """Start connecting without waiting for it, once; a failed attempt is retried on the next call"""
+        if self.connected or (self._connecting is not None and not self._connecting.done()):
+            return
+        self._connecting = asyncio.create_task(self.connect(connections))
+        self._connecting.add_done_callback(self._connect_done)
+
+    def _connect_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Error connecting to MongoDB: {str(task.exception())}")
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
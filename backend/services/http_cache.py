@@ -0,0 +1,109 @@
+import os
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Union
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from services.compression import SUPPORTED_ENCODINGS, compress, negotiate_encoding
+
+# Browsers and CDNs may reuse a response for this long before revalidating with If-None-Match
+CACHE_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", 300))
+
+# Bodies smaller than this are sent uncompressed; below ~1KB the savings don't pay for the headers
+COMPRESSION_ENABLED = os.environ.get("HTTP_COMPRESSION", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.environ.get("HTTP_COMPRESSION_MIN_SIZE", 1024))
+
+class SerializedResponse:
+    """Final JSON bytes of an endpoint plus the validators derived from them.
+
+    Compressed variants are produced on first request for each encoding and
+    kept here, so they live exactly as long as the cached body they encode.
+    The body and variants may also be memoryviews into a shared snapshot.
+    """
+    __slots__ = ("body", "etag", "last_modified", "variants")
+
+    def __init__(self, body: Union[bytes, memoryview], last_modified: datetime, etag: Optional[str] = None):
+        self.body = body
+        self.etag = etag or '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.last_modified = last_modified.replace(microsecond=0)
+        self.variants = {}
+
+    def encoded(self, encoding: str) -> Union[bytes, memoryview]:
+        variant = self.variants.get(encoding)
+        if variant is None:
+            variant = self.variants[encoding] = compress(self.body, encoding)
+        return variant
+
+def latest_updated_at(value: Any) -> Optional[datetime]:
+    """Most recent updated_at found in a document, a list of documents or a dict of sections"""
+    if isinstance(value, list):
+        dates = [latest_updated_at(item) for item in value]
+    elif isinstance(value, dict):
+        updated_at = value.get("updated_at")
+        if isinstance(updated_at, datetime):
+            return updated_at
+        dates = [latest_updated_at(item) for item in value.values() if isinstance(item, (dict, list))]
+    else:
+        return None
+    dates = [d for d in dates if d is not None]
+    return max(dates) if dates else None
+
+def prepare(body: bytes, value: Any) -> SerializedResponse:
+    """Wrap already-encoded bytes of value with their ETag and Last-Modified"""
+    last_modified = latest_updated_at(value) or datetime.utcnow()
+    return SerializedResponse(body, last_modified.replace(tzinfo=timezone.utc))
+
+def serialize(value: Any, adapter: TypeAdapter) -> SerializedResponse:
+    """Validate once against the response model and encode it the way FastAPI would"""
+    return prepare(adapter.dump_json(adapter.validate_python(value), by_alias=True), value)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def is_not_modified(request: Request, serialized: SerializedResponse) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, serialized.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return serialized.last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+class BufferResponse(Response):
+    """Response that also takes a memoryview body and sends it as is, without copying it to bytes"""
+
+    def render(self, content: Any) -> Union[bytes, memoryview]:
+        if isinstance(content, memoryview):
+            return content
+        return super().render(content)
+
+def cached_json_response(request: Request, serialized: SerializedResponse) -> Response:
+    """Send the pre-serialized body, compressed when the client accepts it, or an empty 304 when it already has it"""
+    headers = {
+        "ETag": serialized.etag,
+        "Last-Modified": format_datetime(serialized.last_modified, usegmt=True),
+        "Cache-Control": f"public, max-age={CACHE_MAX_AGE}",
+    }
+    compressible = COMPRESSION_ENABLED and len(serialized.body) >= COMPRESSION_MIN_SIZE
+    if compressible:
+        headers["Vary"] = "Accept-Encoding"
+    if is_not_modified(request, serialized):
+        return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), SUPPORTED_ENCODINGS) if compressible else None
+    if encoding is None:
+        return BufferResponse(content=serialized.body, media_type="application/json", headers=headers)
+    # Compressed bytes differ from the identity body, so their validator is only weakly equal
+    headers["ETag"] = "W/" + serialized.etag
+    headers["Content-Encoding"] = encoding
+    return BufferResponse(content=serialized.encoded(encoding), media_type="application/json", headers=headers)
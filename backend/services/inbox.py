@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from pydantic import BaseModel, Field
+
+from models.contact_message import ContactMessage
+from services.pagination import find_page, keyset_query
+from services.serialization import DocumentShaper, dumps, projection_for
+from services.tenancy import DEFAULT_TENANT, Tenant
+
+# Newest first; _id breaks ties between messages received in the same millisecond
+INBOX_SORT = [("created_at", -1), ("_id", -1)]
+
+# Upper bound on ids per bulk request, keeping each $in small enough to stay an index lookup
+MAX_BULK_IDS = 1000
+
+_projection = projection_for(ContactMessage)
+_shape_message = DocumentShaper(ContactMessage)
+
+class ContactMessageBulkUpdate(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    is_read: bool = True
+
+class ContactMessageBulkDelete(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+
+def object_ids(ids: List[str]) -> List[ObjectId]:
+    """Parse message ids, raising ValueError for anything that is not an ObjectId"""
+    invalid = [i for i in ids if not ObjectId.is_valid(i)]
+    if invalid:
+        raise ValueError(f"Invalid message id: {invalid[0]}")
+    return [ObjectId(i) for i in ids]
+
+def inbox_query(tenant: Tenant = DEFAULT_TENANT, is_read: Optional[bool] = None,
+                since: Optional[datetime] = None, until: Optional[datetime] = None,
+                email: Optional[str] = None, after: Optional[str] = None) -> dict:
+    """Filter for one inbox page; each combination is served by a contact_messages index"""
+    query = {}
+    if is_read is not None:
+        query["is_read"] = is_read
+    if email:
+        query["email"] = email
+    if since or until:
+        query["created_at"] = {}
+        if since:
+            query["created_at"]["$gte"] = since
+        if until:
+            query["created_at"]["$lt"] = until
+    return keyset_query(tenant.scope(query), INBOX_SORT, after)
+
+async def list_messages(collection, query: dict, limit: int) -> Tuple[bytes, Optional[str]]:
+    """Serialized page of messages and the cursor of the following page"""
+    docs, next_cursor = await find_page(collection, query, _projection, INBOX_SORT, limit)
+    return dumps(_shape_message.many(docs)), next_cursor
+
+async def update_message(collection, tenant: Tenant, message_id: str, update: dict) -> Optional[dict]:
+    from pymongo import ReturnDocument
+
+    doc = await collection.find_one_and_update(
+        tenant.scope({"_id": object_ids([message_id])[0]}),
+        {"$set": update},
+        projection=_projection,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc and _shape_message(doc)
+
+async def mark_read(collection, tenant: Tenant, ids: List[str], is_read: bool = True) -> int:
+    """Set is_read on many messages in one update_many, returning how many actually changed"""
+    result = await collection.update_many(
+        # Skipping messages already in the target state keeps updated_at meaningful
+        tenant.scope({"_id": {"$in": object_ids(ids)}, "is_read": {"$ne": is_read}}),
+        {"$set": {"is_read": is_read, "updated_at": datetime.utcnow()}},
+    )
+    return result.modified_count
+
+async def delete_messages(collection, tenant: Tenant, ids: List[str]) -> int:
+    result = await collection.delete_many(tenant.scope({"_id": {"$in": object_ids(ids)}}))
+    return result.deleted_count
+
+async def unread_count(collection, tenant: Tenant = DEFAULT_TENANT) -> int:
+    """Unread messages, counted from the is_read index alone (a covered COUNT_SCAN, no documents read)"""
+    return await collection.count_documents(tenant.scope({"is_read": False}))
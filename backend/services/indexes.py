@@ -0,0 +1,194 @@
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+from services.tenancy import MULTI_TENANT
+
+# Indexes required by the queries the app issues, per collection
+INDEXES: Dict[str, List[IndexModel]] = {
+    'experiences': [
+        IndexModel([("is_active", ASCENDING), ("order", ASCENDING), ("_id", ASCENDING)],
+                   name="is_active_order_id"),
+    ],
+    'certifications': [
+        IndexModel([("order", ASCENDING), ("_id", ASCENDING)], name="order_id"),
+    ],
+    # Admin inbox: newest first, optionally filtered by read state or sender, paged by (created_at, _id)
+    'contact_messages': [
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id_desc"),
+        IndexModel([("is_read", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="is_read_created_at_id_desc"),
+        IndexModel([("email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="email_created_at_id_desc"),
+        IndexModel([("is_read", ASCENDING), ("email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="is_read_email_created_at_id_desc"),
+    ],
+    # Shared rate limit windows (RATE_LIMIT_BACKEND=mongo) expire on their own
+    'rate_limits': [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# Key specs of indexes replaced by the ones above; ensure_indexes drops plain indexes on exactly these
+# keys (or tenant_id followed by them), whatever they are named
+RETIRED_INDEXES: Dict[str, List[List[Tuple[str, int]]]] = {
+    'experiences': [[("is_active", ASCENDING), ("order", ASCENDING)]],
+    'certifications': [[("order", ASCENDING)]],
+    'contact_messages': [[("created_at", DESCENDING)], [("is_read", ASCENDING), ("created_at", DESCENDING)]],
+}
+
+# Index options that make an index more than a lookup structure; such indexes are never dropped as retired
+CONSTRAINING_OPTIONS = ("unique", "partialFilterExpression", "expireAfterSeconds", "sparse")
+
+# Change polling (services/change_watcher.py) looks up recently updated documents of every tenant at once
+CHANGE_POLL_COLLECTIONS = [
+    'personal_info', 'experiences', 'skills', 'education',
+    'certifications', 'languages', 'collection_versions'
+]
+for _name in CHANGE_POLL_COLLECTIONS:
+    INDEXES.setdefault(_name, []).append(IndexModel([("updated_at", DESCENDING)], name="updated_at_desc"))
+
+# Indexes kept as declared in multi-tenant mode, for queries spanning all tenants
+CROSS_TENANT_INDEXES = {"updated_at_desc"}
+
+class QueryShape(NamedTuple):
+    collection: str
+    equality: Tuple[str, ...] = ()
+    sort: Tuple[Tuple[str, int], ...] = ()
+    cross_tenant: bool = False
+
+# Every filtered or sorted query in the app; keep in sync with services/portfolio.py and services/inbox.py
+QUERY_SHAPES: List[QueryShape] = [
+    QueryShape('experiences', equality=('is_active',), sort=(('order', ASCENDING),)),
+    QueryShape('certifications', sort=(('order', ASCENDING),)),
+    # Keyset pagination adds _id as a tie-breaker
+    QueryShape('experiences', equality=('is_active',), sort=(('order', ASCENDING), ('_id', ASCENDING))),
+    QueryShape('certifications', sort=(('order', ASCENDING), ('_id', ASCENDING))),
+    QueryShape('languages', sort=(('_id', ASCENDING),)),
+    # Admin inbox (services/inbox.py); created_at date ranges ride on the sort key
+    QueryShape('contact_messages', sort=(('created_at', DESCENDING), ('_id', DESCENDING))),
+    QueryShape('contact_messages', equality=('is_read',), sort=(('created_at', DESCENDING), ('_id', DESCENDING))),
+    QueryShape('contact_messages', equality=('email',), sort=(('created_at', DESCENDING), ('_id', DESCENDING))),
+    QueryShape('contact_messages', equality=('is_read', 'email'),
+               sort=(('created_at', DESCENDING), ('_id', DESCENDING))),
+    QueryShape('contact_messages', equality=('is_read',)),
+    # Change polling; the updated_at range rides on the sort key
+] + [QueryShape(name, sort=(('updated_at', DESCENDING),), cross_tenant=True) for name in CHANGE_POLL_COLLECTIONS]
+
+# Mongo creates this index on every collection
+ID_INDEX = IndexModel([("_id", ASCENDING)], name="_id_")
+
+# Collections whose documents carry a tenant_id in multi-tenant mode
+TENANT_SCOPED_COLLECTIONS = [
+    'personal_info', 'experiences', 'skills', 'education',
+    'certifications', 'languages', 'contact_messages'
+]
+
+def index_keys(index: IndexModel) -> List[Tuple[str, int]]:
+    return list(index.document["key"].items())
+
+def tenant_scoped(index: IndexModel) -> IndexModel:
+    """The same index led by tenant_id, so every tenant's queries stay within its own key range"""
+    options = {k: v for k, v in index.document.items() if k not in ("key", "name")}
+    keys = [("tenant_id", ASCENDING)] + index_keys(index)
+    return IndexModel(keys, name=f"tenant_id_{index.document['name']}", **options)
+
+def declared_indexes() -> Dict[str, List[IndexModel]]:
+    if not MULTI_TENANT:
+        return INDEXES
+    indexes = {
+        name: [
+            tenant_scoped(index)
+            if name in TENANT_SCOPED_COLLECTIONS and index.document["name"] not in CROSS_TENANT_INDEXES
+            else index
+            for index in models
+        ]
+        for name, models in INDEXES.items()
+    }
+    for name in TENANT_SCOPED_COLLECTIONS:
+        # Collections read by tenant alone (find_one, unsorted find) need at least this one
+        indexes.setdefault(name, []).append(
+            IndexModel([("tenant_id", ASCENDING), ("_id", ASCENDING)], name="tenant_id_id")
+        )
+    return indexes
+
+def declared_query_shapes() -> List[QueryShape]:
+    if not MULTI_TENANT:
+        return QUERY_SHAPES
+    shapes = [
+        shape._replace(equality=('tenant_id',) + shape.equality)
+        if shape.collection in TENANT_SCOPED_COLLECTIONS and not shape.cross_tenant else shape
+        for shape in QUERY_SHAPES
+    ]
+    shapes += [QueryShape(name, equality=('tenant_id',)) for name in ('personal_info', 'skills', 'education')]
+    return shapes
+
+def covers(keys: List[Tuple[str, int]], shape: QueryShape) -> bool:
+    """True when an index can serve the equality filter and the sort without an in-memory SORT"""
+    prefix = keys[:len(shape.equality)]
+    if {field for field, _ in prefix} != set(shape.equality):
+        return False
+    sort_keys = keys[len(shape.equality):len(shape.equality) + len(shape.sort)]
+    if len(sort_keys) != len(shape.sort):
+        return False
+    # An index can be walked in either direction, so a fully reversed sort also matches
+    forward = all(k == s for k, s in zip(sort_keys, shape.sort))
+    backward = all(k == (field, -direction) for k, (field, direction) in zip(sort_keys, shape.sort))
+    return forward or backward
+
+def uncovered_queries(indexes: Optional[Dict[str, List[IndexModel]]] = None,
+                      shapes: Optional[List[QueryShape]] = None) -> List[QueryShape]:
+    """Query shapes that no declared index serves"""
+    indexes = declared_indexes() if indexes is None else indexes
+    shapes = declared_query_shapes() if shapes is None else shapes
+    return [
+        shape for shape in shapes
+        if not any(covers(index_keys(index), shape)
+                   for index in indexes.get(shape.collection, []) + [ID_INDEX])
+    ]
+
+def is_retired(keys: List[Tuple[str, int]], info: dict, retired: List[List[Tuple[str, int]]]) -> bool:
+    if any(option in info for option in CONSTRAINING_OPTIONS):
+        return False
+    # index_information() may report directions as floats
+    keys = [(field, int(direction)) for field, direction in keys]
+    return any(keys in (spec, [("tenant_id", ASCENDING)] + spec) for spec in retired)
+
+async def drop_retired_indexes(db) -> List[str]:
+    """Drop indexes matching RETIRED_INDEXES that still exist, returning "<collection>.<index>" for each"""
+    dropped = []
+    for collection_name, retired in RETIRED_INDEXES.items():
+        existing = await db[collection_name].index_information()
+        for name, info in existing.items():
+            if is_retired(info["key"], info, retired):
+                await db[collection_name].drop_index(name)
+                dropped.append(f"{collection_name}.{name}")
+    if dropped:
+        logging.info(f"Dropped retired indexes: {', '.join(dropped)}")
+    return dropped
+
+async def ensure_indexes(db) -> List[QueryShape]:
+    """Create the declared indexes (a no-op for ones that already exist), drop retired ones and report uncovered queries"""
+    try:
+        await drop_retired_indexes(db)
+    except PyMongoError as e:
+        # Not a reason to skip creating the indexes below
+        logging.error(f"Error dropping retired indexes: {str(e)}")
+
+    for collection_name, indexes in declared_indexes().items():
+        try:
+            created = await db[collection_name].create_indexes(indexes)
+            logging.info(f"Ensured indexes on {collection_name}: {', '.join(created)}")
+        except OperationFailure as e:
+            # Usually an existing index with the same name but different keys or options
+            logging.error(f"Error creating indexes on {collection_name}: {str(e)}")
+
+    uncovered = uncovered_queries()
+    for shape in uncovered:
+        logging.warning(
+            f"Query on {shape.collection} filtering {list(shape.equality)} "
+            f"sorted by {list(shape.sort)} is not covered by any index"
+        )
+    return uncovered
@@ -0,0 +1,187 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond cache hits up to slow Mongo round-trips
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, *labels: str, value: float):
+        """Overwrite the value, for counters copied from elsewhere by a collector"""
+        self.values[labels] = value
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {value}" for labels, value in self.values.items()
+        ]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # Per label set: [count per bucket (+Inf last), sum]
+        self.values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Callback refreshing gauges right before each scrape"""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            collector()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"))
+mongo_query_duration = registry.register(Histogram(
+    "mongo_query_duration_seconds", "Time spent waiting on MongoDB queries", ("collection",)))
+sqlite_query_duration = registry.register(Histogram(
+    "sqlite_query_duration_seconds", "Time spent reading the embedded SQLite portfolio", ("collection",)))
+serialization_duration = registry.register(Histogram(
+    "serialization_duration_seconds", "Time spent encoding response bodies", ("endpoint",)))
+cache_lookups = registry.register(Counter(
+    "portfolio_cache_lookups_total", "Read-through cache lookups by result", ("result",)))
+cache_loads = registry.register(Counter(
+    "portfolio_cache_loads_total", "Loads started on a miss, joined by a concurrent miss, or refreshing a stale entry",
+    ("kind",)))
+cache_hit_ratio = registry.register(Gauge(
+    "portfolio_cache_hit_ratio", "Share of cache lookups served without a database round-trip"))
+cache_entries = registry.register(Gauge(
+    "portfolio_cache_entries", "Entries currently held by the read-through cache"))
+
+def collect_cache_stats():
+    from services.cache import portfolio_cache
+
+    stats = portfolio_cache.stats()
+    cache_lookups.set("hit", value=stats["hits"])
+    cache_lookups.set("stale", value=stats["stale_hits"])
+    cache_lookups.set("miss", value=stats["misses"])
+    cache_loads.set("started", value=stats["misses"] - stats["coalesced"])
+    cache_loads.set("coalesced", value=stats["coalesced"])
+    cache_loads.set("refresh", value=stats["refreshes"])
+    cache_hit_ratio.set(value=stats["hit_ratio"])
+    cache_entries.set(value=stats["entries"])
+
+registry.add_collector(collect_cache_stats)
+
+@contextmanager
+def timed(histogram: Histogram, *labels: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, *labels)
+
+class MetricsMiddleware:
+    """Records request counts, latency and in-flight requests per route template.
+
+    Routes are labelled by their path template (/api/experiences), never the
+    raw URL, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            route = scope.get("route")
+            route_path: Optional[str] = getattr(route, "path", None) or "unmatched"
+            http_requests.inc(scope["method"], route_path, status)
+            http_request_duration.observe(elapsed, scope["method"], route_path)
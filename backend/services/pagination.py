@@ -0,0 +1,58 @@
+import base64
+import binascii
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from bson import json_util
+
+from services.serialization import dumps
+
+# Upper bound for the limit query parameter of list endpoints
+MAX_PAGE_SIZE = 500
+
+SortFields = List[Tuple[str, int]]
+
+def encode_cursor(doc: dict, sort: SortFields) -> str:
+    """Opaque cursor holding the sort key values of the last document on a page"""
+    values = [doc.get(field) for field, _ in sort]
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str, sort: SortFields) -> List[Any]:
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise ValueError("Invalid cursor")
+    return values
+
+def after_filter(values: List[Any], sort: SortFields) -> dict:
+    """Filter selecting documents strictly after values in the given sort order"""
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+def keyset_query(query: dict, sort: SortFields, after: Optional[str]) -> dict:
+    """Combine query with the keyset condition for after; raises ValueError for a bad cursor"""
+    return resume_query(query, sort, decode_cursor(after, sort) if after else None)
+
+def resume_query(query: dict, sort: SortFields, values: Optional[List[Any]]) -> dict:
+    """Combine query with the condition selecting documents after already decoded cursor values"""
+    if values is None:
+        return query
+    keyset = after_filter(values, sort)
+    return {"$and": [query, keyset]} if query else keyset
+
+async def find_page(collection, query: dict, projection: Optional[dict], sort: SortFields,
+                    limit: int) -> Tuple[List[dict], Optional[str]]:
+    """One page of documents plus the cursor for the next page (None on the last page)"""
+    docs = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1], sort) if len(docs) > limit else None
+    return docs[:limit], next_cursor
+
+async def iter_ndjson(docs: AsyncIterator[dict], shape: Callable[[dict], dict]) -> AsyncIterator[bytes]:
+    """Yield one JSON line per document as the backend delivers them"""
+    async for doc in docs:
+        yield dumps(shape(doc)) + b"\n"
@@ -0,0 +1,389 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import TypeAdapter
+
+from models.personal_info import PersonalInfo
+from models.experience import Experience
+from models.education import Education
+from models.certification import Certification
+from models.language import Language
+from models.portfolio import Portfolio
+from models.skills import Skills
+from services.bootstrap import bootstrap_response
+from services.cache import portfolio_cache
+from services.http_cache import SerializedResponse, prepare, serialize
+from services.metrics import serialization_duration, timed
+from services.pagination import SortFields, decode_cursor, iter_ndjson
+from services.serialization import FAST_SERIALIZATION, DocumentShaper, dumps, projection_for
+from services.shared_snapshot import shared_response
+from services.tenancy import DEFAULT_TENANT, Tenant
+
+# Collections that make up the public portfolio document
+PORTFOLIO_COLLECTIONS = [
+    'personal_info', 'experiences', 'skills', 'education',
+    'certifications', 'languages'
+]
+
+# Only fetch the fields the response models expose
+PROJECTIONS = {
+    'personal_info': projection_for(PersonalInfo),
+    'experiences': projection_for(Experience),
+    'skills': projection_for(Skills),
+    'education': projection_for(Education),
+    'certifications': projection_for(Certification),
+    'languages': projection_for(Language),
+}
+
+# Utility function to convert MongoDB document to dict
+def convert_objectid_to_str(doc):
+    if doc and "_id" in doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+def group_skills(skills):
+    """Group skill documents into the professional/technical/technology/soft structure"""
+    grouped_skills = {
+        "professional": [],
+        "technical": [],
+        "technology": [],
+        "soft": {
+            "social": [],
+            "process": [],
+            "generic": []
+        }
+    }
+
+    for skill_doc in skills:
+        category = skill_doc["category"]
+        skills_list = skill_doc["skills"]
+
+        if category == "soft":
+            subcategory = skill_doc.get("subcategory", "generic")
+            grouped_skills["soft"][subcategory] = skills_list
+        else:
+            grouped_skills[category] = skills_list
+
+    return grouped_skills
+
+# The grouped skills structure, one document per tenant, rewritten whenever skills change
+SKILLS_VIEW_COLLECTION = 'skills_grouped'
+
+SKILL_CATEGORIES = ("professional", "technical", "technology", "soft")
+SOFT_SKILL_SUBCATEGORIES = ("social", "process", "generic")
+
+class SkillsViewTracker:
+    """Which tenants' skills views this process has rebuilt since their skills last changed.
+
+    Writers here call refresh_skills_view themselves, but skills edited
+    elsewhere (another process, a direct database edit) only show up as
+    cache invalidations; load_skills rebuilds a view older than the last one.
+    """
+
+    def __init__(self):
+        self.everyone = 0
+        self.changes: Dict[Optional[str], int] = {}
+        self.built: Dict[Optional[str], tuple] = {}
+
+    def invalidated(self, collection: Optional[str] = None, tenant_id: Optional[str] = None):
+        """Invalidation listener: a None tenant covers every tenant"""
+        if collection not in (None, 'skills'):
+            return
+        if tenant_id is None:
+            self.everyone += 1
+        else:
+            self.changes[tenant_id] = self.changes.get(tenant_id, 0) + 1
+
+    def version(self, tenant: Tenant) -> tuple:
+        return self.everyone, self.changes.get(tenant.id, 0)
+
+    def is_current(self, tenant: Tenant) -> bool:
+        return self.built.get(tenant.id) == self.version(tenant)
+
+skills_views = SkillsViewTracker()
+portfolio_cache.add_invalidation_listener(skills_views.invalidated)
+
+async def read_skills(db, tenant: Tenant = DEFAULT_TENANT, session=None):
+    """Group the tenant's skill documents straight from the skills collection, leaving the view alone"""
+    skills = await db.skills.find(tenant.scope(), PROJECTIONS['skills'], session=session).to_list(None)
+    return group_skills(skills)
+
+async def refresh_skills_view(db, tenant: Tenant = DEFAULT_TENANT, session=None):
+    """Regroup the tenant's skill documents and store the result; call after any write to skills"""
+    grouped = await read_skills(db, tenant, session)
+    await db[SKILLS_VIEW_COLLECTION].replace_one(
+        {"_id": tenant.cache_key("skills")},
+        tenant.stamp({"grouped": grouped, "updated_at": datetime.utcnow()}),
+        upsert=True,
+        session=session,
+    )
+    return grouped
+
+def filter_skills(grouped: dict, category: Optional[str] = None, subcategory: Optional[str] = None) -> dict:
+    """Narrow the grouped skills to one category, and for soft skills one subcategory, keeping the shape"""
+    if subcategory is not None:
+        return {"soft": {subcategory: grouped["soft"].get(subcategory, [])}}
+    if category is not None:
+        return {category: grouped.get(category, [])}
+    return grouped
+
+# Raw queries, one Mongo round-trip each
+async def load_personal_info(db, tenant: Tenant = DEFAULT_TENANT):
+    return convert_objectid_to_str(
+        await db.personal_info.find_one(tenant.scope(), PROJECTIONS['personal_info'])
+    )
+
+async def load_experiences(db, tenant: Tenant = DEFAULT_TENANT):
+    experiences = await db.experiences.find(
+        tenant.scope({"is_active": True}), PROJECTIONS['experiences']
+    ).sort("order", 1).to_list(None)
+    return [convert_objectid_to_str(exp) for exp in experiences]
+
+async def load_skills(db, tenant: Tenant = DEFAULT_TENANT):
+    """Read the grouping materialized by refresh_skills_view, rebuilding it once per process and after changes"""
+    if skills_views.is_current(tenant):
+        view = await db[SKILLS_VIEW_COLLECTION].find_one({"_id": tenant.cache_key("skills")}, {"grouped": 1})
+        if view is not None:
+            return view["grouped"]
+    # Taken before reading, so a change landing mid-rebuild leaves the view stale for next time
+    version = skills_views.version(tenant)
+    grouped = await refresh_skills_view(db, tenant)
+    skills_views.built[tenant.id] = version
+    return grouped
+
+async def load_education(db, tenant: Tenant = DEFAULT_TENANT):
+    return convert_objectid_to_str(
+        await db.education.find_one(tenant.scope(), PROJECTIONS['education'])
+    )
+
+async def load_certifications(db, tenant: Tenant = DEFAULT_TENANT):
+    certifications = await db.certifications.find(
+        tenant.scope(), PROJECTIONS['certifications']
+    ).sort("order", 1).to_list(None)
+    return [convert_objectid_to_str(cert) for cert in certifications]
+
+async def load_languages(db, tenant: Tenant = DEFAULT_TENANT):
+    languages = await db.languages.find(tenant.scope(), PROJECTIONS['languages']).to_list(None)
+    return [convert_objectid_to_str(lang) for lang in languages]
+
+# The MongoDB implementation of each section, used by MongoRepository
+SECTION_LOADERS = {
+    "personal_info": load_personal_info,
+    "experiences": load_experiences,
+    "skills": load_skills,
+    "education": load_education,
+    "certifications": load_certifications,
+    "languages": load_languages,
+}
+
+# Read-through accessors shared by the individual endpoints and the portfolio snapshot,
+# each partitioned by tenant; repository is any backend from services/repository.py
+async def _cached(name: str, repository, tenant: Tenant):
+    async def load():
+        with timed(repository.query_duration, name):
+            return await repository.load(name, tenant)
+
+    return await portfolio_cache.get_or_load(tenant.cache_key(name), load, [name], tenant.id)
+
+async def fetch_personal_info(repository, tenant: Tenant = DEFAULT_TENANT):
+    return await _cached("personal_info", repository, tenant)
+
+async def fetch_experiences(repository, tenant: Tenant = DEFAULT_TENANT):
+    return await _cached("experiences", repository, tenant)
+
+async def fetch_skills(repository, tenant: Tenant = DEFAULT_TENANT):
+    return await _cached("skills", repository, tenant)
+
+async def fetch_education(repository, tenant: Tenant = DEFAULT_TENANT):
+    return await _cached("education", repository, tenant)
+
+async def fetch_certifications(repository, tenant: Tenant = DEFAULT_TENANT):
+    return await _cached("certifications", repository, tenant)
+
+async def fetch_languages(repository, tenant: Tenant = DEFAULT_TENANT):
+    return await _cached("languages", repository, tenant)
+
+async def build_portfolio(repository, tenant: Tenant = DEFAULT_TENANT):
+    """Run every section query concurrently and assemble the portfolio document"""
+    personal, experiences, skills, education, certifications, languages = await asyncio.gather(
+        fetch_personal_info(repository, tenant),
+        fetch_experiences(repository, tenant),
+        fetch_skills(repository, tenant),
+        fetch_education(repository, tenant),
+        fetch_certifications(repository, tenant),
+        fetch_languages(repository, tenant),
+    )
+    return {
+        "personal": personal,
+        "experiences": experiences,
+        "skills": skills,
+        "education": education,
+        "certifications": certifications,
+        "languages": languages,
+    }
+
+class PortfolioSnapshot:
+    """Portfolio document assembled once and reused until a collection changes.
+
+    The snapshot is stored in the read-through cache as an entry depending on
+    every portfolio collection, so invalidating any of them (or its TTL
+    expiring) forces a rebuild; sections that are still cached are reused.
+    """
+
+    key = "portfolio"
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    async def get(self, repository, tenant: Tenant = DEFAULT_TENANT):
+        return await self.cache.get_or_load(
+            tenant.cache_key(self.key), lambda: build_portfolio(repository, tenant),
+            PORTFOLIO_COLLECTIONS, tenant.id
+        )
+
+    def invalidate(self, collection: Optional[str] = None, tenant: Tenant = DEFAULT_TENANT):
+        self.cache.invalidate(collection, tenant.id)
+
+portfolio_snapshot = PortfolioSnapshot(portfolio_cache)
+
+# Response models per endpoint, used to validate and encode each payload once
+RESPONSE_ADAPTERS = {
+    "personal_info": TypeAdapter(PersonalInfo),
+    "experiences": TypeAdapter(List[Experience]),
+    "skills": TypeAdapter(Dict[str, object]),
+    "education": TypeAdapter(Education),
+    "certifications": TypeAdapter(List[Certification]),
+    "languages": TypeAdapter(List[Language]),
+    "portfolio": TypeAdapter(Portfolio),
+}
+
+# Fast-path equivalents producing the same shape without model instantiation
+_shape_personal_info = DocumentShaper(PersonalInfo)
+_shape_experiences = DocumentShaper(Experience)
+_shape_education = DocumentShaper(Education)
+_shape_certifications = DocumentShaper(Certification)
+_shape_languages = DocumentShaper(Language)
+
+def _shape_portfolio(portfolio):
+    return {
+        "personal": portfolio["personal"] and _shape_personal_info(portfolio["personal"]),
+        "experiences": _shape_experiences.many(portfolio["experiences"]),
+        "skills": portfolio["skills"],
+        "education": portfolio["education"] and _shape_education(portfolio["education"]),
+        "certifications": _shape_certifications.many(portfolio["certifications"]),
+        "languages": _shape_languages.many(portfolio["languages"]),
+    }
+
+FAST_SHAPERS = {
+    "personal_info": _shape_personal_info,
+    "experiences": _shape_experiences.many,
+    "skills": lambda skills: skills,
+    "education": _shape_education,
+    "certifications": _shape_certifications.many,
+    "languages": _shape_languages.many,
+    "portfolio": _shape_portfolio,
+}
+
+SECTION_FETCHERS = {
+    "personal_info": fetch_personal_info,
+    "experiences": fetch_experiences,
+    "skills": fetch_skills,
+    "education": fetch_education,
+    "certifications": fetch_certifications,
+    "languages": fetch_languages,
+    "portfolio": portfolio_snapshot.get,
+}
+
+def response_collections(name: str) -> List[str]:
+    """Collections an endpoint's response is built from"""
+    return PORTFOLIO_COLLECTIONS if name == "portfolio" else [name]
+
+async def fetch_serialized(name: str, repository, tenant: Tenant = DEFAULT_TENANT) -> Optional[SerializedResponse]:
+    """Serialized response bytes for an endpoint, or None when there is no document"""
+    bootstrapped = bootstrap_response(name, repository, tenant)
+    if bootstrapped is not None:
+        return bootstrapped
+    shared = shared_response(name, tenant, response_collections(name))
+    if shared is not None:
+        return shared
+    return await load_serialized(name, repository, tenant)
+
+async def load_serialized(name: str, repository, tenant: Tenant = DEFAULT_TENANT) -> Optional[SerializedResponse]:
+    """fetch_serialized from this process's own cache, bypassing the bundled and shared snapshots"""
+    async def load():
+        value = await SECTION_FETCHERS[name](repository, tenant)
+        if value is None:
+            return None
+        with timed(serialization_duration, name):
+            if FAST_SERIALIZATION:
+                return prepare(dumps(FAST_SHAPERS[name](value)), value)
+            return serialize(value, RESPONSE_ADAPTERS[name])
+
+    return await portfolio_cache.get_or_load(tenant.cache_key(f"{name}:json"), load, response_collections(name),
+                                             tenant.id)
+
+async def serialized_sections(repository, tenant: Tenant = DEFAULT_TENANT) -> Dict[str, SerializedResponse]:
+    """Every section endpoint's current response, skipping those without a document"""
+    responses = {}
+    for name in SECTION_FETCHERS:
+        serialized = await load_serialized(name, repository, tenant)
+        if serialized is not None:
+            responses[name] = serialized
+    return responses
+
+async def fetch_skills_serialized(repository, tenant: Tenant = DEFAULT_TENANT, category: Optional[str] = None,
+                                  subcategory: Optional[str] = None) -> SerializedResponse:
+    """Serialized skills narrowed by category/subcategory, cut from the cached grouping"""
+    if category is None and subcategory is None:
+        return await fetch_serialized("skills", repository, tenant)
+
+    async def load():
+        value = filter_skills(await fetch_skills(repository, tenant), category, subcategory)
+        with timed(serialization_duration, "skills"):
+            if FAST_SERIALIZATION:
+                return prepare(dumps(value), value)
+            return serialize(value, RESPONSE_ADAPTERS["skills"])
+
+    key = tenant.cache_key(f"skills:{category}:{subcategory}:json")
+    return await portfolio_cache.get_or_load(key, load, ["skills"], tenant.id)
+
+class ListQuery:
+    """Filter, keyset sort order and fast-path shaper of a paginated list endpoint"""
+
+    def __init__(self, collection: str, query: dict, sort: SortFields, shape: DocumentShaper):
+        self.collection = collection
+        self.query = query
+        self.sort = sort
+        self.shape = shape
+
+# The trailing _id makes the sort order total, so cursors never skip or repeat documents
+LIST_QUERIES = {
+    "experiences": ListQuery('experiences', {"is_active": True}, [("order", 1), ("_id", 1)], _shape_experiences),
+    "certifications": ListQuery('certifications', {}, [("order", 1), ("_id", 1)], _shape_certifications),
+    "languages": ListQuery('languages', {}, [("_id", 1)], _shape_languages),
+}
+
+def list_cursor(name: str, after: Optional[str] = None) -> Optional[List[Any]]:
+    """Sort key values a list endpoint resumes after; raises ValueError for a bad cursor"""
+    return decode_cursor(after, LIST_QUERIES[name].sort) if after else None
+
+def serialize_documents(name: str, docs: List[dict]) -> bytes:
+    """Encode a list of documents exactly like the cached full-list response"""
+    if FAST_SERIALIZATION:
+        return dumps(LIST_QUERIES[name].shape.many(docs))
+    docs = [convert_objectid_to_str(doc) for doc in docs]
+    adapter = RESPONSE_ADAPTERS[name]
+    return adapter.dump_json(adapter.validate_python(docs), by_alias=True)
+
+async def fetch_page(name: str, repository, tenant: Tenant, after: Optional[List[Any]], limit: int):
+    """Serialized page of a list endpoint and the cursor of the following page"""
+    with timed(repository.query_duration, LIST_QUERIES[name].collection):
+        docs, next_cursor = await repository.page(name, tenant, after, limit)
+    with timed(serialization_duration, name):
+        return serialize_documents(name, docs), next_cursor
+
+def stream_documents(name: str, repository, tenant: Tenant, after: Optional[List[Any]] = None,
+                     limit: Optional[int] = None):
+    """NDJSON byte stream of a list endpoint, encoded as the backend delivers documents"""
+    return iter_ndjson(repository.stream(name, tenant, after, limit), LIST_QUERIES[name].shape)
@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.metrics import Histogram, registry
+
+# Queries slower than this are logged and aggregated by shape on /api/admin/slow-queries
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 100))
+# Capture the explain() plan of each slow query shape (queryPlanner only, nothing is re-run)
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+SLOW_QUERY_MAX_SHAPES = int(os.environ.get("SLOW_QUERY_MAX_SHAPES", 500))
+
+# Commands that read through the query planner; getMore is left out since it only continues
+# a cursor (and the change stream's getMore waits on purpose)
+QUERY_COMMANDS = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+# Command fields explain rejects or that describe the session rather than the query
+SESSION_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+# Plans can change as data and indexes do; a shape still slow after this long is explained again
+PLAN_TTL = 600
+EXPLAIN_INTERVAL = 1.0
+
+mongo_command_duration = registry.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB query command duration as seen by the driver",
+    ("command", "collection")))
+
+def value_shape(value: Any) -> Any:
+    """Filter with every value replaced by "?", keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: value_shape(v) for key, v in value.items()}
+    # $and/$or/$nor hold clauses; any other list ($in, $all, ...) is a value
+    if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+        return [value_shape(v) for v in value]
+    return "?"
+
+def stage_shape(stage: dict) -> dict:
+    # $sort and $project specs are structure, not values
+    return {name: body if name in ("$sort", "$project") else value_shape(body) for name, body in stage.items()}
+
+def query_shape(command_name: str, command: dict) -> dict:
+    """What identifies a query regardless of its values: filter structure, sort, pipeline"""
+    if command_name == "find":
+        return {"filter": value_shape(command.get("filter", {})), "sort": command.get("sort")}
+    if command_name == "aggregate":
+        return {"pipeline": [stage_shape(stage) for stage in command.get("pipeline", [])]}
+    if command_name == "distinct":
+        return {"key": command.get("key"), "query": value_shape(command.get("query", {}))}
+    if command_name == "findAndModify":
+        return {"query": value_shape(command.get("query", {})), "sort": command.get("sort")}
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        return {"q": value_shape(statements[0].get("q", {}))}
+    return {"query": value_shape(command.get("query", {}))}
+
+def plan_summary(explain: dict) -> dict:
+    """Stages and indexes of the winning plan, flagging collection scans and in-memory sorts"""
+    stages, indexes = [], []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                # The echoed command would show the query's own $sort; rejected plans never ran
+                if key in ("command", "rejectedPlans", "serverInfo", "serverParameters"):
+                    continue
+                if key == "stage":
+                    stages.append(value)
+                elif key == "indexName":
+                    indexes.append(value)
+                elif key == "$sort":
+                    # A $sort left in the pipeline is sorted in memory after the query stage
+                    stages.append("$sort")
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(explain)
+    flags = []
+    if "COLLSCAN" in stages:
+        flags.append("COLLSCAN")
+    if "SORT" in stages or "$sort" in stages:
+        flags.append("in-memory SORT")
+    return {"stages": stages, "indexes": list(dict.fromkeys(indexes)), "flags": flags}
+
+class ShapeStats:
+    __slots__ = ("command", "collection", "shape", "count", "total_ms", "max_ms", "last_ms",
+                 "last_seen", "plan", "explained_at")
+
+    def __init__(self, command: str, collection: str, shape: str):
+        self.command = command
+        self.collection = collection
+        self.shape = shape
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.last_seen: Optional[datetime] = None
+        self.plan: Optional[dict] = None
+        self.explained_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "command": self.command,
+            "collection": self.collection,
+            "shape": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "last_ms": round(self.last_ms, 1),
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "plan": self.plan,
+        }
+
+class SlowQueryLog:
+    """Times every query command from PyMongo's command monitoring events.
+
+    Each duration goes to mongo_command_duration_seconds; those over
+    threshold_ms are logged and aggregated by shape, the command with its
+    values taken out, so one slow lookup pattern shows up once however many
+    tenants or ids it ran with. Shapes are explained in the background (the
+    listener runs on the driver's threads, where nothing can be awaited)
+    and their plans kept alongside the timings.
+    """
+
+    def __init__(self, threshold_ms: float = 100, explain: bool = True, max_shapes: int = 500):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.max_shapes = max_shapes
+        self.shapes: Dict[str, ShapeStats] = {}
+        self._lock = threading.Lock()
+        self._started: Dict[Tuple[Any, int], Tuple[str, dict]] = {}
+        self._pending: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    # Driver events
+
+    def started(self, event):
+        if event.command_name in QUERY_COMMANDS:
+            with self._lock:
+                self._started[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        # Failed queries count too: a query killed by maxTimeMS is the slowest kind
+        self._finished(event)
+
+    def _finished(self, event):
+        if event.command_name not in QUERY_COMMANDS:
+            return
+        with self._lock:
+            started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        database, command = started
+        collection = str(command.get(event.command_name))
+        duration_ms = event.duration_micros / 1000
+        with self._lock:
+            mongo_command_duration.observe(duration_ms / 1000, event.command_name, collection)
+        if duration_ms >= self.threshold_ms:
+            self.record(event.command_name, database, collection, command, duration_ms)
+
+    def record(self, command_name: str, database: str, collection: str, command: dict, duration_ms: float):
+        shape = json.dumps(query_shape(command_name, command), default=str)
+        with self._lock:
+            stats = self.shapes.get(shape)
+            if stats is None:
+                if len(self.shapes) >= self.max_shapes:
+                    # Make room by forgetting the shape that has cost the least so far
+                    del self.shapes[min(self.shapes, key=lambda s: self.shapes[s].total_ms)]
+                stats = self.shapes[shape] = ShapeStats(command_name, collection, shape)
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.last_ms = duration_ms
+            stats.last_seen = datetime.utcnow()
+            explain_due = self.explain and (stats.explained_at is None or time.monotonic() - stats.explained_at >= PLAN_TTL)
+            if explain_due:
+                # Claimed now so concurrent slow runs of the shape queue one explain between them
+                stats.explained_at = time.monotonic()
+                self._pending.append((stats, database, command))
+        flags = f" [{', '.join(stats.plan['flags'])}]" if stats.plan and stats.plan["flags"] else ""
+        logging.warning(f"Slow query ({duration_ms:.0f} ms) {command_name} {collection}: {shape}{flags}")
+
+    # Explain plans
+
+    async def explain_plan(self, db, stats: ShapeStats, database: str, command: dict):
+        explained = {key: value for key, value in command.items()
+                     if not key.startswith("$") and key not in SESSION_FIELDS}
+        result = await db.client[database].command({"explain": explained, "verbosity": "queryPlanner"})
+        stats.plan = plan_summary(result)
+        logging.warning(
+            f"Plan of slow {stats.command} {stats.collection}: {' <- '.join(stats.plan['stages']) or 'unknown'}"
+            f"{' using ' + ', '.join(stats.plan['indexes']) if stats.plan['indexes'] else ''}"
+            f"{' [' + ', '.join(stats.plan['flags']) + ']' if stats.plan['flags'] else ''}"
+        )
+
+    async def _run(self, db):
+        while True:
+            while self._pending:
+                stats, database, command = self._pending.popleft()
+                try:
+                    await self.explain_plan(db, stats, database, command)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"Error explaining slow query: {str(e)}")
+            await asyncio.sleep(EXPLAIN_INTERVAL)
+
+    def start(self, db):
+        if self._task is None and self.explain:
+            self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    # Reporting
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List[dict]:
+        with self._lock:
+            shapes = sorted(self.shapes.values(), key=lambda s: getattr(s, order_by), reverse=True)[:limit]
+            return [stats.to_dict() for stats in shapes]
+
+    def reset(self):
+        with self._lock:
+            self.shapes.clear()
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_MS, explain=SLOW_QUERY_EXPLAIN, max_shapes=SLOW_QUERY_MAX_SHAPES)
+
+def command_listener(log: SlowQueryLog):
+    """Driver-side listener forwarding command events to log; see database.pool_listener for why"""
+    from pymongo import monitoring
+
+    class CommandListener(monitoring.CommandListener):
+        pass
+
+    for name in ("started", "succeeded", "failed"):
+        setattr(CommandListener, name, staticmethod(getattr(log, name)))
+    return CommandListener()
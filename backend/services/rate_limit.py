@@ -0,0 +1,124 @@
+import os
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException
+
+class RateLimitStore(ABC):
+    """Backend interface: record one hit for key and say how long the caller must wait.
+
+    hit() returns 0 when the request is allowed, otherwise the number of
+    seconds until it would be. Implementations must be O(1) per call.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        ...
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Per-process token buckets: limit tokens, refilled at limit/period per second"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        now = time.monotonic()
+        rate = limit / period
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(limit), now]
+            # Bound memory under a flood of distinct keys; the oldest buckets are nearly full anyway
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+class MongoRateLimitStore(RateLimitStore):
+    """Fixed-window counters shared by every process through one Mongo collection.
+
+    Each hit is a single upserting find_one_and_update on the (key, window)
+    document; a TTL index on expires_at removes old windows.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        from pymongo import ReturnDocument
+
+        now = time.time()
+        window_start = math.floor(now / period) * period
+        window_end = window_start + period
+        counter = await self.collection.find_one_and_update(
+            {"_id": f"{key}:{int(window_start)}"},
+            {
+                "$inc": {"count": 1},
+                "$setOnInsert": {"expires_at": datetime.utcfromtimestamp(window_end) + timedelta(seconds=period)},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if counter["count"] <= limit:
+            return 0.0
+        return window_end - now
+
+class RateLimitRule(NamedTuple):
+    scope: str
+    limit: int
+    period: float
+
+def parse_rule(scope: str, spec: str) -> RateLimitRule:
+    """Parse '<requests>/<seconds>', e.g. '5/60'"""
+    limit, period = spec.split("/")
+    return RateLimitRule(scope, int(limit), float(period))
+
+class RateLimiter:
+    def __init__(self, store: RateLimitStore, rules: List[RateLimitRule]):
+        self.store = store
+        self.rules = {rule.scope: rule for rule in rules}
+
+    async def check(self, **identities: Optional[str]):
+        """Count one request against every rule, raising 429 when any of them is exhausted"""
+        retry_after = 0.0
+        for scope, identity in identities.items():
+            rule = self.rules.get(scope)
+            if rule is None or not identity:
+                continue
+            wait = await self.store.hit(f"{scope}:{identity.lower()}", rule.limit, rule.period)
+            retry_after = max(retry_after, wait)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+def client_ip(request) -> str:
+    """Client address, taking the first X-Forwarded-For hop when behind a trusted proxy"""
+    if os.environ.get("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true":
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def create_contact_limiter(db) -> RateLimiter:
+    if os.environ.get("RATE_LIMIT_BACKEND", "memory").lower() == "mongo":
+        store = MongoRateLimitStore(db.rate_limits)
+    else:
+        store = InMemoryRateLimitStore()
+    return RateLimiter(store, [
+        parse_rule("ip", os.environ.get("CONTACT_RATE_LIMIT_IP", "5/60")),
+        parse_rule("email", os.environ.get("CONTACT_RATE_LIMIT_EMAIL", "3/600")),
+    ])
@@ -0,0 +1,257 @@
+import os
+import json
+import asyncio
+import sqlite3
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from bson import ObjectId, json_util
+
+from services.cache import portfolio_cache
+from services.database import LazyDatabase
+from services.metrics import mongo_query_duration, sqlite_query_duration
+from services.pagination import SortFields, encode_cursor, find_page, resume_query
+from services.portfolio import LIST_QUERIES, PROJECTIONS, SECTION_LOADERS, group_skills, read_skills
+from services.tenancy import DEFAULT_TENANT, Tenant
+
+# PORTFOLIO_BACKEND=sqlite serves the portfolio from a file written by build_sqlite.py instead of MongoDB
+PORTFOLIO_BACKEND = os.environ.get("PORTFOLIO_BACKEND", "mongo").lower()
+DEFAULT_SQLITE_PATH = Path(__file__).resolve().parent.parent / "portfolio.sqlite3"
+SQLITE_PATH = Path(os.environ.get("SQLITE_PATH", DEFAULT_SQLITE_PATH))
+
+SQLITE_SCHEMA_VERSION = 1
+# Sort key columns per list row; every LIST_QUERIES sort must fit
+SORT_KEY_COLUMNS = ("k1", "k2")
+
+# Sections the Mongo loaders return a list for; the rest hold one document (or None)
+LIST_SECTIONS = ("experiences", "certifications", "languages")
+
+def empty_section(name: str):
+    """What the Mongo loaders return for a tenant with no data"""
+    if name == "skills":
+        return group_skills([])
+    return [] if name in LIST_SECTIONS else None
+
+class MongoRepository:
+    """Portfolio reads straight from MongoDB through Motor"""
+
+    name = "mongo"
+    query_duration = mongo_query_duration
+
+    def __init__(self, db):
+        self.db = db
+
+    @property
+    def connected(self) -> bool:
+        # Only the lazy handle tracks this; on a Motor database the attribute would be a collection
+        return self.db.connected if isinstance(self.db, LazyDatabase) else True
+
+    def connect_in_background(self):
+        self.db.connect_in_background()
+
+    async def ping(self):
+        await self.db.command("ping")
+
+    async def load(self, section: str, tenant: Tenant = DEFAULT_TENANT):
+        return await SECTION_LOADERS[section](self.db, tenant)
+
+    async def page(self, name: str, tenant: Tenant, after: Optional[List[Any]],
+                   limit: int) -> Tuple[List[dict], Optional[str]]:
+        spec = LIST_QUERIES[name]
+        query = resume_query(tenant.scope(spec.query), spec.sort, after)
+        return await find_page(self.db[spec.collection], query, PROJECTIONS[spec.collection], spec.sort, limit)
+
+    async def stream(self, name: str, tenant: Tenant, after: Optional[List[Any]] = None,
+                     limit: Optional[int] = None) -> AsyncIterator[dict]:
+        spec = LIST_QUERIES[name]
+        query = resume_query(tenant.scope(spec.query), spec.sort, after)
+        cursor = self.db[spec.collection].find(query, PROJECTIONS[spec.collection]).sort(spec.sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        async for doc in cursor:
+            yield doc
+
+def _sql_value(value: Any) -> Any:
+    # ObjectId hex strings sort like the ObjectIds themselves; ISO timestamps sort like datetimes
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def _after_clause(values: List[Any], sort: SortFields) -> Tuple[str, List[Any]]:
+    """SQL twin of pagination.after_filter over the sort key columns"""
+    clauses, params = [], []
+    for i, (_, direction) in enumerate(sort):
+        parts = [f"{SORT_KEY_COLUMNS[j]} = ?" for j in range(i)]
+        parts.append(f"{SORT_KEY_COLUMNS[i]} {'>' if direction == 1 else '<'} ?")
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(_sql_value(v) for v in values[:i + 1])
+    return " OR ".join(clauses), params
+
+class SQLiteRepository:
+    """Read-only portfolio served from an embedded SQLite file, no network hop.
+
+    Each section is stored pre-assembled (one primary key lookup per load)
+    and the list endpoints as rows in their sort order, so keyset pages are a
+    range scan. Documents keep their BSON types through extended JSON, which
+    makes responses and page cursors identical to the Mongo backend's.
+    build_sqlite.py replaces the file atomically; a background check picks
+    the new one up within check_interval seconds and drops every cached entry.
+    """
+
+    name = "sqlite"
+    connected = True
+    query_duration = sqlite_query_duration
+
+    def __init__(self, path: Path, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._connection: Optional[sqlite3.Connection] = None
+        self._identity = None
+        self._checked_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def connect_in_background(self):
+        pass
+
+    async def _run(self):
+        # Cache hits never reach _open, so a rebuilt file has to be noticed here
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                self._open()
+            except Exception as e:
+                logging.error(f"Error reloading portfolio database: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection, self._identity = None, None
+
+    def _open(self) -> sqlite3.Connection:
+        now = time.monotonic()
+        if self._connection is not None and now - self._checked_at < self.check_interval:
+            return self._connection
+        self._checked_at = now
+        stat = self.path.stat()
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        if identity == self._identity:
+            return self._connection
+
+        # immutable=1: the file is never written in place, so SQLite can skip locking entirely
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        version = connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if version is None or int(version[0]) != SQLITE_SCHEMA_VERSION:
+            connection.close()
+            raise ValueError(f"Unsupported portfolio database version in {self.path}; rebuild it with build_sqlite.py")
+        reloaded = self._connection is not None
+        if reloaded:
+            self._connection.close()
+        self._connection, self._identity = connection, identity
+        if reloaded:
+            logging.info(f"Reloaded portfolio database {self.path}")
+            portfolio_cache.invalidate()
+        return connection
+
+    async def ping(self):
+        self._open().execute("SELECT 1").fetchone()
+
+    async def load(self, section: str, tenant: Tenant = DEFAULT_TENANT):
+        row = self._open().execute(
+            "SELECT body FROM sections WHERE tenant = ? AND name = ?", (tenant.id or "", section)
+        ).fetchone()
+        return json_util.loads(row[0]) if row is not None else empty_section(section)
+
+    def _rows(self, name: str, tenant: Tenant, after: Optional[List[Any]], limit: Optional[int]):
+        sql = "SELECT doc FROM list_items WHERE tenant = ? AND name = ?"
+        params: List[Any] = [tenant.id or "", name]
+        if after is not None:
+            clause, values = _after_clause(after, LIST_QUERIES[name].sort)
+            sql += f" AND ({clause})"
+            params.extend(values)
+        sql += " ORDER BY position"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._open().execute(sql, params)
+
+    async def page(self, name: str, tenant: Tenant, after: Optional[List[Any]],
+                   limit: int) -> Tuple[List[dict], Optional[str]]:
+        docs = [json_util.loads(doc) for doc, in self._rows(name, tenant, after, limit + 1)]
+        next_cursor = encode_cursor(docs[limit - 1], LIST_QUERIES[name].sort) if len(docs) > limit else None
+        return docs[:limit], next_cursor
+
+    async def stream(self, name: str, tenant: Tenant, after: Optional[List[Any]] = None,
+                     limit: Optional[int] = None) -> AsyncIterator[dict]:
+        for doc, in self._rows(name, tenant, after, limit):
+            yield json_util.loads(doc)
+
+async def write_sqlite(path: Path, source: MongoRepository, tenants: List[Tenant]) -> int:
+    """Copy every tenant's portfolio from source into a new SQLite file at path, returning rows written"""
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.unlink(missing_ok=True)
+    connection = sqlite3.connect(temporary)
+    rows = 0
+    try:
+        connection.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+            CREATE TABLE sections (
+                tenant TEXT NOT NULL, name TEXT NOT NULL, body TEXT NOT NULL,
+                PRIMARY KEY (tenant, name)
+            ) WITHOUT ROWID;
+            CREATE TABLE list_items (
+                tenant TEXT NOT NULL, name TEXT NOT NULL, position INTEGER NOT NULL,
+                k1, k2, doc TEXT NOT NULL,
+                PRIMARY KEY (tenant, name, position)
+            ) WITHOUT ROWID;
+        """)
+        for tenant in tenants:
+            for section in SECTION_LOADERS:
+                # load_skills would rebuild the skills view, and an export must not write to its source
+                value = await (read_skills(source.db, tenant) if section == "skills" else source.load(section, tenant))
+                connection.execute("INSERT INTO sections VALUES (?, ?, ?)",
+                                   (tenant.id or "", section, json_util.dumps(value)))
+                rows += 1
+            for name, spec in LIST_QUERIES.items():
+                if len(spec.sort) > len(SORT_KEY_COLUMNS):
+                    raise ValueError(f"{name} sorts on more keys than the list_items table holds")
+                position = 0
+                async for doc in source.stream(name, tenant):
+                    keys = [_sql_value(doc.get(field)) for field, _ in spec.sort]
+                    keys += [None] * (len(SORT_KEY_COLUMNS) - len(keys))
+                    connection.execute("INSERT INTO list_items VALUES (?, ?, ?, ?, ?, ?)",
+                                       (tenant.id or "", name, position, *keys, json_util.dumps(doc)))
+                    position += 1
+                rows += position
+        connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("schema_version", str(SQLITE_SCHEMA_VERSION)),
+            ("built_at", datetime.utcnow().isoformat()),
+            ("tenants", json.dumps([tenant.id for tenant in tenants])),
+        ])
+        connection.commit()
+    finally:
+        connection.close()
+    # Readers holding the old file keep their view of it until they notice the swap
+    os.replace(temporary, path)
+    return rows
+
+def create_repository(db):
+    if PORTFOLIO_BACKEND == "sqlite":
+        logging.info(f"Serving the portfolio from {SQLITE_PATH}")
+        return SQLiteRepository(SQLITE_PATH)
+    if PORTFOLIO_BACKEND != "mongo":
+        raise ValueError(f"Unknown PORTFOLIO_BACKEND {PORTFOLIO_BACKEND!r}; use mongo or sqlite")
+    return MongoRepository(db)
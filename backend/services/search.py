@@ -0,0 +1,261 @@
+import os
+import re
+import math
+import html
+import time
+import heapq
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from services.cache import portfolio_cache
+from services.portfolio import fetch_certifications, fetch_education, fetch_experiences, fetch_skills
+from services.tenancy import Tenant
+
+SEARCH_SECTIONS = ("experiences", "skills", "certifications", "education")
+
+# BM25 parameters; prefix matches count for less than whole-word matches
+K1 = 1.2
+B = 0.75
+PREFIX_WEIGHT = 0.6
+# A one-letter prefix could expand to most of the vocabulary
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 50
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Lowercased word tokens with their character offsets"""
+    return [(m.group().lower(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text)]
+
+class Entry:
+    """One searchable text: an achievement, a skill, a certification title or issuer"""
+    __slots__ = ("section", "doc_id", "field", "text", "context", "terms", "length")
+
+    def __init__(self, section: str, doc_id: Optional[str], field: str, text: str, context: dict):
+        self.section = section
+        self.doc_id = doc_id
+        self.field = field
+        self.text = text
+        self.context = context
+        tokens = [token for token, _, _ in tokenize(text)]
+        self.terms: Dict[str, int] = defaultdict(int)
+        for token in tokens:
+            self.terms[token] += 1
+        self.length = len(tokens)
+
+# Entries per section, read through the same cached accessors as the API
+async def experience_entries(repository, tenant: Tenant) -> List[Entry]:
+    return [
+        Entry("experiences", exp.get("_id"), "achievements", achievement,
+              {"title": exp.get("title"), "company": exp.get("company")})
+        for exp in await fetch_experiences(repository, tenant)
+        for achievement in exp.get("achievements", [])
+    ]
+
+async def skill_entries(repository, tenant: Tenant) -> List[Entry]:
+    entries = []
+    for category, value in (await fetch_skills(repository, tenant)).items():
+        groups = value.items() if isinstance(value, dict) else [(None, value)]
+        for subcategory, skills in groups:
+            entries.extend(
+                Entry("skills", None, "skills", skill, {"category": category, "subcategory": subcategory})
+                for skill in skills
+            )
+    return entries
+
+async def certification_entries(repository, tenant: Tenant) -> List[Entry]:
+    return [
+        Entry("certifications", cert.get("_id"), field, cert[field], {"title": cert.get("title")})
+        for cert in await fetch_certifications(repository, tenant)
+        for field in ("title", "issuer") if cert.get(field)
+    ]
+
+async def education_entries(repository, tenant: Tenant) -> List[Entry]:
+    education = await fetch_education(repository, tenant)
+    if education is None:
+        return []
+    context = {"degree": education.get("degree"), "university": education.get("university")}
+    return [
+        Entry("education", education.get("_id"), "achievements", achievement, context)
+        for achievement in education.get("achievements", [])
+    ]
+
+SECTION_ENTRIES = {
+    "experiences": experience_entries,
+    "skills": skill_entries,
+    "certifications": certification_entries,
+    "education": education_entries,
+}
+
+class SearchIndex:
+    """Inverted index over one tenant's portfolio, updated a section at a time.
+
+    postings maps each term to {entry id: term frequency}; terms is the same
+    vocabulary kept sorted so prefix lookups are a bisect plus a short scan.
+    invalidations counts how often each section was marked stale, so a
+    rebuild that raced an invalidation leaves the section stale.
+    """
+
+    def __init__(self):
+        self.entries: Dict[int, Entry] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.terms: List[str] = []
+        self.sections: Dict[str, List[int]] = {}
+        self.built_at: Dict[str, float] = {}
+        self.stale: Set[str] = set(SEARCH_SECTIONS)
+        self.invalidations: Dict[str, int] = defaultdict(int)
+        self.total_length = 0
+        self._next_id = 0
+
+    def mark_stale(self, sections: Iterable[str]):
+        for section in sections:
+            self.stale.add(section)
+            self.invalidations[section] += 1
+
+    def replace_section(self, section: str, entries: Iterable[Entry], version: Optional[int] = None):
+        """Swap one section's entries, leaving the rest of the index untouched.
+
+        version is the section's invalidation count when its entries were
+        read; if it has moved since, the section stays stale.
+        """
+        for entry_id in self.sections.pop(section, []):
+            entry = self.entries.pop(entry_id)
+            self.total_length -= entry.length
+            for term in entry.terms:
+                postings = self.postings[term]
+                del postings[entry_id]
+                if not postings:
+                    del self.postings[term]
+
+        ids = []
+        for entry in entries:
+            entry_id = self._next_id
+            self._next_id += 1
+            self.entries[entry_id] = entry
+            self.total_length += entry.length
+            for term, frequency in entry.terms.items():
+                self.postings.setdefault(term, {})[entry_id] = frequency
+            ids.append(entry_id)
+        self.sections[section] = ids
+        self.terms = sorted(self.postings)
+        self.built_at[section] = time.monotonic()
+        if version is None or version == self.invalidations[section]:
+            self.stale.discard(section)
+
+    def expand(self, token: str) -> List[Tuple[str, float]]:
+        """Index terms matching token, whole-word first, with the weight each match counts for"""
+        matches = [(token, 1.0)] if token in self.postings else []
+        if len(token) >= MIN_PREFIX_LENGTH:
+            i = bisect_left(self.terms, token)
+            while i < len(self.terms) and len(matches) < MAX_PREFIX_EXPANSIONS and self.terms[i].startswith(token):
+                if self.terms[i] != token:
+                    matches.append((self.terms[i], PREFIX_WEIGHT))
+                i += 1
+        return matches
+
+    def search(self, query: str, limit: int, section: Optional[str] = None):
+        """(total matches, top entries as (entry, score, matched terms)); every query word must match"""
+        tokens = list(dict.fromkeys(token for token, _, _ in tokenize(query)))
+        if not tokens or not self.entries:
+            return 0, []
+        count = len(self.entries)
+        average_length = self.total_length / count or 1.0
+
+        scores: Optional[Dict[int, float]] = None
+        matched: Dict[int, Set[str]] = defaultdict(set)
+        for token in tokens:
+            token_scores: Dict[int, float] = {}
+            for term, weight in self.expand(token):
+                postings = self.postings[term]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for entry_id, frequency in postings.items():
+                    entry = self.entries[entry_id]
+                    if section is not None and entry.section != section:
+                        continue
+                    norm = frequency + K1 * (1 - B + B * entry.length / average_length)
+                    score = weight * idf * frequency * (K1 + 1) / norm
+                    # A word matching several terms counts once, through its best match
+                    if score > token_scores.get(entry_id, 0.0):
+                        token_scores[entry_id] = score
+                    matched[entry_id].add(term)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {entry_id: scores[entry_id] + s for entry_id, s in token_scores.items() if entry_id in scores}
+            if not scores:
+                return 0, []
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return len(scores), [(self.entries[entry_id], score, matched[entry_id]) for entry_id, score in top]
+
+def highlight(text: str, terms: Set[str]) -> str:
+    """HTML-escaped text with matched words wrapped in <mark>"""
+    parts, last = [], 0
+    for token, start, end in tokenize(text):
+        if token in terms:
+            parts.append(html.escape(text[last:start]))
+            parts.append("<mark>" + html.escape(text[start:end]) + "</mark>")
+            last = end
+    parts.append(html.escape(text[last:]))
+    return "".join(parts)
+
+class SearchService:
+    """Per-tenant search indexes, refreshed section by section as the underlying data changes.
+
+    Cache invalidations mark the affected sections stale; a section is also
+    rebuilt once it is older than its cache TTL, so the index never lags the
+    cached API responses it is built from.
+    """
+
+    def __init__(self, cache, max_indexes: int = 256):
+        self.cache = cache
+        self.max_indexes = max_indexes
+        self._indexes: "OrderedDict[Optional[str], SearchIndex]" = OrderedDict()
+
+    async def index_for(self, repository, tenant: Tenant) -> SearchIndex:
+        index = self._indexes.get(tenant.id)
+        if index is None:
+            index = self._indexes[tenant.id] = SearchIndex()
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(tenant.id)
+
+        now = time.monotonic()
+        for section in SEARCH_SECTIONS:
+            expired = now - index.built_at.get(section, 0.0) >= self.cache.ttl_for([section])
+            if section in index.stale or expired:
+                version = index.invalidations[section]
+                index.replace_section(section, await SECTION_ENTRIES[section](repository, tenant), version)
+        return index
+
+    async def search(self, repository, tenant: Tenant, query: str, limit: int = 20, section: Optional[str] = None) -> dict:
+        index = await self.index_for(repository, tenant)
+        total, hits = index.search(query, limit, section)
+        return {
+            "query": query,
+            "total": total,
+            "results": [
+                {
+                    "section": entry.section,
+                    "id": entry.doc_id,
+                    "field": entry.field,
+                    "text": entry.text,
+                    "highlight": highlight(entry.text, terms),
+                    "context": entry.context,
+                    "score": round(score, 4),
+                }
+                for entry, score, terms in hits
+            ],
+        }
+
+    def invalidate(self, collection: Optional[str] = None, tenant_id: Optional[str] = None):
+        """Invalidation listener: mark sections built from collection stale"""
+        sections = SEARCH_SECTIONS if collection is None else [collection]
+        indexes = self._indexes.values() if tenant_id is None else [self._indexes.get(tenant_id)]
+        for index in indexes:
+            if index is not None:
+                index.mark_stale(s for s in sections if s in SEARCH_SECTIONS)
+
+search_service = SearchService(portfolio_cache, max_indexes=int(os.environ.get("SEARCH_MAX_INDEXES", 256)))
+portfolio_cache.add_invalidation_listener(search_service.invalidate)
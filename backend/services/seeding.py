@@ -0,0 +1,141 @@
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bson import json_util
+from pymongo import DeleteOne, ReplaceOne
+
+from services.cache import portfolio_cache
+from services.portfolio import refresh_skills_view
+from services.tenancy import DEFAULT_TENANT, Tenant
+
+# Fields identifying the same document across seeding runs; () means one document per tenant
+SEED_KEYS = {
+    'personal_info': (),
+    'experiences': ('company', 'title'),
+    'skills': ('category', 'subcategory'),
+    'education': (),
+    'certifications': ('title', 'issuer'),
+    'languages': ('language',),
+}
+
+# Bumped once per seeding run that changes a collection; other processes watch it to drop caches
+VERSIONS_COLLECTION = 'collection_versions'
+
+# Bookkeeping fields, left out of the content hash
+_UNHASHED_FIELDS = {'_id', 'tenant_id', 'content_hash', 'created_at', 'updated_at'}
+
+def content_hash(doc: dict) -> str:
+    """Stable hash of a document's content, independent of key order and bookkeeping fields"""
+    content = {k: v for k, v in doc.items() if k not in _UNHASHED_FIELDS}
+    return hashlib.sha256(json_util.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+def seed_key(doc: dict, keys: Tuple[str, ...]) -> tuple:
+    return tuple(doc.get(k) for k in keys)
+
+def owned_by(tenant: Tenant, query: Optional[dict] = None) -> dict:
+    """Filter for documents whose tenant_id is exactly the tenant's, never a wider scope.
+
+    Seeding deletes whatever it finds that is not in the seed, so it must not
+    rely on the default tenant's scope, which is unfiltered in single-tenant mode.
+    """
+    return dict(query or {}, tenant_id=tenant.id)
+
+async def plan_collection(collection, docs: List[dict], keys: Tuple[str, ...], tenant: Tenant,
+                          now: datetime, session=None) -> List:
+    """bulk_write operations turning the tenant's documents into docs, touching only what differs
+
+    Only documents owned by the tenant (see owned_by) are replaced or deleted.
+    """
+    projection = {k: 1 for k in keys}
+    projection.update({"content_hash": 1, "created_at": 1})
+    existing: Dict[tuple, dict] = {}
+    operations = []
+    async for doc in collection.find(owned_by(tenant), projection, session=session):
+        key = seed_key(doc, keys)
+        if key in existing:
+            # Leftover duplicate from an earlier delete-and-insert run
+            operations.append(DeleteOne({"_id": doc["_id"]}))
+        else:
+            existing[key] = doc
+
+    for doc in docs:
+        key = seed_key(doc, keys)
+        digest = content_hash(doc)
+        current = existing.pop(key, None)
+        if current is not None and current.get("content_hash") == digest:
+            continue
+        replacement = tenant.stamp(dict(doc))
+        replacement.update({
+            "content_hash": digest,
+            "created_at": (current or {}).get("created_at") or now,
+            "updated_at": now,
+        })
+        if current is not None:
+            operations.append(ReplaceOne({"_id": current["_id"]}, replacement))
+        else:
+            # Upsert on the seed key, so two runs racing each other still end with one document
+            operations.append(ReplaceOne(owned_by(tenant, dict(zip(keys, key))), replacement, upsert=True))
+
+    operations.extend(DeleteOne({"_id": doc["_id"]}) for doc in existing.values())
+    return operations
+
+async def supports_transactions(client) -> bool:
+    """Multi-document transactions need a replica set or a sharded cluster"""
+    try:
+        hello = await client.admin.command("hello")
+    except Exception as e:
+        logging.info(f"Cannot tell whether transactions are supported, writing without one: {str(e)}")
+        return False
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+async def bump_versions(db, collections: List[str], tenant: Tenant, now: datetime, session=None):
+    for name in collections:
+        await db[VERSIONS_COLLECTION].update_one(
+            {"_id": tenant.cache_key(name)},
+            {"$inc": {"version": 1}, "$set": {"collection": name, "tenant_id": tenant.id, "updated_at": now}},
+            upsert=True,
+            session=session,
+        )
+
+async def _apply(db, data: Dict[str, List[dict]], tenant: Tenant, session=None) -> Dict[str, int]:
+    now = datetime.utcnow()
+    # MongoDB stores milliseconds; truncate so the timestamps read back equal the ones written
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    changes = {}
+    for name, docs in data.items():
+        operations = await plan_collection(db[name], docs, SEED_KEYS[name], tenant, now, session)
+        if operations:
+            await db[name].bulk_write(operations, ordered=False, session=session)
+            changes[name] = len(operations)
+    if "skills" in changes:
+        await refresh_skills_view(db, tenant, session)
+    await bump_versions(db, list(changes), tenant, now, session)
+    return changes
+
+async def sync_portfolio(client, db, data: Dict[str, List[dict]],
+                         tenant: Tenant = DEFAULT_TENANT) -> Dict[str, int]:
+    """Make the tenant's portfolio collections match data, returning the operation count per changed collection.
+
+    Unchanged documents are not written, so re-running with the same data is
+    a no-op. All changes are applied in one transaction when the deployment
+    supports it; either way each changed collection's version is bumped and
+    its cache entries dropped once, after the writes.
+    """
+    if await supports_transactions(client):
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                changes = await _apply(db, data, tenant, session)
+    else:
+        changes = await _apply(db, data, tenant)
+
+    for name in changes:
+        portfolio_cache.invalidate(name, tenant.id)
+    return changes
+
+def as_documents(value: Optional[object]) -> List[dict]:
+    """Seed data holds single-document sections as a dict and the rest as lists"""
+    if value is None:
+        return []
+    return [value] if isinstance(value, dict) else list(value)
@@ -0,0 +1,69 @@
+import os
+import json
+from typing import Any, Callable, List, Tuple, Type
+
+from bson import ObjectId
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library encoder
+    orjson = None
+
+# SERIALIZATION_MODE=fast skips Pydantic model construction when filling the response cache
+FAST_SERIALIZATION = os.environ.get("SERIALIZATION_MODE", "model").lower() == "fast"
+
+def _default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON, matching the separators FastAPI's JSONResponse uses"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def projection_for(model: Type[BaseModel]) -> dict:
+    """Mongo projection fetching only the fields the response model exposes"""
+    return {field.alias or name: 1 for name, field in model.model_fields.items()}
+
+class DocumentShaper:
+    """Turns a raw Mongo document into the response shape of a model without instantiating it.
+
+    Field order, aliases and defaults are read from the model once, so each
+    document costs a single dict build instead of a full validation pass.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.fields: List[Tuple[str, Any, Callable[[], Any]]] = []
+        for name, field in model.model_fields.items():
+            self.fields.append((field.alias or name, field.default, field.default_factory))
+        self.keys = [key for key, _, _ in self.fields]
+        self.key_set = frozenset(self.keys)
+
+    def __call__(self, doc: dict) -> dict:
+        if self.key_set <= doc.keys():
+            # Common case: the projection returned every field, so copy them in model order
+            shaped = {key: doc[key] for key in self.keys}
+        else:
+            shaped = {}
+            for key, default, factory in self.fields:
+                if key in doc:
+                    shaped[key] = doc[key]
+                elif factory is not None:
+                    shaped[key] = factory()
+                elif default is not PydanticUndefined:
+                    shaped[key] = default
+                else:
+                    raise ValueError(f"{self.model.__name__} document is missing required field '{key}'")
+        if isinstance(shaped.get("_id"), ObjectId):
+            shaped["_id"] = str(shaped["_id"])
+        return shaped
+
+    def many(self, docs: List[dict]) -> List[dict]:
+        return [self(doc) for doc in docs]
@@ -0,0 +1,252 @@
+import os
+import json
+import mmap
+import time
+import struct
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from services.cache import portfolio_cache
+from services.compression import SUPPORTED_ENCODINGS
+from services.http_cache import COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, SerializedResponse
+from services.metrics import Gauge, registry
+from services.tenancy import Tenant
+
+try:
+    import fcntl
+except ImportError:  # No flock (Windows); every worker then reads its own cache instead
+    fcntl = None
+
+# SHARED_SNAPSHOT=<path> shares serialized responses between workers through one memory-mapped
+# file; put it on a tmpfs such as /dev/shm so it never touches the disk
+SHARED_SNAPSHOT = os.environ.get("SHARED_SNAPSHOT")
+# Rebuilt on every relevant invalidation, and at least this often in case one was missed
+SHARED_SNAPSHOT_MAX_AGE = float(os.environ.get("SHARED_SNAPSHOT_MAX_AGE", 3600))
+
+# magic, generation, length of the JSON index that follows; bodies come after the index
+HEADER = struct.Struct("<8sQI")
+MAGIC = b"PFSHM001"
+
+# Invalidation bursts (a seeding run touches several collections) are folded into one rebuild
+REBUILD_DELAY = 0.2
+
+shared_snapshot_generation = registry.register(Gauge(
+    "shared_snapshot_generation", "Generation of the shared response snapshot this worker reads"))
+
+def write_shared_snapshot(path: Path, generation: int, responses: Dict[str, SerializedResponse],
+                          started_at: Optional[float] = None):
+    """Write responses, with their compressed variants, as a new file and swap it in atomically.
+
+    started_at is the wall-clock time the responses were read at or after
+    (defaults to now); readers compare it with the invalidations they saw.
+    """
+    index, blobs, offset = {}, [], 0
+
+    def add(blob) -> list:
+        nonlocal offset
+        blobs.append(blob)
+        offset += len(blob)
+        return [offset - len(blob), len(blob)]
+
+    for name, serialized in responses.items():
+        entry = {
+            "etag": serialized.etag,
+            "last_modified": serialized.last_modified.isoformat(),
+            "body": add(serialized.body),
+            "variants": {},
+        }
+        if COMPRESSION_ENABLED and len(serialized.body) >= COMPRESSION_MIN_SIZE:
+            # Compressed once here rather than once per worker
+            entry["variants"] = {encoding: add(serialized.encoded(encoding)) for encoding in SUPPORTED_ENCODINGS}
+        index[name] = entry
+
+    encoded_index = json.dumps({
+        "built_at": datetime.utcnow().isoformat(),
+        "started_at": time.time() if started_at is None else started_at,
+        "entries": index,
+    }).encode("utf-8")
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, generation, len(encoded_index)))
+        f.write(encoded_index)
+        for blob in blobs:
+            f.write(blob)
+    # Workers still mapping the old file keep reading it until they notice the swap
+    os.replace(temporary, path)
+
+class SharedSnapshot:
+    """Read side: the current snapshot file mapped into this process.
+
+    Bodies are memoryviews into the mapping, so every worker serves the same
+    physical pages and holds only the small index itself. A replaced file is
+    remapped within check_interval seconds; the old mapping is released once
+    responses still sending from it are done.
+
+    A response is skipped, and built in this process instead, while the
+    mapped snapshot was started before this worker last saw one of its
+    collections invalidated: the leader may not have caught up yet, or may
+    have missed the change altogether.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.generation = 0
+        self.started_at = 0.0
+        self._entries: Dict[str, SerializedResponse] = {}
+        # Wall-clock time of the latest default-tenant invalidation per collection; None is all of them
+        self._invalidated: Dict[Optional[str], float] = {}
+        self._identity = None
+        self._checked_at = 0.0
+
+    def refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        if identity == self._identity:
+            return
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, generation, index_length = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a shared snapshot")
+        view = memoryview(mapped)
+        base = HEADER.size + index_length
+        index = json.loads(bytes(view[HEADER.size:base]))
+
+        def blob(span) -> memoryview:
+            return view[base + span[0]:base + span[0] + span[1]]
+
+        entries = {}
+        for name, entry in index["entries"].items():
+            serialized = SerializedResponse(blob(entry["body"]), datetime.fromisoformat(entry["last_modified"]),
+                                            etag=entry["etag"])
+            serialized.variants = {encoding: blob(span) for encoding, span in entry["variants"].items()}
+            entries[name] = serialized
+        self._entries, self._identity, self.generation = entries, identity, generation
+        self.started_at = index.get("started_at", 0.0)
+        shared_snapshot_generation.set(value=generation)
+        logging.info(f"Mapped shared snapshot generation {generation} ({len(entries)} responses)")
+
+    def current(self) -> int:
+        """Generation mapped after picking up any newer file; a broken file leaves the previous one in use"""
+        try:
+            self.refresh()
+        except (OSError, ValueError) as e:
+            logging.error(f"Error mapping shared snapshot: {str(e)}")
+        return self.generation
+
+    def invalidated(self, collection: Optional[str] = None, tenant_id: Optional[str] = None):
+        """Invalidation listener: a None tenant covers the default one"""
+        if tenant_id is None:
+            self._invalidated[collection] = time.time()
+
+    def lookup(self, name: str, tenant: Tenant, collections: Iterable[str] = ()) -> Optional[SerializedResponse]:
+        """Shared response for name, built from collections, or None to build it in this process.
+
+        Holds the default tenant only.
+        """
+        if tenant.id is not None:
+            return None
+        self.current()
+        invalidated_at = max(self._invalidated.get(c, 0.0) for c in (None, *collections))
+        if self.started_at <= invalidated_at:
+            return None
+        return self._entries.get(name)
+
+class SnapshotPublisher:
+    """Write side: the one worker holding the lock rebuilds the snapshot for all of them.
+
+    Every worker runs a publisher; the others wait on the lock and take over
+    when the holder exits. The holder rebuilds whenever the default tenant's
+    data is invalidated (see services/change_watcher.py), so every worker
+    moves to the new generation together.
+    """
+
+    def __init__(self, snapshot: SharedSnapshot, build: Callable[[], Awaitable[Dict[str, SerializedResponse]]],
+                 max_age: float = 3600):
+        self.snapshot = snapshot
+        self.build = build
+        self.max_age = max_age
+        self.leader = False
+        self._dirty = asyncio.Event()
+        self._lock_file = None
+        self._task: Optional[asyncio.Task] = None
+
+    def invalidated(self, collection: Optional[str] = None, tenant_id: Optional[str] = None):
+        """Invalidation listener: a None tenant covers the default one"""
+        if tenant_id is None:
+            self._dirty.set()
+
+    def _try_lock(self) -> bool:
+        if self._lock_file is None:
+            self._lock_file = open(self.snapshot.path.with_name(self.snapshot.path.name + ".lock"), "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    async def publish(self):
+        self._dirty.clear()
+        started_at = time.time()
+        responses = await self.build()
+        self.snapshot.refresh(force=True)
+        generation = self.snapshot.generation + 1
+        write_shared_snapshot(self.snapshot.path, generation, responses, started_at)
+        self.snapshot.refresh(force=True)
+        logging.info(f"Published shared snapshot generation {generation}")
+
+    async def _run(self):
+        while not self._try_lock():
+            await asyncio.sleep(self.snapshot.check_interval)
+        self.leader = True
+        while True:
+            try:
+                await self.publish()
+            except Exception as e:
+                # Workers keep the previous generation; try again shortly
+                logging.error(f"Error publishing shared snapshot: {str(e)}")
+                self._dirty.set()
+                await asyncio.sleep(self.snapshot.check_interval)
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=self.max_age)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(REBUILD_DELAY)
+
+    def start(self):
+        if fcntl is None:
+            logging.error("Shared snapshot needs fcntl.flock; each worker serves from its own cache")
+            return
+        if self._task is None:
+            portfolio_cache.add_invalidation_listener(self.invalidated)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._lock_file is not None:
+            # Closing releases the lock, letting another worker take over
+            self._lock_file.close()
+            self._lock_file = None
+            self.leader = False
+
+shared_snapshot = SharedSnapshot(Path(SHARED_SNAPSHOT)) if SHARED_SNAPSHOT else None
+if shared_snapshot is not None:
+    portfolio_cache.add_invalidation_listener(shared_snapshot.invalidated)
+
+def shared_response(name: str, tenant: Tenant, collections: Iterable[str] = ()) -> Optional[SerializedResponse]:
+    if shared_snapshot is None:
+        return None
+    return shared_snapshot.lookup(name, tenant, collections)
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from datetime import datetime
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+from services.compression import SUPPORTED_ENCODINGS, compress, negotiate_encoding
+from services.http_cache import CACHE_MAX_AGE, SerializedResponse, is_not_modified
+from services.tenancy import MULTI_TENANT
+
+# STATIC_EXPORT_DIR=<dir> serves the read endpoints from files written by export_static.py
+STATIC_EXPORT_DIR = os.environ.get("STATIC_EXPORT_DIR")
+
+# Read endpoints exported, by path, with the fetch_serialized section behind each
+EXPORTED_ROUTES = {
+    "/api/portfolio": "portfolio",
+    "/api/personal": "personal_info",
+    "/api/experiences": "experiences",
+    "/api/skills": "skills",
+    "/api/education": "education",
+    "/api/certifications": "certifications",
+    "/api/languages": "languages",
+}
+
+# The export directory holds one subdirectory per version and a pointer to the live one
+CURRENT_POINTER = "current"
+MANIFEST_NAME = "manifest.json"
+
+EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def export_responses(out_dir: Path, responses: Dict[str, SerializedResponse]) -> str:
+    """Write responses (by route path) as a new content-addressed version and make it current.
+
+    Every file name carries a hash of its body, and the version is a hash of
+    all of them, so exporting unchanged data reuses the existing version.
+    """
+    version = hashlib.sha256("".join(
+        path + serialized.etag for path, serialized in sorted(responses.items())
+    ).encode("utf-8")).hexdigest()[:16]
+    version_dir = out_dir / version
+
+    if not (version_dir / MANIFEST_NAME).exists():
+        routes = {}
+        for path, serialized in responses.items():
+            name = path.strip("/").replace("/", "_")
+            digest = serialized.etag.strip('"')[:16]
+            file_name = f"{name}.{digest}.json"
+            target = version_dir / file_name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(serialized.body)
+            for encoding in SUPPORTED_ENCODINGS:
+                (version_dir / (file_name + EXTENSIONS[encoding])).write_bytes(compress(serialized.body, encoding))
+            routes[path] = {
+                "file": file_name,
+                "etag": serialized.etag,
+                "last_modified": serialized.last_modified.isoformat(),
+                "encodings": list(SUPPORTED_ENCODINGS),
+            }
+        # The manifest goes last: a version directory without one is incomplete
+        _write_atomic(version_dir / MANIFEST_NAME, json.dumps({
+            "version": version,
+            "generated_at": datetime.utcnow().isoformat(),
+            "routes": routes,
+        }, indent=2).encode("utf-8"))
+
+    _write_atomic(out_dir / CURRENT_POINTER, version.encode("utf-8"))
+    return version
+
+class StaticFile:
+    """One exported endpoint: its files on disk and the validators clients revalidate against"""
+
+    def __init__(self, path: str, version_dir: Path, entry: dict):
+        self.path = path
+        self.file = version_dir / entry["file"]
+        self.etag = entry["etag"]
+        self.last_modified = datetime.fromisoformat(entry["last_modified"])
+        self.encodings = entry.get("encodings", [])
+        # Stat once up front so serving a file needs no syscalls besides open and read
+        self.stats = {None: os.stat(self.file)}
+        for encoding in self.encodings:
+            self.stats[encoding] = os.stat(str(self.file) + EXTENSIONS[encoding])
+
+    def response(self, request: Request) -> Response:
+        headers = {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={CACHE_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        if is_not_modified(request, self):
+            return Response(status_code=304, headers=headers)
+
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"), self.encodings)
+        if encoding is None:
+            return FileResponse(self.file, headers=headers, media_type="application/json",
+                                stat_result=self.stats[None])
+        # Compressed bytes differ from the identity body, so their validator is only weakly equal
+        headers["ETag"] = "W/" + self.etag
+        headers["Content-Encoding"] = encoding
+        return FileResponse(str(self.file) + EXTENSIONS[encoding], headers=headers,
+                            media_type="application/json", stat_result=self.stats[encoding])
+
+class StaticSite:
+    """Routes of the current export version, reloaded when export_static.py publishes a new one"""
+
+    def __init__(self, root: Path, check_interval: float = 1.0):
+        self.root = root
+        self.check_interval = check_interval
+        self.version: Optional[str] = None
+        self.routes: Dict[str, StaticFile] = {}
+        self._checked_at = 0.0
+
+    def load(self):
+        version = (self.root / CURRENT_POINTER).read_text(encoding="utf-8").strip()
+        if version == self.version:
+            return
+        version_dir = self.root / version
+        manifest = json.loads((version_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.routes = {
+            path: StaticFile(path, version_dir, entry) for path, entry in manifest["routes"].items()
+        }
+        self.version = version
+        logging.info(f"Serving static export {version} ({len(self.routes)} routes) from {self.root}")
+
+    def lookup(self, path: str) -> Optional[StaticFile]:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                self.load()
+            except (OSError, ValueError, KeyError) as e:
+                # Keep serving the version already loaded, if any
+                logging.error(f"Error loading static export: {str(e)}")
+        return self.routes.get(path)
+
+class StaticExportMiddleware:
+    """Answers exported GET endpoints straight from disk, without touching MongoDB.
+
+    Requests with a query string (pagination, NDJSON) and anything not in the
+    export fall through to the application. Only the default tenant's data
+    is exported, so nothing is served from disk in multi-tenant mode.
+    """
+
+    def __init__(self, app, site: StaticSite):
+        self.app = app
+        self.site = site
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] == "http" and not MULTI_TENANT and scope["method"] in ("GET", "HEAD")
+                and not scope["query_string"]):
+            static_file = self.site.lookup(scope["path"])
+            if static_file is not None:
+                # Metrics label requests by scope["route"].path, as they do for routed requests
+                scope["route"] = static_file
+                await static_file.response(Request(scope, receive))(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,100 @@
+import os
+import re
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+# MULTI_TENANT=true serves many portfolios from shared collections, keyed by tenant_id
+MULTI_TENANT = os.environ.get("MULTI_TENANT", "false").lower() == "true"
+
+# Hosts resolve through an explicit map ({"portfolio.example.com": "alice"}) or as <tenant>.TENANT_BASE_DOMAIN
+TENANT_HOSTS = json.loads(os.environ.get("TENANT_HOSTS", "{}"))
+TENANT_BASE_DOMAIN = os.environ.get("TENANT_BASE_DOMAIN", "").lower().lstrip(".")
+
+# Requests may also name the tenant in the path: /t/<tenant>/api/...
+TENANT_PATH_PREFIX = "/t/"
+
+TENANT_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9-]{0,62}$")
+
+class Tenant:
+    """Scope of one hosted portfolio.
+
+    The default tenant (id None) applies no filter in single-tenant mode; in
+    multi-tenant mode it only covers documents without a tenant_id, so code
+    that falls back to it never reads or rewrites a hosted portfolio.
+    """
+    __slots__ = ("id",)
+
+    def __init__(self, tenant_id: Optional[str] = None):
+        self.id = tenant_id
+
+    def scope(self, query: Optional[dict] = None) -> dict:
+        """Restrict a Mongo filter to this tenant's documents"""
+        query = dict(query or {})
+        if self.id is not None or MULTI_TENANT:
+            # {"tenant_id": None} matches documents where the field is missing
+            query["tenant_id"] = self.id
+        return query
+
+    def stamp(self, doc: dict) -> dict:
+        """Mark a document being written as belonging to this tenant"""
+        if self.id is not None:
+            doc["tenant_id"] = self.id
+        return doc
+
+    def cache_key(self, name: str) -> str:
+        return name if self.id is None else f"{self.id}:{name}"
+
+    def __repr__(self):
+        return f"Tenant({self.id!r})"
+
+DEFAULT_TENANT = Tenant()
+
+def tenant_from_host(host: str) -> Optional[str]:
+    host = host.split(":")[0].lower()
+    if host in TENANT_HOSTS:
+        return TENANT_HOSTS[host]
+    if TENANT_BASE_DOMAIN and host.endswith("." + TENANT_BASE_DOMAIN):
+        return host[:-len(TENANT_BASE_DOMAIN) - 1]
+    return None
+
+class TenantMiddleware:
+    """Resolves the tenant of each request from a /t/<tenant> path prefix or the Host header.
+
+    The path prefix becomes part of root_path, so /t/alice/api/skills is
+    routed to the regular /api/skills route while URLs built from the
+    request (pagination links) keep pointing at /t/alice.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and MULTI_TENANT:
+            tenant_id = None
+            path = scope["path"]
+            if path.startswith(TENANT_PATH_PREFIX):
+                tenant_id, _, rest = path[len(TENANT_PATH_PREFIX):].partition("/")
+                if TENANT_ID_PATTERN.match(tenant_id):
+                    # Routing drops root_path from the path; request.url still has all of it
+                    scope = dict(scope, root_path=scope.get("root_path", "") + TENANT_PATH_PREFIX + tenant_id)
+                else:
+                    scope = dict(scope, path="/" + rest, raw_path=("/" + rest).encode("utf-8"))
+            else:
+                for name, value in scope["headers"]:
+                    if name == b"host":
+                        tenant_id = tenant_from_host(value.decode("latin-1"))
+                        break
+            if tenant_id and TENANT_ID_PATTERN.match(tenant_id):
+                scope.setdefault("state", {})["tenant"] = Tenant(tenant_id)
+        await self.app(scope, receive, send)
+
+def get_tenant(request: Request) -> Tenant:
+    """FastAPI dependency returning the tenant resolved by TenantMiddleware"""
+    if not MULTI_TENANT:
+        return DEFAULT_TENANT
+    tenant = request.scope.get("state", {}).get("tenant")
+    if tenant is None:
+        raise HTTPException(status_code=404, detail="Unknown portfolio")
+    return tenant
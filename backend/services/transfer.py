@@ -0,0 +1,261 @@
+import csv
+import json
+import logging
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type, Union, get_args, get_origin
+
+from bson import ObjectId
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from models.personal_info import PersonalInfo
+from models.experience import Experience
+from models.skills import Skills
+from models.education import Education
+from models.certification import Certification
+from models.language import Language
+from models.contact_message import ContactMessage
+from services.serialization import dumps
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; only JSON and CSV are available without it
+    yaml = None
+
+# Collections that can be imported or exported one document per record
+COLLECTION_MODELS: Dict[str, Type[BaseModel]] = {
+    'personal_info': PersonalInfo,
+    'experiences': Experience,
+    'skills': Skills,
+    'education': Education,
+    'certifications': Certification,
+    'languages': Language,
+    'contact_messages': ContactMessage,
+}
+
+FORMATS = ("json", "ndjson", "yaml", "csv")
+
+READ_CHUNK_SIZE = 64 * 1024
+
+def detect_format(path: str) -> str:
+    suffix = path.rsplit(".", 1)[-1].lower()
+    if suffix in ("jsonl", "ndjson"):
+        return "ndjson"
+    if suffix in ("yaml", "yml"):
+        return "yaml"
+    if suffix in FORMATS:
+        return suffix
+    raise ValueError(f"Cannot tell the format of {path}; pass --format")
+
+# Readers: each yields one record at a time, holding at most one record (plus a read chunk) in memory
+
+def iter_json(f: IO[str]) -> Iterator[Any]:
+    """Items of a top-level JSON array, or a single top-level object, decoded incrementally"""
+    decoder = json.JSONDecoder()
+    buffer, position = "", 0
+    in_array = None
+    while True:
+        separators = " \t\r\n," if in_array else " \t\r\n"
+        while position < len(buffer) and buffer[position] in separators:
+            position += 1
+        if position == len(buffer):
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                if in_array:
+                    raise ValueError("Unterminated JSON array")
+                return
+            buffer, position = chunk, 0
+            continue
+        if in_array is None:
+            in_array = buffer[position] == "["
+            if in_array:
+                position += 1
+                continue
+        if in_array and buffer[position] == "]":
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The item continues past the buffer; read more unless the file is exhausted
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                raise
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield item
+        if not in_array:
+            return
+        if position > READ_CHUNK_SIZE:
+            # Drop the text already decoded so the buffer stays around one chunk
+            buffer, position = buffer[position:], 0
+
+def iter_ndjson(f: IO[str]) -> Iterator[Any]:
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+def iter_yaml(f: IO[str]) -> Iterator[Any]:
+    """Documents of a multi-document YAML stream; a document holding a list yields its items"""
+    if yaml is None:
+        raise ValueError("YAML support needs PyYAML installed")
+    for document in yaml.load_all(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+        if isinstance(document, list):
+            yield from document
+        elif document is not None:
+            yield document
+
+def iter_csv(f: IO[str]) -> Iterator[dict]:
+    """Rows as strings; list and object cells hold JSON, decoded by BatchValidator(decode_json=True)"""
+    for row in csv.DictReader(f):
+        # Empty cells fall back to the model defaults
+        yield {k: v for k, v in row.items() if v not in ("", None)}
+
+READERS = {"json": iter_json, "ndjson": iter_ndjson, "yaml": iter_yaml, "csv": iter_csv}
+
+def batched(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _is_container(annotation: Any) -> bool:
+    """Whether a field holds a list or an object, Optional or not"""
+    origin = get_origin(annotation)
+    if origin is Union:
+        return any(_is_container(arg) for arg in get_args(annotation) if arg is not type(None))
+    return (origin or annotation) in (list, dict)
+
+def json_fields(model: Type[BaseModel]) -> Set[str]:
+    return {name for name, field in model.model_fields.items() if _is_container(field.annotation)}
+
+def _object_id(value: Any) -> Any:
+    return ObjectId(value) if isinstance(value, str) and ObjectId.is_valid(value) else value
+
+class BatchValidator:
+    """Validates records against a model a whole batch at a time and turns them into documents.
+
+    With decode_json, list and object fields given as strings (CSV cells) are
+    decoded from JSON first; other fields are left as the text they are.
+    """
+
+    def __init__(self, model: Type[BaseModel], decode_json: bool = False):
+        self.model = model
+        self.adapter = TypeAdapter(List[model])
+        self.json_fields = json_fields(model) if decode_json else set()
+
+    def _decode(self, record: dict) -> Optional[str]:
+        """Decode record's JSON cells in place, returning the first field that is not valid JSON"""
+        for field in self.json_fields:
+            if isinstance(record.get(field), str):
+                try:
+                    record[field] = json.loads(record[field])
+                except ValueError:
+                    return field
+        return None
+
+    def documents(self, records: List[dict], offset: int = 0) -> Tuple[List[dict], List[str]]:
+        """(documents ready to write, error messages) for one batch; offset numbers records in messages"""
+        ids = [record.pop("_id", None) if isinstance(record, dict) else None for record in records]
+        errors = []
+        keep = []
+        for index, record in enumerate(records):
+            field = self._decode(record) if self.json_fields and isinstance(record, dict) else None
+            if field is None:
+                keep.append(index)
+            else:
+                errors.append(f"record {offset + index + 1}: {field}: Invalid JSON")
+        try:
+            models = self.adapter.validate_python([records[i] for i in keep])
+        except ValidationError as e:
+            bad = set()
+            for error in e.errors():
+                index = keep[error["loc"][0]]
+                bad.add(index)
+                field = ".".join(str(part) for part in error["loc"][1:])
+                errors.append(f"record {offset + index + 1}: {field or 'record'}: {error['msg']}")
+            keep = [i for i in keep if i not in bad]
+            models = self.adapter.validate_python([records[i] for i in keep])
+
+        documents = []
+        for model, index in zip(models, keep):
+            doc = model.model_dump(exclude={"id"})
+            if ids[index] is not None:
+                doc["_id"] = _object_id(ids[index])
+            documents.append(doc)
+        return documents, errors
+
+# Writers: export one document at a time
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return dumps(value).decode("utf-8")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None:
+        return ""
+    return str(value) if isinstance(value, ObjectId) else value
+
+class RecordWriter:
+    """Streams exported documents to a file in one of FORMATS"""
+
+    def __init__(self, f: IO[str], format: str, fields: Optional[List[str]] = None):
+        if format == "yaml" and yaml is None:
+            raise ValueError("YAML support needs PyYAML installed")
+        self.f = f
+        self.format = format
+        self.count = 0
+        self._csv = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore") if format == "csv" else None
+
+    def __enter__(self):
+        if self.format == "json":
+            self.f.write("[")
+        elif self._csv is not None:
+            self._csv.writeheader()
+        return self
+
+    def write(self, doc: dict):
+        if self.format == "csv":
+            self._csv.writerow({k: _csv_value(v) for k, v in doc.items()})
+        else:
+            # Round-trip through JSON so ObjectIds and datetimes come out as plain strings
+            encoded = dumps(doc).decode("utf-8")
+            if self.format == "json":
+                self.f.write(("," if self.count else "") + "\n  " + encoded)
+            elif self.format == "ndjson":
+                self.f.write(encoded + "\n")
+            else:
+                yaml.safe_dump(json.loads(encoded), self.f, explicit_start=True, allow_unicode=True, sort_keys=False)
+        self.count += 1
+
+    def __exit__(self, *exc):
+        if self.format == "json":
+            self.f.write("\n]\n" if self.count else "]\n")
+        return False
+
+def csv_fields(model: Type[BaseModel]) -> List[str]:
+    return ["_id"] + [name for name in model.model_fields if name != "id"]
+
+class Progress:
+    """Periodic progress lines with throughput, so long imports show they are alive"""
+
+    def __init__(self, label: str, every: int = 10_000):
+        self.label = label
+        self.every = every
+        self.done = 0
+        self.failed = 0
+        self._started = datetime.utcnow()
+        self._next = every
+
+    def advance(self, done: int, failed: int = 0):
+        self.done += done
+        self.failed += failed
+        if self.done + self.failed >= self._next:
+            self._next += self.every
+            self.report()
+
+    def report(self):
+        elapsed = (datetime.utcnow() - self._started).total_seconds() or 1e-9
+        logging.info(f"{self.label}: {self.done} written, {self.failed} rejected ({self.done / elapsed:.0f}/s)")
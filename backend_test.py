@@ -2,10 +2,17 @@
 """
 Portfolio Backend API Test Suite
 Tests all portfolio API endpoints for functionality and data integrity.
+
+Run it against each repository backend by starting the server with
+PORTFOLIO_BACKEND=mongo, then PORTFOLIO_BACKEND=sqlite (after build_sqlite.py):
+    python backend_test.py http://localhost:8001
+The base URL may also come from BACKEND_URL; it defaults to the preview deployment.
+tests/test_backends.py compares both backends' read responses in-process, without a server.
 """
 
 import requests
 import json
+import os
 import sys
 from datetime import datetime
 
@@ -294,6 +301,11 @@ class PortfolioAPITester:
         """Run all backend API tests"""
         print("🚀 Starting Portfolio Backend API Testing")
         print(f"🔗 Base URL: {self.base_url}")
+        try:
+            backend = requests.get(f"{self.base_url}/health", timeout=10).json().get("backend", "unknown")
+        except Exception:
+            backend = "unknown"
+        print(f"🗄️  Repository backend: {backend}")
         print("=" * 60)
         
         self.test_personal_info_api()
@@ -332,6 +344,7 @@ class PortfolioAPITester:
         return self.results['failed'] == 0
 
 if __name__ == "__main__":
-    tester = PortfolioAPITester()
+    base_url = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("BACKEND_URL")
+    tester = PortfolioAPITester(base_url.rstrip("/")) if base_url else PortfolioAPITester()
     success = tester.run_all_tests()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import React from 'react';
 import { BrowserRouter, Routes, Route } from 'react-router-dom';
 import Navigation from './components/Navigation';
+import { PortfolioProvider } from './hooks/usePortfolio';
 import HomePage from './pages/HomePage';
 import ExperiencePage from './pages/ExperiencePage';
 import SkillsPage from './pages/SkillsPage';
@@ -10,17 +11,19 @@ import './App.css';
 function App() {
   return (
     <div className="App">
-      <BrowserRouter>
-        <Navigation />
-        <main className="relative">
-          <Routes>
-            <Route path="/" element={<HomePage />} />
-            <Route path="/experience" element={<ExperiencePage />} />
-            <Route path="/skills" element={<SkillsPage />} />
-            <Route path="/contact" element={<ContactPage />} />
-          </Routes>
-        </main>
-      </BrowserRouter>
+      <PortfolioProvider>
+        <BrowserRouter>
+          <Navigation />
+          <main className="relative">
+            <Routes>
+              <Route path="/" element={<HomePage />} />
+              <Route path="/experience" element={<ExperiencePage />} />
+              <Route path="/skills" element={<SkillsPage />} />
+              <Route path="/contact" element={<ContactPage />} />
+            </Routes>
+          </main>
+        </BrowserRouter>
+      </PortfolioProvider>
     </div>
   );
 }
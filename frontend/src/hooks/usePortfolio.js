@@ -1,167 +1,41 @@
-import { useState, useEffect } from 'react';
+import React, { createContext, useContext, useState, useEffect } from 'react';
 import { portfolioAPI } from '../services/api';
 
-// Personal Information Hook
-export const usePersonalInfo = () => {
-  const [data, setData] = useState(null);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    const fetchPersonalInfo = async () => {
-      try {
-        setLoading(true);
-        const response = await portfolioAPI.getPersonalInfo();
-        setData(response.data);
-        setError(null);
-      } catch (err) {
-        setError(err.message || 'Failed to fetch personal information');
-        console.error('Error fetching personal info:', err);
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchPersonalInfo();
-  }, []);
-
-  return { data, loading, error };
-};
-
-// Experiences Hook
-export const useExperiences = () => {
-  const [data, setData] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    const fetchExperiences = async () => {
-      try {
-        setLoading(true);
-        const response = await portfolioAPI.getExperiences();
-        setData(response.data);
-        setError(null);
-      } catch (err) {
-        setError(err.message || 'Failed to fetch experiences');
-        console.error('Error fetching experiences:', err);
-      } finally {
-        setLoading(false);
-      }
-    };
+// Whole Portfolio Provider (one request shared by every page)
+const PortfolioContext = createContext({ data: null, loading: true, error: null });
 
-    fetchExperiences();
-  }, []);
-
-  return { data, loading, error };
-};
-
-// Skills Hook
-export const useSkills = () => {
+export const PortfolioProvider = ({ children }) => {
   const [data, setData] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
   useEffect(() => {
-    const fetchSkills = async () => {
+    const fetchPortfolio = async () => {
       try {
         setLoading(true);
-        const response = await portfolioAPI.getSkills();
+        const response = await portfolioAPI.getPortfolio();
         setData(response.data);
         setError(null);
       } catch (err) {
-        setError(err.message || 'Failed to fetch skills');
-        console.error('Error fetching skills:', err);
+        setError(err.message || 'Failed to fetch portfolio');
+        console.error('Error fetching portfolio:', err);
       } finally {
         setLoading(false);
       }
     };
 
-    fetchSkills();
+    fetchPortfolio();
   }, []);
 
-  return { data, loading, error };
+  return (
+    <PortfolioContext.Provider value={{ data, loading, error }}>
+      {children}
+    </PortfolioContext.Provider>
+  );
 };
 
-// Education Hook
-export const useEducation = () => {
-  const [data, setData] = useState(null);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    const fetchEducation = async () => {
-      try {
-        setLoading(true);
-        const response = await portfolioAPI.getEducation();
-        setData(response.data);
-        setError(null);
-      } catch (err) {
-        setError(err.message || 'Failed to fetch education');
-        console.error('Error fetching education:', err);
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchEducation();
-  }, []);
-
-  return { data, loading, error };
-};
-
-// Certifications Hook
-export const useCertifications = () => {
-  const [data, setData] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    const fetchCertifications = async () => {
-      try {
-        setLoading(true);
-        const response = await portfolioAPI.getCertifications();
-        setData(response.data);
-        setError(null);
-      } catch (err) {
-        setError(err.message || 'Failed to fetch certifications');
-        console.error('Error fetching certifications:', err);
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchCertifications();
-  }, []);
-
-  return { data, loading, error };
-};
-
-// Languages Hook
-export const useLanguages = () => {
-  const [data, setData] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
-
-  useEffect(() => {
-    const fetchLanguages = async () => {
-      try {
-        setLoading(true);
-        const response = await portfolioAPI.getLanguages();
-        setData(response.data);
-        setError(null);
-      } catch (err) {
-        setError(err.message || 'Failed to fetch languages');
-        console.error('Error fetching languages:', err);
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchLanguages();
-  }, []);
-
-  return { data, loading, error };
-};
+// Whole Portfolio Hook
+export const usePortfolio = () => useContext(PortfolioContext);
 
 // Contact Form Hook
 export const useContactForm = () => {
@@ -196,4 +70,4 @@ export const useContactForm = () => {
   };
 
   return { submitForm, loading, error, success, resetForm };
-};
\ No newline at end of file
+};
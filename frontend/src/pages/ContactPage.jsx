@@ -1,9 +1,10 @@
 import React, { useState } from 'react';
 import { Mail, Phone, MapPin, Linkedin, Send, CheckCircle, FileText, Upload, Loader2 } from 'lucide-react';
-import { usePersonalInfo, useContactForm } from '../hooks/usePortfolio';
+import { usePortfolio, useContactForm } from '../hooks/usePortfolio';
 
 const ContactPage = () => {
-  const { data: personalInfo, loading: personalLoading } = usePersonalInfo();
+  const { data: portfolio, loading: personalLoading } = usePortfolio();
+  const personalInfo = portfolio?.personal;
   const { submitForm, loading: submitting, error: submitError, success, resetForm } = useContactForm();
   
   const [formData, setFormData] = useState({
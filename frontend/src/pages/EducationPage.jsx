@@ -1,10 +1,11 @@
 import React, { useState } from 'react';
 import { GraduationCap, Award, Calendar, MapPin, Star, Trophy, BookOpen, Loader2 } from 'lucide-react';
-import { useEducation, useCertifications } from '../hooks/usePortfolio';
+import { usePortfolio } from '../hooks/usePortfolio';
 
 const EducationPage = () => {
-  const { data: education, loading: educationLoading, error: educationError } = useEducation();
-  const { data: certifications, loading: certificationsLoading, error: certificationsError } = useCertifications();
+  const { data: portfolio, loading, error } = usePortfolio();
+  const education = portfolio?.education;
+  const certifications = portfolio?.certifications ?? [];
   const [activeTab, setActiveTab] = useState('education');
 
   const tabs = [
@@ -12,9 +13,6 @@ const EducationPage = () => {
     { id: 'certifications', label: 'Sertifikasi', icon: Award },
   ];
 
-  const loading = educationLoading || certificationsLoading;
-  const error = educationError || certificationsError;
-
   const getCertificationTypeColor = (type) => {
     const colorMap = {
       'Professional Certification': 'from-blue-600 to-blue-400',
@@ -1,9 +1,10 @@
 import React, { useState } from 'react';
 import { Calendar, MapPin, ChevronDown, ChevronUp, Building2, CheckCircle, Loader2 } from 'lucide-react';
-import { useExperiences } from '../hooks/usePortfolio';
+import { usePortfolio } from '../hooks/usePortfolio';
 
 const ExperiencePage = () => {
-  const { data: experiences, loading, error } = useExperiences();
+  const { data: portfolio, loading, error } = usePortfolio();
+  const experiences = portfolio?.experiences ?? [];
   const [expandedCards, setExpandedCards] = useState({});
 
   const toggleCard = (id) => {
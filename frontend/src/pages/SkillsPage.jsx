@@ -9,11 +9,12 @@ import {
   TrendingUp,
   Loader2
 } from 'lucide-react';
-import { useSkills, useLanguages } from '../hooks/usePortfolio';
+import { usePortfolio } from '../hooks/usePortfolio';
 
 const SkillsPage = () => {
-  const { data: skills, loading: skillsLoading, error: skillsError } = useSkills();
-  const { data: languages, loading: languagesLoading, error: languagesError } = useLanguages();
+  const { data: portfolio, loading, error } = usePortfolio();
+  const skills = portfolio?.skills;
+  const languages = portfolio?.languages ?? [];
   const [activeCategory, setActiveCategory] = useState('all');
 
   const skillCategories = [
@@ -24,9 +25,6 @@ const SkillsPage = () => {
     { id: 'soft', label: 'Soft Skills', icon: Heart }
   ];
 
-  const loading = skillsLoading || languagesLoading;
-  const error = skillsError || languagesError;
-
   if (loading) {
     return (
       <div className="min-h-screen bg-gradient-to-br from-gray-900 via-black to-gray-800 flex items-center justify-center">
@@ -52,6 +52,9 @@ apiClient.interceptors.response.use(
 
 // API service functions
 export const portfolioAPI = {
+  // Whole portfolio in a single request
+  getPortfolio: () => apiClient.get('/portfolio'),
+  
   // Personal Information
   getPersonalInfo: () => apiClient.get('/personal'),
   
@@ -0,0 +1,57 @@
+import os
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Same setup as benchmarks/load_test.py: backend modules on the path, Motor swapped for mongomock-motor
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "portfolio_test")
+sys.path.insert(0, str(BACKEND_DIR))
+
+import mongomock_motor
+from motor import motor_asyncio
+
+motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+@pytest.fixture
+def collection():
+    """Empty mongomock-motor collection"""
+    return mongomock_motor.AsyncMongoMockClient()["portfolio_test"]["items"]
+
+@pytest.fixture
+def server():
+    """The app module on a freshly emptied database and cache"""
+    import server
+    from services.cache import portfolio_cache
+
+    portfolio_cache.invalidate()
+    yield server
+    if server.db.client is not None:
+        asyncio.run(server.db.client.drop_database(os.environ["DB_NAME"]))
+    portfolio_cache.invalidate()
+
+@pytest.fixture
+def api(server):
+    """Factory for an HTTP client talking to the app in-process"""
+    import httpx
+
+    def make(**kwargs) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test", **kwargs)
+    return make
+
+@pytest.fixture
+def seeded(server):
+    """server with the sample portfolio from seed_data.py"""
+    from seed_data import sample_data
+    from services.cache import portfolio_cache
+    from services.seeding import SEED_KEYS, as_documents, sync_portfolio
+
+    data = {name: as_documents(sample_data[name]) for name in SEED_KEYS}
+    server.db.database()
+    asyncio.run(sync_portfolio(server.db.client, server.db, data))
+    portfolio_cache.invalidate()
+    return server
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from services.cache import portfolio_cache
+from services.repository import MongoRepository, SQLiteRepository, write_sqlite
+from services.tenancy import DEFAULT_TENANT
+
+# Every read endpoint, paged and streamed list variants included; next links are followed
+READ_PATHS = [
+    "/api/portfolio",
+    "/api/personal",
+    "/api/experiences",
+    "/api/experiences?limit=2",
+    "/api/experiences?format=ndjson",
+    "/api/skills",
+    "/api/skills?category=technical",
+    "/api/skills?category=soft&subcategory=social",
+    "/api/education",
+    "/api/certifications",
+    "/api/certifications?limit=1",
+    "/api/certifications?format=ndjson",
+    "/api/languages",
+    "/api/languages?limit=2",
+    "/api/search?q=recruitment",
+]
+
+async def read_all(api):
+    responses = {}
+    async with api() as client:
+        for start in READ_PATHS:
+            pages, path = [], start
+            while path:
+                response = await client.get(path)
+                pages.append((response.status_code, response.headers.get("etag"),
+                              response.headers.get("x-next-cursor"), response.content))
+                link = response.headers.get("link")
+                path = link[link.index("/api"):link.index(">")] if link else None
+            responses[start] = pages
+    return responses
+
+@pytest.fixture(params=["mongo", "sqlite"])
+def backend(request, seeded, monkeypatch, tmp_path):
+    """PORTFOLIO_BACKEND under test, serving the seeded portfolio"""
+    if request.param == "sqlite":
+        path = tmp_path / "portfolio.sqlite3"
+        asyncio.run(write_sqlite(path, MongoRepository(seeded.db), [DEFAULT_TENANT]))
+        monkeypatch.setattr(seeded, "repository", SQLiteRepository(path))
+    return request.param
+
+def test_read_endpoints_match_mongo(backend, seeded, api, monkeypatch):
+    served = asyncio.run(read_all(api))
+
+    monkeypatch.setattr(seeded, "repository", MongoRepository(seeded.db))
+    portfolio_cache.invalidate()
+    reference = asyncio.run(read_all(api))
+
+    assert list(served) == READ_PATHS
+    for path in READ_PATHS:
+        assert all(status == 200 for status, *_ in served[path]), path
+        assert served[path] == reference[path], path
+    # The seeded portfolio is there, and the paged variants really are paged
+    assert b"Muhammad Khoirul Wahid Azmi" in served["/api/portfolio"][0][3]
+    assert len(served["/api/experiences?limit=2"]) > 1
+
+def test_bad_cursor_is_rejected(backend, api):
+    async def run():
+        async with api() as client:
+            return await client.get("/api/experiences?after=not-a-cursor")
+
+    assert asyncio.run(run()).status_code == 400
+
+def test_export_leaves_the_skills_view_alone(seeded, tmp_path):
+    from services.portfolio import SKILLS_VIEW_COLLECTION
+
+    async def run():
+        await seeded.db[SKILLS_VIEW_COLLECTION].drop()
+        await write_sqlite(tmp_path / "portfolio.sqlite3", MongoRepository(seeded.db), [DEFAULT_TENANT])
+        return await seeded.db[SKILLS_VIEW_COLLECTION].count_documents({})
+
+    assert asyncio.run(run()) == 0
+
+def test_raw_motor_database_counts_as_connected(seeded):
+    assert MongoRepository(seeded.db.database()).connected is True
@@ -0,0 +1,38 @@
+import asyncio
+from datetime import datetime, timezone
+
+import services.bootstrap
+from services.http_cache import SerializedResponse
+
+SNAPSHOT_BODY = b'[{"title":"From the snapshot"}]'
+
+def test_snapshot_answers_while_startup_connects_in_background(server, api, monkeypatch):
+    monkeypatch.setitem(services.bootstrap.bootstrap_responses, "experiences",
+                        SerializedResponse(SNAPSHOT_BODY, datetime(2026, 1, 1, tzinfo=timezone.utc)))
+    monkeypatch.setattr(server.db, "connected", False)
+    reachable = asyncio.Event()
+    connect = server.db.connect
+
+    async def slow_connect(connections: int = 1):
+        # MongoDB is still starting up
+        await reachable.wait()
+        await connect(connections)
+
+    monkeypatch.setattr(server.db, "connect", slow_connect)
+
+    async def run():
+        await server.db.experiences.insert_one({"title": "From MongoDB", "company": "C", "period": "2020",
+                                                "location": "L", "achievements": [], "is_active": True,
+                                                "order": 0})
+        async with server.app.router.lifespan_context(server.app):
+            async with api() as client:
+                cold = await client.get("/api/experiences")
+                reachable.set()
+                while not server.db.connected:
+                    await asyncio.sleep(0.01)
+                warm = await client.get("/api/experiences")
+        return cold, warm
+
+    cold, warm = asyncio.run(asyncio.wait_for(run(), 5))
+    assert cold.status_code == 200 and cold.content == SNAPSHOT_BODY
+    assert [exp["title"] for exp in warm.json()] == ["From MongoDB"]
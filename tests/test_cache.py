@@ -0,0 +1,168 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import services.cache
+from services.cache import PortfolioCache
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the cache's clock; asyncio keeps the real one
+    monkeypatch.setattr(services.cache, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+class Layers:
+    """A section entry and a serialized entry built from it, like fetch_serialized over _cached"""
+
+    def __init__(self, cache: PortfolioCache):
+        self.cache = cache
+        self.source = "old"
+
+    async def section(self):
+        async def load():
+            return self.source
+        return await self.cache.get_or_load("experiences", load, ["experiences"])
+
+    async def serialized(self):
+        async def load():
+            return f"json:{await self.section()}"
+        return await self.cache.get_or_load("experiences:json", load, ["experiences"])
+
+async def settle():
+    # Let background refreshes run to completion
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+def test_refresh_reloads_stale_inner_entries(clock):
+    layers = Layers(PortfolioCache(default_ttl=2, stale_ttl=10))
+
+    async def run():
+        assert await layers.serialized() == "json:old"
+        # Changed without an invalidation (missed event); both layers go stale together
+        layers.source = "new"
+        clock.now = 2.5
+        stale = await layers.serialized()
+        await settle()
+        clock.now = 2.6
+        return stale, await layers.serialized()
+
+    stale, refreshed = asyncio.run(run())
+    assert stale == "json:old"
+    assert refreshed == "json:new"
+
+def test_outer_entry_expires_with_the_entries_it_read(clock):
+    cache = PortfolioCache(default_ttl=2, stale_ttl=10)
+    layers = Layers(cache)
+
+    async def run():
+        await layers.section()
+        # Built from a section loaded 1.9s earlier: it must not live a full TTL past that
+        clock.now = 1.9
+        await layers.serialized()
+        expires_at = cache._entries["experiences:json"].expires_at
+        layers.source = "new"
+        clock.now = 2.5
+        await layers.serialized()
+        await settle()
+        return expires_at, await layers.serialized()
+
+    expires_at, value = asyncio.run(run())
+    assert expires_at == 2
+    assert value == "json:new"
+
+def test_data_is_never_older_than_ttl_plus_stale_ttl(clock):
+    ttl, stale_ttl = 2, 3
+    layers = Layers(PortfolioCache(default_ttl=ttl, stale_ttl=stale_ttl))
+
+    async def run():
+        changed_at = None
+        step = 0.25
+        while clock.now < 20:
+            if changed_at is None and clock.now >= 4:
+                layers.source, changed_at = "new", clock.now
+            value = await layers.serialized()
+            await settle()
+            if changed_at is not None and value == "json:old":
+                assert clock.now - changed_at <= ttl + stale_ttl
+            clock.now += step
+        return value
+
+    assert asyncio.run(run()) == "json:new"
+
+def test_plain_callers_still_get_stale_values_while_reloading(clock):
+    cache = PortfolioCache(default_ttl=2, stale_ttl=10)
+    calls = []
+
+    async def load():
+        calls.append(clock.now)
+        return len(calls)
+
+    async def run():
+        await cache.get_or_load("k", load, ["k"])
+        clock.now = 3
+        stale = await cache.get_or_load("k", load, ["k"])
+        await settle()
+        return stale, await cache.get_or_load("k", load, ["k"])
+
+    assert asyncio.run(run()) == (1, 2)
+    assert calls == [0, 3]
+
+def test_invalidating_one_tenant_keeps_other_tenants_loads():
+    cache = PortfolioCache(default_ttl=60)
+    release = asyncio.Event()
+    calls = []
+
+    def loader(label):
+        async def load():
+            calls.append(label)
+            await release.wait()
+            return label
+        return load
+
+    async def run():
+        alice = asyncio.ensure_future(cache.get_or_load("alice:skills", loader("alice"), ["skills"], "alice"))
+        bob = asyncio.ensure_future(cache.get_or_load("bob:skills", loader("bob"), ["skills"], "bob"))
+        bob_languages = asyncio.ensure_future(
+            cache.get_or_load("bob:languages", loader("bob languages"), ["languages"], "bob"))
+        await asyncio.sleep(0)
+        cache.invalidate("skills", "alice")
+        cache.invalidate("languages", "bob")
+        # bob's skills load is still in flight and is joined rather than restarted
+        joined = asyncio.ensure_future(cache.get_or_load("bob:skills", loader("bob again"), ["skills"], "bob"))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(alice, bob, bob_languages, joined)
+        return sorted(cache._entries)
+
+    stored = asyncio.run(run())
+    assert calls == ["alice", "bob", "bob languages"]
+    # Loads an invalidation covered finish for their callers but are not stored
+    assert stored == ["bob:skills"]
+
+def test_invalidating_every_tenant_discards_all_covered_loads():
+    cache = PortfolioCache(default_ttl=60)
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "old"
+
+    async def run():
+        loads = [asyncio.ensure_future(cache.get_or_load(f"{t}:skills", load, ["skills"], t)) for t in ("a", "b")]
+        other = asyncio.ensure_future(cache.get_or_load("a:languages", load, ["languages"], "a"))
+        await asyncio.sleep(0)
+        cache.invalidate("skills")
+        release.set()
+        await asyncio.gather(*loads, other)
+        return sorted(cache._entries)
+
+    assert asyncio.run(run()) == ["a:languages"]
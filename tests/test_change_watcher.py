@@ -0,0 +1,154 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+import services.change_watcher
+from services.change_watcher import ChangeWatcher, PollState
+
+class Invalidations(list):
+    """Stands in for portfolio_cache, recording (collection, tenant_id) per invalidation"""
+
+    def invalidate(self, collection=None, tenant_id=None):
+        self.append((collection, tenant_id))
+
+@pytest.fixture
+def invalidations(monkeypatch):
+    recorded = Invalidations()
+    monkeypatch.setattr(services.change_watcher, "portfolio_cache", recorded)
+    return recorded
+
+async def wait_for(condition, timeout: float = 5):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+def test_flush_applies_each_target_once(invalidations):
+    watcher = ChangeWatcher(db=None)
+    watcher.source = "change_stream"
+    for target in [("skills", "alice"), ("skills", "alice"), ("skills", None), ("experiences", "bob"),
+                   ("rate_limits", None)]:
+        watcher.notify(target)
+    watcher.flush()
+    # skills for every tenant covers alice's; collections outside the portfolio are ignored
+    assert invalidations == [("experiences", "bob"), ("skills", None)]
+
+    watcher.notify(("skills", "alice"))
+    watcher.notify((None, None))
+    watcher.flush()
+    assert invalidations[2:] == [(None, None)]
+
+def test_change_events_name_collection_and_tenant(invalidations):
+    watcher = ChangeWatcher(db=None)
+    watcher.source = "change_stream"
+    changes = [
+        {"operationType": "insert", "ns": {"coll": "skills"}, "fullDocument": {"tenant_id": "alice"}},
+        {"operationType": "delete", "ns": {"coll": "languages"}, "documentKey": {"_id": 1}},
+        {"operationType": "update", "ns": {"coll": "collection_versions"},
+         "fullDocument": {"collection": "education", "tenant_id": "bob"}},
+        {"operationType": "delete", "ns": {"coll": "collection_versions"}, "documentKey": {"_id": "carol:languages"}},
+    ]
+    for change in changes:
+        watcher._on_change(change)
+    watcher.flush()
+    assert invalidations == [("education", "bob"), ("languages", None), ("skills", "alice")]
+
+    watcher._on_change({"operationType": "dropDatabase", "ns": {"db": "portfolio"}})
+    watcher.flush()
+    assert invalidations[-1] == (None, None)
+
+def test_polling_picks_up_writes_and_deletes(collection, invalidations):
+    db = collection.database
+    watcher = ChangeWatcher(db, mode="poll", poll_overlap=1, collections=["experiences"])
+    watcher.source = "poll"
+    state = PollState()
+
+    async def poll(report=True):
+        await watcher._poll_collection("experiences", state, report)
+        watcher.flush()
+
+    async def run():
+        await db.experiences.insert_one({"title": "old", "updated_at": datetime.utcnow() - timedelta(minutes=5),
+                                         "tenant_id": "alice"})
+        # The first round only records where things stand
+        await poll(report=False)
+        await poll()
+        assert invalidations == []
+
+        inserted = await db.experiences.insert_one({"title": "new", "updated_at": datetime.utcnow(),
+                                                    "tenant_id": "bob"})
+        await poll()
+        # A new document also changes the count, which covers every tenant
+        assert invalidations == [("experiences", None)]
+        invalidations.clear()
+
+        await db.experiences.update_one({"_id": inserted.inserted_id}, {"$set": {"updated_at": datetime.utcnow() + timedelta(seconds=1)}})
+        await poll()
+        assert invalidations == [("experiences", "bob")]
+        # Seen documents inside the look-back window are not reported twice
+        await poll()
+        assert invalidations == [("experiences", "bob")]
+
+        await db.experiences.delete_one({"_id": inserted.inserted_id})
+        await poll()
+        assert invalidations[1:] == [("experiences", None)]
+
+    asyncio.run(run())
+    assert ("experiences", "alice") not in invalidations
+
+class FakeStream:
+    def __init__(self, changes, token):
+        self.changes = list(changes)
+        self.resume_token = token
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def try_next(self):
+        await asyncio.sleep(0)
+        if not self.changes:
+            return None
+        change = self.changes.pop(0)
+        if isinstance(change, Exception):
+            raise change
+        self.resume_token = change["_id"]
+        return change
+
+class FakeDatabase:
+    """Replica set stand-in: the first stream breaks after one change, the second one resumes"""
+
+    def __init__(self):
+        self.resumed_after = []
+        self.streams = [
+            [{"_id": "t1", "operationType": "insert", "ns": {"coll": "skills"}, "fullDocument": {"tenant_id": "a"}},
+             AutoReconnect("primary stepped down")],
+            [{"_id": "t2", "operationType": "update", "ns": {"coll": "languages"}, "fullDocument": {"tenant_id": "b"}}],
+        ]
+
+    def watch(self, pipeline, resume_after=None, **kwargs):
+        self.resumed_after.append(resume_after)
+        return FakeStream(self.streams.pop(0) if self.streams else [], resume_after)
+
+def test_change_stream_resumes_after_a_dropped_connection(invalidations, monkeypatch):
+    monkeypatch.setattr(services.change_watcher, "RETRY_DELAYS", (0,))
+    db = FakeDatabase()
+
+    async def run():
+        watcher = ChangeWatcher(db, mode="auto")
+        watcher.start()
+        try:
+            await wait_for(lambda: ("languages", "b") in invalidations)
+        finally:
+            await watcher.stop()
+        return watcher.source
+
+    assert asyncio.run(run()) == "change_stream"
+    assert db.resumed_after[:2] == [None, "t1"]
+    # Resumed where it left off, so nothing had to be dropped wholesale
+    assert (None, None) not in invalidations
+    assert invalidations[:2] == [("skills", "a"), ("languages", "b")]
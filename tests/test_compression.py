@@ -0,0 +1,58 @@
+import asyncio
+import gzip
+
+import pytest
+
+from services.compression import SUPPORTED_ENCODINGS, brotli, negotiate_encoding
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=0.5, br;q=0.8", "br" if brotli else "gzip"),
+    ("gzip;q=0.9, br;q=0.2", "gzip"),
+    ("deflate, gzip;q=bogus", None),
+    ("*;q=0.1", SUPPORTED_ENCODINGS[0]),
+    ("*, gzip;q=0", "br" if brotli else None),
+])
+def test_negotiation_follows_q_values(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, SUPPORTED_ENCODINGS) == expected
+
+def test_equal_q_values_prefer_the_first_available():
+    assert negotiate_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert negotiate_encoding("gzip, br", ("gzip",)) == "gzip"
+
+def experience(i: int) -> dict:
+    return {"title": f"Role {i}", "company": "Company", "period": "2020", "location": "Somewhere",
+            "achievements": ["Did a thing worth mentioning"] * 3, "is_active": True, "order": i}
+
+def test_large_responses_are_compressed_and_vary_on_accept_encoding(server, api):
+    async def run():
+        await server.db.experiences.insert_many([experience(i) for i in range(20)])
+        await server.db.languages.insert_one({"language": "English", "level": "Fluent"})
+        async with api() as client:
+            plain = await client.get("/api/experiences", headers={"Accept-Encoding": "identity"})
+            # httpx decodes gzip itself; the raw stream is checked below
+            zipped = await client.get("/api/experiences", headers={"Accept-Encoding": "gzip"})
+            raw = b""
+            async with client.stream("GET", "/api/experiences", headers={"Accept-Encoding": "gzip"}) as response:
+                async for chunk in response.aiter_raw():
+                    raw += chunk
+            small = await client.get("/api/languages", headers={"Accept-Encoding": "gzip"})
+            revalidated = await client.get("/api/experiences", headers={
+                "Accept-Encoding": "gzip", "If-None-Match": zipped.headers["etag"]})
+        return plain, zipped, raw, small, revalidated
+
+    plain, zipped, raw, small, revalidated = asyncio.run(run())
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == zipped.headers["vary"] == "Accept-Encoding"
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["etag"] == "W/" + plain.headers["etag"]
+    assert gzip.decompress(raw) == plain.content
+    assert len(raw) < len(plain.content)
+    # Below HTTP_COMPRESSION_MIN_SIZE the body is sent as is and does not vary
+    assert "content-encoding" not in small.headers and "vary" not in small.headers
+    assert revalidated.status_code == 304
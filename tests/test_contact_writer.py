@@ -0,0 +1,49 @@
+import asyncio
+
+from bson import ObjectId
+
+from services.contact_writer import ContactWriteBuffer
+
+class StalledCollection:
+    """Collection whose first insert_many hangs until cancelled, like a write cut off by shutdown"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.stalled = asyncio.Event()
+
+    async def insert_many(self, docs, ordered=False):
+        if not self.stalled.is_set():
+            self.stalled.set()
+            await asyncio.sleep(3600)
+        return await self.collection.insert_many(docs, ordered=ordered)
+
+def message(i: int) -> dict:
+    return {"_id": ObjectId(), "name": f"n{i}", "email": f"u{i}@example.com", "message": "m"}
+
+def test_stop_keeps_batch_written_by_periodic_flush(collection, tmp_path):
+    async def run():
+        buffer = ContactWriteBuffer(StalledCollection(collection), batch_size=10, flush_interval=0.01,
+                                    spill_path=tmp_path / "spill.jsonl")
+        buffer.start()
+        for i in range(3):
+            buffer.submit(message(i))
+        await asyncio.wait_for(buffer.collection.stalled.wait(), 1)
+        await buffer.stop()
+        return buffer
+
+    buffer = asyncio.run(run())
+    assert asyncio.run(collection.count_documents({})) == 3
+    assert buffer._pending == []
+    assert not (tmp_path / "spill.jsonl").exists()
+
+def test_stop_waits_for_batch_size_flush(collection, tmp_path):
+    async def run():
+        buffer = ContactWriteBuffer(collection, batch_size=2, flush_interval=3600,
+                                    spill_path=tmp_path / "spill.jsonl")
+        buffer.start()
+        for i in range(5):
+            buffer.submit(message(i))
+        await buffer.stop()
+
+    asyncio.run(run())
+    assert asyncio.run(collection.count_documents({})) == 5
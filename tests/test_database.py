@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+from services.database import PoolMonitor
+
+ADDRESS = ("localhost", 27017)
+
+def event() -> SimpleNamespace:
+    return SimpleNamespace(address=ADDRESS)
+
+def test_waiting_checkouts_alone_are_healthy():
+    monitor = PoolMonitor()
+    for _ in range(3):
+        monitor.connection_created(event())
+        monitor.connection_check_out_started(event())
+    monitor.connection_checked_out(event())
+    stats = monitor.stats(max_pool_size=100)
+    assert stats["waiting"] == 2
+    assert not monitor.degraded(stats)
+
+def test_saturation_is_degraded():
+    monitor = PoolMonitor()
+    for _ in range(9):
+        monitor.connection_check_out_started(event())
+        monitor.connection_checked_out(event())
+    assert monitor.degraded(monitor.stats(max_pool_size=10))
+    assert not monitor.degraded(monitor.stats(max_pool_size=100))
+
+def test_checkout_failures_degrade_until_next_check():
+    monitor = PoolMonitor()
+    monitor.connection_check_out_started(event())
+    monitor.connection_check_out_failed(event())
+    assert monitor.degraded(monitor.stats(max_pool_size=100))
+    # No new failures since the last check
+    assert not monitor.degraded(monitor.stats(max_pool_size=100))
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from services.cache import portfolio_cache
+from services.http_cache import etag_matches
+
+UPDATED_AT = datetime(2026, 3, 1, 12, 30)
+
+def experience(i: int) -> dict:
+    return {"title": f"Role {i}", "company": "C", "period": "2020", "location": "L", "achievements": [],
+            "is_active": True, "order": i, "updated_at": UPDATED_AT - timedelta(days=i)}
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+def test_etag_matching_uses_the_weak_comparison():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+
+def test_conditional_requests_get_304(server, api):
+    async def run():
+        await server.db.experiences.insert_many([experience(i) for i in range(2)])
+        async with api(headers={"Accept-Encoding": "identity"}) as client:
+            full = await client.get("/api/experiences")
+            etag, last_modified = full.headers["etag"], full.headers["last-modified"]
+            checks = {
+                "same etag": await client.get("/api/experiences", headers={"If-None-Match": etag}),
+                "weak etag": await client.get("/api/experiences", headers={"If-None-Match": f'"x", W/{etag}'}),
+                "other etag": await client.get("/api/experiences", headers={"If-None-Match": '"other"'}),
+                "same date": await client.get("/api/experiences", headers={"If-Modified-Since": last_modified}),
+                "older date": await client.get("/api/experiences", headers={
+                    "If-Modified-Since": http_date(UPDATED_AT - timedelta(days=1))}),
+                # If-None-Match wins over If-Modified-Since
+                "etag first": await client.get("/api/experiences", headers={
+                    "If-None-Match": '"other"', "If-Modified-Since": last_modified}),
+            }
+        return full, checks
+
+    full, checks = asyncio.run(run())
+    assert full.status_code == 200
+    # The newest updated_at of the documents in the response
+    assert full.headers["last-modified"] == http_date(UPDATED_AT)
+    assert {name: response.status_code for name, response in checks.items()} == {
+        "same etag": 304, "weak etag": 304, "other etag": 200,
+        "same date": 304, "older date": 200, "etag first": 200,
+    }
+    assert checks["same etag"].content == b""
+    assert checks["same etag"].headers["etag"] == full.headers["etag"]
+    assert checks["other etag"].content == full.content
+
+def test_etag_changes_with_the_body(server, api):
+    async def run():
+        await server.db.experiences.insert_one(experience(0))
+        async with api() as client:
+            before = await client.get("/api/experiences")
+            await server.db.experiences.insert_one(experience(1))
+            portfolio_cache.invalidate("experiences")
+            after = await client.get("/api/experiences", headers={"If-None-Match": before.headers["etag"]})
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
@@ -0,0 +1,88 @@
+import asyncio
+from itertools import product
+
+import pytest
+from pymongo import ASCENDING, DESCENDING
+
+import services.indexes
+from services.inbox import INBOX_SORT, inbox_query
+from services.indexes import QueryShape, drop_retired_indexes, uncovered_queries
+
+@pytest.mark.parametrize("multi_tenant", [False, True])
+def test_every_query_shape_is_covered(monkeypatch, multi_tenant):
+    monkeypatch.setattr(services.indexes, "MULTI_TENANT", multi_tenant)
+    assert uncovered_queries() == []
+
+def test_every_inbox_filter_combination_is_declared():
+    declared = set(services.indexes.QUERY_SHAPES)
+    for is_read, email in product([None, False], [None, "a@example.com"]):
+        query = inbox_query(is_read=is_read, email=email)
+        equality = tuple(field for field in ("is_read", "email") if field in query)
+        assert QueryShape("contact_messages", equality=equality, sort=tuple(INBOX_SORT)) in declared
+
+def test_retired_indexes_are_dropped(collection):
+    db = collection.database
+
+    async def run():
+        await db.contact_messages.create_index([("created_at", DESCENDING)], name="created_at_desc")
+        await db.contact_messages.create_index([("tenant_id", ASCENDING), ("is_read", ASCENDING),
+                                                ("created_at", DESCENDING)], name="tenant_id_is_read_created_at_desc")
+        await db.contact_messages.create_index([("email", ASCENDING)], name="email_only")
+        dropped = await drop_retired_indexes(db)
+        return dropped, sorted(await db.contact_messages.index_information())
+
+    dropped, remaining = asyncio.run(run())
+    assert sorted(dropped) == ["contact_messages.created_at_desc", "contact_messages.tenant_id_is_read_created_at_desc"]
+    assert remaining == ["_id_", "email_only"]
+
+def test_retired_indexes_match_on_keys_not_names(collection):
+    db = collection.database
+
+    async def run():
+        await db.certifications.create_index([("order", ASCENDING)], name="order_legacy")
+        # Hand-made indexes that merely share a retired name or key spec stay
+        await db.certifications.create_index([("issuer", ASCENDING)], name="order")
+        await db.certifications.create_index([("order", ASCENDING)], name="order_unique", unique=True,
+                                             partialFilterExpression={"order": {"$gt": 0}})
+        dropped = await drop_retired_indexes(db)
+        return dropped, sorted(await db.certifications.index_information())
+
+    dropped, remaining = asyncio.run(run())
+    assert dropped == ["certifications.order_legacy"]
+    assert remaining == ["_id_", "order", "order_unique"]
+
+def test_indexes_are_created_when_dropping_retired_ones_fails(collection, monkeypatch):
+    from pymongo.errors import ServerSelectionTimeoutError
+
+    async def unreachable(db):
+        raise ServerSelectionTimeoutError("no servers")
+
+    monkeypatch.setattr(services.indexes, "drop_retired_indexes", unreachable)
+    db = collection.database
+
+    async def run():
+        await services.indexes.ensure_indexes(db)
+        return await db.certifications.index_information()
+
+    assert "order_id" in asyncio.run(run())
+
+@pytest.mark.parametrize("multi_tenant", [False, True])
+def test_ensure_indexes_creates_every_declared_index_once(collection, monkeypatch, multi_tenant):
+    monkeypatch.setattr(services.indexes, "MULTI_TENANT", multi_tenant)
+    db = collection.database
+
+    async def run():
+        assert await services.indexes.ensure_indexes(db) == []
+        # A second run is a no-op, as on every restart
+        await services.indexes.ensure_indexes(db)
+        return {name: await db[name].index_information() for name in services.indexes.declared_indexes()}
+
+    created = asyncio.run(run())
+    for name, models in services.indexes.declared_indexes().items():
+        for model in models:
+            info = created[name][model.document["name"]]
+            assert [(field, int(direction)) for field, direction in info["key"]] == services.indexes.index_keys(model)
+    experiences = created["experiences"]
+    assert ("tenant_id_is_active_order_id" in experiences) is multi_tenant
+    assert ("is_active_order_id" in experiences) is not multi_tenant
+    assert created["rate_limits"]["expires_at_ttl"]["expireAfterSeconds"] == 0
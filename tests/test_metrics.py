@@ -0,0 +1,54 @@
+import asyncio
+
+from services.metrics import Counter, Histogram
+
+def sample(text: str, line_start: str) -> float:
+    """Value of the exposition line starting with line_start, 0 when the series does not exist yet"""
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/api/x")
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/api/x",le="0.1"} 2',
+        'latency_seconds_bucket{route="/api/x",le="1.0"} 3',
+        'latency_seconds_bucket{route="/api/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/api/x"} 3.65',
+        'latency_seconds_count{route="/api/x"} 4',
+    ]
+
+def test_label_values_are_escaped():
+    counter = Counter("requests_total", "Requests", ("route",))
+    counter.inc('a"b\\c\nd')
+    assert counter.render()[-1] == 'requests_total{route="a\\"b\\\\c\\nd"} 1'
+
+def test_requests_are_counted_per_route_template(server, api):
+    experiences = 'http_requests_total{method="GET",route="/api/experiences",status="200"}'
+    unmatched = 'http_requests_total{method="GET",route="unmatched",status="404"}'
+    latency = 'http_request_duration_seconds_count{method="GET",route="/api/experiences"}'
+
+    async def run():
+        async with api() as client:
+            before = (await client.get("/metrics")).text
+            await client.get("/api/experiences")
+            await client.get("/api/experiences?limit=1")
+            await client.get("/no/such/path/1")
+            await client.get("/no/such/path/2")
+            return before, await client.get("/metrics")
+
+    before, after = asyncio.run(run())
+    assert after.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = after.text
+    # Query strings and unknown paths never become label values of their own
+    assert sample(text, experiences) - sample(before, experiences) == 2
+    assert sample(text, latency) - sample(before, latency) == 2
+    assert sample(text, unmatched) - sample(before, unmatched) == 2
+    assert "/no/such/path" not in text
+    assert "# TYPE portfolio_cache_hit_ratio gauge" in text
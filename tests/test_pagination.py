@@ -0,0 +1,65 @@
+import asyncio
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from services.pagination import decode_cursor, encode_cursor
+
+SORT = [("created_at", -1), ("_id", -1)]
+
+def test_cursor_round_trip_keeps_bson_types():
+    doc = {"_id": ObjectId(), "created_at": datetime(2026, 1, 2, 3, 4, 5, 6000), "name": "ignored"}
+    assert decode_cursor(encode_cursor(doc, SORT), SORT) == [doc["created_at"], doc["_id"]]
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"{not json").decode(),
+    base64.urlsafe_b64encode(json.dumps({"a": 1}).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps([1]).encode()).decode(),
+])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, SORT)
+
+def test_pages_walk_every_document_once_despite_ties(server, api):
+    async def run():
+        # Several experiences share an order value, so only _id tells them apart
+        await server.db.experiences.insert_many([
+            {"title": f"Role {i}", "company": "C", "period": "2020", "location": "L", "achievements": [],
+             "is_active": i != 3, "order": i // 3, "created_at": datetime(2026, 1, 1), "updated_at": datetime(2026, 1, 1)}
+            for i in range(8)
+        ])
+        async with api() as client:
+            full = (await client.get("/api/experiences")).json()
+            pages, path = [], "/api/experiences?limit=3"
+            while path:
+                response = await client.get(path)
+                pages.append(response.json())
+                cursor = response.headers.get("x-next-cursor")
+                path = f"/api/experiences?limit=3&after={cursor}" if cursor else None
+            streamed = await client.get("/api/experiences?format=ndjson")
+            streamed_page = await client.get(f"/api/experiences?format=ndjson&limit=2&after={cursor or ''}")
+            return full, pages, streamed, streamed_page
+
+    full, pages, streamed, streamed_page = asyncio.run(run())
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [exp["_id"] for page in pages for exp in page] == [exp["_id"] for exp in full]
+    assert "Role 3" not in [exp["title"] for exp in full]
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in streamed.text.splitlines()] == full
+    assert len(streamed_page.text.splitlines()) == 2
+
+def test_bad_cursor_or_limit_is_a_client_error(server, api):
+    async def run():
+        async with api() as client:
+            return [(await client.get(path)).status_code for path in (
+                "/api/experiences?after=garbage",
+                "/api/certifications?limit=1&after=" + base64.urlsafe_b64encode(b"[1]").decode(),
+                "/api/languages?limit=0",
+                "/api/languages?limit=100000",
+            )]
+
+    assert asyncio.run(run()) == [400, 400, 422, 422]
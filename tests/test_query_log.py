@@ -0,0 +1,112 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from services.query_log import SlowQueryLog, plan_summary, query_shape
+
+COLLSCAN_EXPLAIN = {
+    "queryPlanner": {
+        "winningPlan": {"stage": "SORT", "sortPattern": {"order": 1},
+                        "inputStage": {"stage": "COLLSCAN", "filter": {"tenant_id": {"$eq": "alice"}}}},
+        "rejectedPlans": [{"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "order_1"}}],
+    },
+    "command": {"find": "skills", "filter": {"tenant_id": "alice"}, "sort": {"order": 1}},
+    "serverInfo": {"host": "db"},
+}
+
+INDEXED_AGGREGATE_EXPLAIN = {
+    "stages": [
+        {"$cursor": {"queryPlanner": {"winningPlan": {
+            "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "tenant_id_1_order_1"}}}}},
+        {"$sort": {"sortKey": {"title": 1}}},
+    ],
+    "command": {"aggregate": "skills", "pipeline": [{"$match": {"tenant_id": "alice"}}, {"$sort": {"title": 1}}]},
+}
+
+def test_plan_summary_flags_collection_scans_and_in_memory_sorts():
+    summary = plan_summary(COLLSCAN_EXPLAIN)
+    # The rejected index plan and the echoed command are not part of what ran
+    assert summary == {"stages": ["SORT", "COLLSCAN"], "indexes": [], "flags": ["COLLSCAN", "in-memory SORT"]}
+
+    summary = plan_summary(INDEXED_AGGREGATE_EXPLAIN)
+    assert summary == {"stages": ["FETCH", "IXSCAN", "$sort"], "indexes": ["tenant_id_1_order_1"],
+                       "flags": ["in-memory SORT"]}
+
+    indexed = {"queryPlanner": {"winningPlan": {
+        "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "tenant_id_1_order_1"}}}}
+    assert plan_summary(indexed)["flags"] == []
+
+def test_query_shape_keeps_structure_and_drops_values():
+    find = {"find": "skills", "filter": {"tenant_id": "alice", "order": {"$gt": 3},
+                                         "$or": [{"category": "web"}, {"level": {"$in": [1, 2]}}]},
+            "sort": {"order": 1}}
+    assert query_shape("find", find) == {
+        "filter": {"tenant_id": "?", "order": {"$gt": "?"}, "$or": [{"category": "?"}, {"level": {"$in": "?"}}]},
+        "sort": {"order": 1},
+    }
+    aggregate = {"aggregate": "skills", "pipeline": [{"$match": {"tenant_id": "bob"}}, {"$sort": {"order": 1}},
+                                                    {"$limit": 10}]}
+    assert query_shape("aggregate", aggregate) == {
+        "pipeline": [{"$match": {"tenant_id": "?"}}, {"$sort": {"order": 1}}, {"$limit": "?"}]}
+    assert query_shape("delete", {"delete": "skills", "deletes": [{"q": {"_id": 5}, "limit": 1}]}) == {"q": {"_id": "?"}}
+
+def test_slow_queries_aggregate_by_shape():
+    log = SlowQueryLog(threshold_ms=100, explain=False, max_shapes=2)
+    for tenant, duration in [("alice", 150), ("bob", 450), ("carol", 120)]:
+        log.record("find", "portfolio", "skills", {"find": "skills", "filter": {"tenant_id": tenant}}, duration)
+    top = log.top()
+    assert len(top) == 1
+    assert json.loads(top[0]["shape"]) == {"filter": {"tenant_id": "?"}, "sort": None}
+    assert (top[0]["count"], top[0]["max_ms"], top[0]["last_ms"], top[0]["mean_ms"]) == (3, 450, 120, 240)
+
+    log.record("find", "portfolio", "languages", {"find": "languages", "filter": {}}, 110)
+    # Full: the cheapest shape so far makes room for the new one
+    log.record("distinct", "portfolio", "skills", {"distinct": "skills", "key": "category"}, 300)
+    assert [(s["command"], s["collection"]) for s in log.top()] == [("find", "skills"), ("distinct", "skills")]
+
+    log.reset()
+    assert log.top() == []
+
+def event(request_id, command_name="find", command=None, duration_ms=0):
+    return SimpleNamespace(connection_id=("db", 27017), request_id=request_id, database_name="portfolio",
+                           command_name=command_name, command=command, duration_micros=duration_ms * 1000)
+
+def test_only_commands_over_the_threshold_are_recorded():
+    log = SlowQueryLog(threshold_ms=100, explain=False)
+    fast = {"find": "skills", "filter": {"tenant_id": "alice"}}
+    slow = {"find": "experiences", "filter": {"tenant_id": "alice"}, "sort": {"start_date": -1}}
+    log.started(event(1, command=fast))
+    log.started(event(2, command=slow))
+    log.started(event(3, command_name="getMore", command={"getMore": 1, "collection": "skills"}))
+    log.succeeded(event(1, duration_ms=5))
+    log.failed(event(2, duration_ms=250))
+    log.succeeded(event(3, command_name="getMore", duration_ms=1000))
+    assert [(s["collection"], s["count"]) for s in log.top()] == [("experiences", 1)]
+    assert log._started == {}
+
+def test_slow_shapes_are_explained_once():
+    explained = []
+
+    class Database:
+        def __init__(self):
+            self.client = {"portfolio": self}
+
+        async def command(self, command):
+            explained.append(command)
+            return COLLSCAN_EXPLAIN
+
+    log = SlowQueryLog(threshold_ms=0, explain=True)
+    command = {"find": "skills", "filter": {"tenant_id": "alice"}, "sort": {"order": 1}, "lsid": {"id": 1},
+               "$db": "portfolio"}
+    log.record("find", "portfolio", "skills", command, 200)
+    log.record("find", "portfolio", "skills", dict(command, filter={"tenant_id": "bob"}), 300)
+
+    async def run():
+        while log._pending:
+            stats, database, queued = log._pending.popleft()
+            await log.explain_plan(Database(), stats, database, queued)
+
+    asyncio.run(run())
+    assert explained == [{"explain": {"find": "skills", "filter": {"tenant_id": "alice"}, "sort": {"order": 1}},
+                          "verbosity": "queryPlanner"}]
+    assert log.top()[0]["plan"]["flags"] == ["COLLSCAN", "in-memory SORT"]
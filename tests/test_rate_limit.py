@@ -0,0 +1,41 @@
+import asyncio
+import logging
+
+import pytest
+
+from services.rate_limit import InMemoryRateLimitStore, RateLimitStore
+
+CONTACT = {"name": "Ana", "email": "ana@example.com", "subject": "Hello", "message": "Hi there"}
+
+class BrokenStore(RateLimitStore):
+    async def hit(self, key: str, limit: int, period: float) -> float:
+        raise ConnectionError("rate limit store unavailable")
+
+def test_store_must_implement_hit():
+    with pytest.raises(TypeError):
+        RateLimitStore()
+
+def test_store_failure_is_logged_500(server, api, monkeypatch, caplog):
+    monkeypatch.setattr(server.contact_limiter, "store", BrokenStore())
+
+    async def run():
+        async with api() as client:
+            return await client.post("/api/contact", json=CONTACT)
+
+    with caplog.at_level(logging.ERROR):
+        response = asyncio.run(run())
+    assert response.status_code == 500
+    assert "rate limit store unavailable" in response.json()["detail"]
+    assert "Error submitting contact form" in caplog.text
+
+def test_exhausted_limit_still_answers_429(server, api, monkeypatch):
+    monkeypatch.setattr(server.contact_limiter, "store", InMemoryRateLimitStore())
+    limit = server.contact_limiter.rules["email"].limit
+
+    async def run():
+        async with api() as client:
+            return [(await client.post("/api/contact", json=CONTACT)).status_code for _ in range(limit + 1)]
+
+    statuses = asyncio.run(run())
+    assert statuses[:limit] == [200] * limit
+    assert statuses[-1] == 429
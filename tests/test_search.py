@@ -0,0 +1,36 @@
+import asyncio
+
+import services.search
+from services.cache import portfolio_cache
+from services.search import SEARCH_SECTIONS, Entry, SearchService
+from services.tenancy import DEFAULT_TENANT
+
+def test_invalidation_during_rebuild_keeps_section_stale(monkeypatch):
+    service = SearchService(portfolio_cache)
+    skills = ["Excel"]
+
+    async def no_entries(repository, tenant):
+        return []
+
+    async def skill_entries(repository, tenant):
+        entries = [Entry("skills", None, "skills", skill, {}) for skill in skills]
+        # Skills change after this rebuild read them but before it finished
+        if skills == ["Excel"]:
+            skills.append("Python")
+            service.invalidate("skills")
+        return entries
+
+    for section in SEARCH_SECTIONS:
+        monkeypatch.setitem(services.search.SECTION_ENTRIES, section, no_entries)
+    monkeypatch.setitem(services.search.SECTION_ENTRIES, "skills", skill_entries)
+
+    async def run():
+        first = await service.search(None, DEFAULT_TENANT, "python")
+        stale = "skills" in service._indexes[None].stale
+        return first, stale, await service.search(None, DEFAULT_TENANT, "python")
+
+    first, stale, second = asyncio.run(run())
+    assert first["total"] == 0
+    assert stale
+    assert [hit["text"] for hit in second["results"]] == ["Python"]
+    assert "skills" not in service._indexes[None].stale
@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime
+
+import mongomock_motor
+import pytest
+from pymongo import DeleteOne, ReplaceOne
+
+from services.seeding import SEED_KEYS, VERSIONS_COLLECTION, plan_collection, sync_portfolio
+from services.tenancy import DEFAULT_TENANT, Tenant
+
+LANGUAGES = [{"language": "Indonesian", "level": "Native"}, {"language": "English", "level": "Proficient"}]
+
+@pytest.fixture
+def client():
+    return mongomock_motor.AsyncMongoMockClient()
+
+def plan(db, docs, tenant=DEFAULT_TENANT):
+    return plan_collection(db.languages, docs, SEED_KEYS["languages"], tenant, datetime.utcnow())
+
+async def versions(db) -> dict:
+    return {doc["_id"]: doc["version"] async for doc in db[VERSIONS_COLLECTION].find()}
+
+def test_reseeding_unchanged_data_writes_nothing(client):
+    db = client["portfolio_test"]
+
+    async def run():
+        first = await sync_portfolio(client, db, {"languages": LANGUAGES})
+        second = await sync_portfolio(client, db, {"languages": [dict(doc) for doc in LANGUAGES]})
+        return first, second, await plan(db, LANGUAGES), await versions(db)
+
+    first, second, operations, bumped = asyncio.run(run())
+    assert first == {"languages": 2}
+    assert second == {}
+    assert operations == []
+    assert bumped == {"languages": 1}
+
+def test_changed_document_is_replaced_in_place(client):
+    db = client["portfolio_test"]
+    changed = [LANGUAGES[0], dict(LANGUAGES[1], level="Fluent")]
+
+    async def run():
+        await sync_portfolio(client, db, {"languages": LANGUAGES})
+        operations = await plan(db, changed)
+        await sync_portfolio(client, db, {"languages": changed})
+        docs = await db.languages.find({}, {"_id": 0, "language": 1, "level": 1}).to_list(None)
+        return operations, docs, await versions(db)
+
+    operations, docs, bumped = asyncio.run(run())
+    assert len(operations) == 1 and isinstance(operations[0], ReplaceOne)
+    assert docs == changed
+    assert bumped == {"languages": 2}
+
+def test_removed_document_is_deleted(client):
+    db = client["portfolio_test"]
+
+    async def run():
+        await sync_portfolio(client, db, {"languages": LANGUAGES})
+        operations = await plan(db, LANGUAGES[:1])
+        await sync_portfolio(client, db, {"languages": LANGUAGES[:1]})
+        return operations, await db.languages.distinct("language")
+
+    operations, languages = asyncio.run(run())
+    assert len(operations) == 1 and isinstance(operations[0], DeleteOne)
+    assert languages == ["Indonesian"]
+
+def test_only_documents_of_the_seeded_tenant_are_touched(client):
+    db = client["portfolio_test"]
+
+    async def run():
+        await sync_portfolio(client, db, {"languages": LANGUAGES}, Tenant("bob"))
+        # Single-tenant mode: the default tenant's scope is unfiltered, but bob's copies are not its own
+        operations = await plan(db, LANGUAGES[:1])
+        await sync_portfolio(client, db, {"languages": LANGUAGES[:1]})
+        return operations, await db.languages.count_documents({"tenant_id": "bob"})
+
+    operations, bob = asyncio.run(run())
+    assert [type(op) for op in operations] == [ReplaceOne]
+    assert bob == 2
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+import services.portfolio
+from models.experience import Experience
+from services.cache import portfolio_cache
+from services.serialization import DocumentShaper, dumps
+
+SECTION_PATHS = ["/api/portfolio", "/api/personal", "/api/experiences", "/api/skills",
+                 "/api/skills?category=soft&subcategory=social", "/api/education", "/api/certifications",
+                 "/api/languages", "/api/experiences?limit=2"]
+
+async def read_all(api) -> dict:
+    async with api() as client:
+        return {path: (await client.get(path)).content for path in SECTION_PATHS}
+
+def test_fast_mode_matches_model_mode_byte_for_byte(seeded, api, monkeypatch):
+    monkeypatch.setattr(services.portfolio, "FAST_SERIALIZATION", False)
+    validated = asyncio.run(read_all(api))
+    portfolio_cache.invalidate()
+    monkeypatch.setattr(services.portfolio, "FAST_SERIALIZATION", True)
+    shaped = asyncio.run(read_all(api))
+
+    for path in SECTION_PATHS:
+        assert shaped[path] == validated[path], path
+    assert b"Muhammad Khoirul Wahid Azmi" in shaped["/api/personal"]
+
+def test_shaper_fills_defaults_like_the_model():
+    # order and is_active are left to their defaults; extra fields are dropped
+    doc = {"_id": ObjectId(), "title": "T", "company": "C", "period": "2020", "location": "L", "achievements": ["a"],
+           "created_at": datetime(2026, 1, 1), "updated_at": datetime(2026, 1, 2, 3, 4, 5, 600000),
+           "extra": "not in the model"}
+    adapter = TypeAdapter(Experience)
+    expected = adapter.dump_json(adapter.validate_python(dict(doc, _id=str(doc["_id"]))), by_alias=True)
+    assert dumps(DocumentShaper(Experience)(doc)) == expected
+
+def test_shaper_rejects_documents_missing_required_fields():
+    with pytest.raises(ValueError, match="missing required field 'company'"):
+        DocumentShaper(Experience)({"title": "T"})
@@ -0,0 +1,106 @@
+import asyncio
+import gzip
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import services.shared_snapshot
+from services.http_cache import SerializedResponse
+from services.shared_snapshot import SharedSnapshot, SnapshotPublisher, write_shared_snapshot
+from services.tenancy import DEFAULT_TENANT, Tenant
+
+MODIFIED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def responses(label: str) -> dict:
+    return {
+        "experiences": SerializedResponse(f'[{{"title":"{label}"}}]'.encode() * 200, MODIFIED),
+        "languages": SerializedResponse(f'[{{"language":"{label}"}}]'.encode(), MODIFIED),
+    }
+
+def test_round_trip_keeps_bodies_etags_and_variants(tmp_path, monkeypatch):
+    monkeypatch.setattr(services.shared_snapshot, "COMPRESSION_ENABLED", True)
+    written = responses("old")
+    path = tmp_path / "snapshot"
+    write_shared_snapshot(path, 1, written)
+
+    snapshot = SharedSnapshot(path)
+    assert snapshot.current() == 1
+    for name, serialized in written.items():
+        shared = snapshot.lookup(name, DEFAULT_TENANT, [name])
+        assert bytes(shared.body) == serialized.body
+        assert shared.etag == serialized.etag
+        assert shared.last_modified == serialized.last_modified
+    experiences = snapshot.lookup("experiences", DEFAULT_TENANT, ["experiences"])
+    # Large bodies carry their compressed variants; small ones are served as they are
+    assert gzip.decompress(bytes(experiences.variants["gzip"])) == written["experiences"].body
+    assert snapshot.lookup("languages", DEFAULT_TENANT, ["languages"]).variants == {}
+    assert snapshot.lookup("experiences", Tenant("alice"), ["experiences"]) is None
+
+def test_replaced_file_leaves_mapped_bodies_intact(tmp_path):
+    path = tmp_path / "snapshot"
+    write_shared_snapshot(path, 1, responses("old"))
+    snapshot = SharedSnapshot(path, check_interval=60)
+    held = snapshot.lookup("languages", DEFAULT_TENANT, ["languages"])
+
+    write_shared_snapshot(path, 2, responses("new"))
+    # Within check_interval the old mapping is still the one served
+    assert snapshot.current() == 1
+    snapshot.refresh(force=True)
+
+    assert snapshot.generation == 2
+    assert bytes(held.body) == b'[{"language":"old"}]'
+    assert bytes(snapshot.lookup("languages", DEFAULT_TENANT, ["languages"]).body) == b'[{"language":"new"}]'
+
+def test_invalidated_sections_skip_the_snapshot_until_a_newer_one(tmp_path):
+    path = tmp_path / "snapshot"
+    write_shared_snapshot(path, 1, responses("old"), started_at=time.time() - 1)
+    snapshot = SharedSnapshot(path)
+
+    snapshot.invalidated("experiences")
+    assert snapshot.lookup("experiences", DEFAULT_TENANT, ["experiences"]) is None
+    assert snapshot.lookup("portfolio", DEFAULT_TENANT, ["languages", "experiences"]) is None
+    assert snapshot.lookup("languages", DEFAULT_TENANT, ["languages"]) is not None
+    # Another tenant's change says nothing about the default tenant's snapshot
+    snapshot.invalidated("languages", "alice")
+    assert snapshot.lookup("languages", DEFAULT_TENANT, ["languages"]) is not None
+
+    write_shared_snapshot(path, 2, responses("new"))
+    snapshot.refresh(force=True)
+    assert bytes(snapshot.lookup("experiences", DEFAULT_TENANT, ["experiences"]).body).startswith(b'[{"title":"new"}]')
+
+    snapshot.invalidated()
+    assert snapshot.lookup("languages", DEFAULT_TENANT, ["languages"]) is None
+
+@pytest.mark.skipif(services.shared_snapshot.fcntl is None, reason="needs fcntl.flock")
+def test_one_publisher_leads_and_another_takes_over(tmp_path):
+    path = tmp_path / "snapshot"
+    builds = []
+
+    def publisher(label: str) -> SnapshotPublisher:
+        async def build():
+            builds.append(label)
+            return responses(label)
+        return SnapshotPublisher(SharedSnapshot(path, check_interval=0.01), build)
+
+    async def wait_for(condition):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    async def run():
+        first, second = publisher("first"), publisher("second")
+        first.start()
+        await wait_for(lambda: first.leader)
+        second.start()
+        await asyncio.sleep(0.1)
+        followed = second.leader
+        await first.stop()
+        await wait_for(lambda: second.leader)
+        await wait_for(lambda: second.snapshot.generation == 2)
+        await second.stop()
+        return followed, second.snapshot
+
+    followed, snapshot = asyncio.run(asyncio.wait_for(run(), 5))
+    assert followed is False
+    assert builds == ["first", "second"]
+    assert bytes(snapshot.lookup("languages", DEFAULT_TENANT, ["languages"]).body) == b'[{"language":"second"}]'
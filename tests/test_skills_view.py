@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from services.cache import portfolio_cache
+from services.portfolio import SKILLS_VIEW_COLLECTION, load_skills, skills_views
+from services.tenancy import Tenant
+
+@pytest.fixture
+def db(server):
+    skills_views.built.clear()
+    return server.db
+
+def test_direct_skills_edit_shows_after_invalidation(db):
+    async def run():
+        await db.skills.insert_one({"category": "technical", "skills": ["Excel"]})
+        first = await load_skills(db)
+        # Edited by another process: the view is not refreshed, only the cache invalidated
+        await db.skills.update_one({"category": "technical"}, {"$set": {"skills": ["Excel", "SQL"]}})
+        cached = await load_skills(db)
+        portfolio_cache.invalidate("skills")
+        return first, cached, await load_skills(db)
+
+    first, cached, edited = asyncio.run(run())
+    assert first["technical"] == ["Excel"]
+    assert cached["technical"] == ["Excel"]
+    assert edited["technical"] == ["Excel", "SQL"]
+
+def test_view_is_rebuilt_once_per_process(db):
+    async def run():
+        await db.skills.insert_one({"category": "technical", "skills": ["Excel"]})
+        # A view left behind by an earlier run, out of date
+        await db[SKILLS_VIEW_COLLECTION].insert_one({"_id": "skills", "grouped": {"technical": ["Stale"]}})
+        return await load_skills(db)
+
+    assert asyncio.run(run())["technical"] == ["Excel"]
+
+def test_other_tenants_views_stay_put(db):
+    alice, bob = Tenant("alice"), Tenant("bob")
+
+    async def run():
+        await db.skills.insert_many([{"category": "technical", "skills": ["A"], "tenant_id": "alice"},
+                                     {"category": "technical", "skills": ["B"], "tenant_id": "bob"}])
+        await load_skills(db, alice)
+        await load_skills(db, bob)
+        portfolio_cache.invalidate("skills", "alice")
+        return skills_views.is_current(alice), skills_views.is_current(bob)
+
+    assert asyncio.run(run()) == (False, True)
@@ -0,0 +1,71 @@
+import asyncio
+import gzip
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+import services.static_export
+from services.http_cache import SerializedResponse
+from services.static_export import StaticExportMiddleware, StaticSite, export_responses
+
+MODIFIED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+async def application(scope, receive, send):
+    """Stands in for the API: says it was reached"""
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"from the app"})
+
+def exported(label: str) -> dict:
+    return {"/api/experiences": SerializedResponse(f'[{{"title":"{label}"}}]'.encode(), MODIFIED)}
+
+@pytest.fixture
+def site(tmp_path):
+    export_responses(tmp_path, exported("old"))
+    return StaticSite(tmp_path, check_interval=0)
+
+def get(site, path: str, method: str = "GET", **kwargs) -> httpx.Response:
+    app = StaticExportMiddleware(application, site)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+    return asyncio.run(run())
+
+def test_exported_routes_are_served_from_disk(site):
+    response = get(site, "/api/experiences", headers={"Accept-Encoding": "identity"})
+    assert response.content == b'[{"title":"old"}]'
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    compressed = get(site, "/api/experiences", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == "W/" + response.headers["etag"]
+    assert compressed.content == response.content
+
+    revalidated = get(site, "/api/experiences", headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+@pytest.mark.parametrize("method, path", [
+    ("GET", "/api/experiences?limit=1"),
+    ("GET", "/api/experiences?format=ndjson"),
+    ("POST", "/api/experiences"),
+    ("GET", "/api/languages"),
+])
+def test_other_requests_reach_the_app(site, method, path):
+    assert get(site, path, method).content == b"from the app"
+
+def test_multi_tenant_mode_bypasses_the_export(site, monkeypatch):
+    monkeypatch.setattr(services.static_export, "MULTI_TENANT", True)
+    assert get(site, "/api/experiences").content == b"from the app"
+
+def test_new_export_versions_are_picked_up(site, tmp_path):
+    assert get(site, "/api/experiences").content == b'[{"title":"old"}]'
+    first = site.version
+    # Unchanged data reuses its version; changed data gets a new one
+    assert export_responses(tmp_path, exported("old")) == first
+    second = export_responses(tmp_path, exported("new"))
+    assert second != first
+    assert get(site, "/api/experiences").content == b'[{"title":"new"}]'
+    static_file = site.routes["/api/experiences"]
+    assert static_file.file.parent == tmp_path / second
+    assert gzip.decompress(static_file.file.with_name(static_file.file.name + ".gz").read_bytes()) == b'[{"title":"new"}]'
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+import pytest
+
+import services.tenancy
+import services.auth
+
+@pytest.fixture
+def multi_tenant(monkeypatch):
+    monkeypatch.setattr(services.tenancy, "MULTI_TENANT", True)
+
+def next_link(response) -> str:
+    link = response.headers["link"]
+    assert link.endswith('>; rel="next"')
+    url = urlsplit(link[1:link.index(">")])
+    return f"{url.path}?{url.query}"
+
+def test_pagination_links_keep_tenant_prefix(server, api, multi_tenant):
+    async def run():
+        for tenant in ("alice", "bob"):
+            await server.db.experiences.insert_many([
+                {"title": f"{tenant} {i}", "company": "C", "period": "2020", "location": "L",
+                 "description": "d", "achievements": [], "is_active": True, "order": i, "tenant_id": tenant}
+                for i in range(3)
+            ])
+        async with api() as client:
+            first = await client.get("/t/alice/api/experiences?limit=1")
+            link = next_link(first)
+            second = await client.get(link)
+            return first, link, second
+
+    first, link, second = asyncio.run(run())
+    assert first.status_code == 200
+    assert link.startswith("/t/alice/api/experiences?")
+    assert second.status_code == 200
+    assert [exp["title"] for exp in first.json() + second.json()] == ["alice 0", "alice 1"]
+
+def test_admin_pagination_links_keep_tenant_prefix(server, api, multi_tenant, monkeypatch):
+    monkeypatch.setattr(services.auth, "ADMIN_API_TOKEN", "secret")
+    now = datetime.utcnow()
+
+    async def run():
+        await server.db.contact_messages.insert_many([
+            {"name": "n", "email": f"u{i}@example.com", "subject": "s", "message": "m", "is_read": False,
+             "created_at": now - timedelta(minutes=i), "updated_at": now, "tenant_id": "alice"}
+            for i in range(3)
+        ])
+        async with api(headers={"Authorization": "Bearer secret"}) as client:
+            first = await client.get("/t/alice/api/admin/messages?limit=2")
+            second = await client.get(next_link(first))
+            return first, second
+
+    first, second = asyncio.run(run())
+    assert next_link(first).startswith("/t/alice/api/admin/messages?")
+    assert [m["email"] for m in first.json() + second.json()] == ["u0@example.com", "u1@example.com",
+                                                                  "u2@example.com"]
+
+def test_unknown_tenant_prefix_is_rejected(server, api, multi_tenant):
+    async def run():
+        async with api() as client:
+            return await client.get("/t/Not_Valid/api/experiences")
+
+    assert asyncio.run(run()).status_code == 404
+
+def test_seeding_without_a_tenant_leaves_hosted_portfolios_alone(multi_tenant):
+    import mongomock_motor
+    from services.seeding import sync_portfolio
+    from services.tenancy import DEFAULT_TENANT, Tenant
+
+    client = mongomock_motor.AsyncMongoMockClient()
+    db = client["portfolio_test"]
+    experience = {"title": "T", "company": "C", "period": "2020", "location": "L",
+                  "achievements": [], "is_active": True, "order": 0}
+
+    async def run():
+        await sync_portfolio(client, db, {"experiences": [dict(experience, title="bob's")]}, Tenant("bob"))
+        await sync_portfolio(client, db, {"experiences": [experience]}, DEFAULT_TENANT)
+        # Reseeding the default tenant with nothing deletes only its own documents
+        await sync_portfolio(client, db, {"experiences": []}, DEFAULT_TENANT)
+        return await db.experiences.find({}, {"_id": 0, "title": 1, "tenant_id": 1}).to_list(None)
+
+    assert asyncio.run(run()) == [{"title": "bob's", "tenant_id": "bob"}]
+
+def test_one_tenant_fills_at_most_entries_per_tenant(server, api, multi_tenant):
+    from seed_data import sample_data
+    from services.cache import ENTRIES_PER_TENANT, portfolio_cache
+    from services.portfolio import SKILL_CATEGORIES, SOFT_SKILL_SUBCATEGORIES
+    from services.seeding import SEED_KEYS, as_documents, sync_portfolio
+    from services.tenancy import Tenant
+
+    paths = ["portfolio", "personal", "experiences", "skills", "education", "certifications", "languages"]
+    paths += [f"skills?category={category}" for category in SKILL_CATEGORIES]
+    paths += [f"skills?category=soft&subcategory={subcategory}" for subcategory in SOFT_SKILL_SUBCATEGORIES]
+
+    async def run():
+        data = {name: as_documents(sample_data[name]) for name in SEED_KEYS}
+        await sync_portfolio(server.db.database().client, server.db, data, Tenant("alice"))
+        async with api() as client:
+            for path in paths:
+                assert (await client.get(f"/t/alice/api/{path}")).status_code == 200
+        return [key for key in portfolio_cache._entries if key.startswith("alice:")]
+
+    assert len(asyncio.run(run())) == ENTRIES_PER_TENANT
@@ -0,0 +1,89 @@
+import asyncio
+import io
+import json
+import logging
+from datetime import datetime
+
+from bson import ObjectId
+
+from models.contact_message import ContactMessage
+from models.experience import Experience
+from services.transfer import BatchValidator, RecordWriter, csv_fields, iter_csv
+
+def round_trip(model, docs):
+    f = io.StringIO()
+    with RecordWriter(f, "csv", csv_fields(model)) as writer:
+        for doc in docs:
+            writer.write(doc)
+    f.seek(0)
+    return BatchValidator(model, decode_json=True).documents(list(iter_csv(f)))
+
+def test_csv_round_trip_keeps_bracketed_strings():
+    now = datetime(2024, 5, 1, 12, 0)
+    message = {"_id": ObjectId(), "name": "Ana", "email": "ana@example.com", "subject": "[Job] offer",
+               "message": "{not json}", "is_read": False, "created_at": now, "updated_at": now}
+    docs, errors = round_trip(ContactMessage, [message])
+    assert errors == []
+    assert docs == [dict(message, company=None)]
+
+def test_csv_round_trip_decodes_list_fields():
+    experience = {"title": "Engineer", "company": "C", "period": "2020", "location": "[remote]",
+                  "achievements": ["Shipped [v2]", "Led team"]}
+    docs, errors = round_trip(Experience, [experience])
+    assert errors == []
+    assert docs[0]["achievements"] == ["Shipped [v2]", "Led team"]
+    assert docs[0]["location"] == "[remote]"
+
+def test_invalid_json_cell_rejects_only_its_record():
+    rows = "title,company,period,location,achievements\n" \
+           "A,C,2020,L,\"[\"\"ok\"\"]\"\n" \
+           "B,C,2020,L,[broken\n"
+    docs, errors = BatchValidator(Experience, decode_json=True).documents(list(iter_csv(io.StringIO(rows))), offset=10)
+    assert [doc["title"] for doc in docs] == ["A"]
+    assert errors == ["record 12: achievements: Invalid JSON"]
+
+def test_import_numbers_errors_by_record_read(tmp_path, caplog):
+    import import_export
+
+    records = [{"name": "n", "email": f"u{i}@example.com", "subject": "s", "message": "m"} for i in range(7)]
+    records[4]["email"] = "not an email"
+    records[6]["email"] = "also not"
+    path = tmp_path / "messages.ndjson"
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+    async def run():
+        try:
+            await import_export.import_collection("contact_messages", path, "ndjson",
+                                                  import_export.DEFAULT_TENANT, batch_size=2, mode="insert")
+            return await import_export.db.contact_messages.count_documents({})
+        finally:
+            await import_export.db.contact_messages.drop()
+
+    with caplog.at_level(logging.WARNING):
+        written = asyncio.run(run())
+    assert written == 5
+    numbered = [r.getMessage().split(":")[0] for r in caplog.records if r.getMessage().startswith("record ")]
+    assert numbered == ["record 5", "record 7"]
+
+def test_multi_tenant_import_rejects_portfolios_without_tenant(tmp_path, caplog, monkeypatch):
+    import import_export
+
+    monkeypatch.setattr(import_export, "MULTI_TENANT", True)
+    language = {"language": "English", "level": "Proficient"}
+    records = [{"tenant_id": "alice", "languages": [language]}, {"languages": [language]},
+               {"tenant_id": "bob", "languages": [language]}]
+    path = tmp_path / "portfolios.ndjson"
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+    async def run():
+        try:
+            await import_export.import_portfolios(path, "ndjson")
+            return sorted(await import_export.db.languages.distinct("tenant_id"))
+        finally:
+            await import_export.client.drop_database(import_export.db.name)
+
+    with caplog.at_level(logging.WARNING):
+        tenants = asyncio.run(run())
+    assert tenants == ["alice", "bob"]
+    assert [r.getMessage() for r in caplog.records if r.getMessage().startswith("record ")] == [
+        "record 2: missing tenant_id (required in multi-tenant mode)"]